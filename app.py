@@ -1,14 +1,22 @@
 import os
-from flask import Flask, request, jsonify, send_from_directory
+import time
+from flask import Flask, g, request, jsonify
 from dotenv import load_dotenv
 import uuid
 
-from route.hello import hello_bp
-from route.user import user_bp
-from infra.client.db_client import db_bp
+from infra.client.db_client import get_pool, get_read_pool, init_db
 from utils.logging import setup_logging, get_logger
 from structlog.contextvars import bind_contextvars, clear_contextvars
 from application.error_handlers import register_error_handlers  # 追加
+from application.exceptions import ServiceOverloadedError, TooManyRequestsError
+from utils.static_files import StaticFiles, static_cli
+from utils.compression import ResponseCompressor
+from utils.json_provider import FastJSONProvider
+from utils.access_log import AccessLogSampler
+from utils.profiling import PROFILE_TOKEN_HEADER, RequestProfiler, profile_cli
+from utils.rate_limit import WRITE_METHODS, ConcurrencyLimiter, RateLimiter, retry_after_header
+from utils.metrics import REGISTRY, get_db_query_count, reset_db_query_count
+from utils.models import build_models
 
 load_dotenv()
 
@@ -16,65 +24,232 @@ load_dotenv()
 setup_logging()
 logger = get_logger(__name__)
 
-app = Flask(__name__, static_folder="static")
-
-logger.info("Flask application started.")
+# リクエストのメトリクス（/metrics で公開）
+requests_in_flight = REGISTRY.gauge("http_requests_in_flight", "Requests currently being processed.")
+request_duration = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Request latency in seconds.",
+    ("method", "endpoint", "status"),
+)
+db_queries_per_request = REGISTRY.histogram(
+    "db_queries_per_request",
+    "Number of SQL statements executed per request.",
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100),
+)
+requests_rejected = REGISTRY.counter(
+    "http_requests_rejected_total",
+    "Requests rejected by admission control.",
+    ("reason",),
+)
+
+# create_app() で登録するブループリント（"モジュール:属性"）。
+# モジュールは登録時にimportするので、`import app` だけではルート（とその依存）を読み込まない。
+BLUEPRINTS = (
+    "route.hello:hello_bp",
+    "route.user:user_bp",
+    "route.user:async_user_bp",
+    "infra.client.db_client:db_bp",
+    "route.metrics:metrics_bp",
+)
+
+
+def load_blueprint(path: str):
+    """"モジュール:属性" 形式のパスからブループリントを読み込みます。"""
+    module_name, attr = path.split(":")
+    # importlib.import_module() は -X importtime に記録されないため、__import__ を使う
+    return getattr(__import__(module_name, fromlist=[attr]), attr)
+
+
+def create_app(config=None):
+    """
+    アプリケーションファクトリー。
 
+    prefork型のサーバー（gunicornの --preload など）でfork前に呼ばれても安全なように、
+    DBコネクションなどのプロセス固有のリソースはここでは開かず、初回利用時に作成する。
 
-@app.before_request
-def before_request():
-    """
-    リクエストの開始時にコンテキスト情報をバインドし、リクエストログを出力する
+    Args:
+        config: 設定の上書き。辞書、または `from_object` に渡せるオブジェクト/文字列。
     """
-    request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
-    bind_contextvars(
-        request_id=request_id,
-        remote_addr=request.remote_addr,
-        method=request.method,
-        path=request.path,
+    app = Flask(__name__, static_folder="static")
+    # jsonify やリクエストのJSONの読み込みは orjson で行う
+    app.json = FastJSONProvider(app)
+    app.config.from_object("config.Config")
+    if isinstance(config, dict):
+        app.config.update(config)
+    elif config is not None:
+        app.config.from_object(config)
+
+    # スキーマの準備はプロセス起動時に1回だけ行う（コネクションは閉じる）
+    init_db(app)
+
+    # 静的ファイルのマニフェスト（ETag、事前圧縮したファイルなど）は起動時に作っておく
+    static_files = StaticFiles(
+        app.static_folder, memory_max_size=app.config.get("STATIC_MEMORY_MAX_SIZE", 0)
     )
-    logger.info(
-        "Incoming request",
-        request_id=request_id,
-        remote_addr=request.remote_addr,
-        method=request.method,
-        path=request.path,
-    )
-
-
-@app.after_request
-def after_request(response):
+    static_files.refresh()
+    # 開発時はstatic配下の変更を監視し、マニフェストを作り直す
+    static_watch = app.config.get("STATIC_WATCH")
+    if static_watch is None:
+        static_watch = app.debug
+    elif isinstance(static_watch, str):
+        static_watch = static_watch == "true"
+    if static_watch:
+        static_files.start_watcher(app.config.get("STATIC_WATCH_INTERVAL", 1.0))
+    app.extensions["static_files"] = static_files
+
+    access_log_sampler = AccessLogSampler.from_config(app.config)
+    compressor = ResponseCompressor.from_config(app.config) if app.config.get("COMPRESS_ENABLED") else None
+    profiler = RequestProfiler.from_config(app.config)
+    rate_limiter = RateLimiter.from_config(app.config)
+    write_limiter = ConcurrencyLimiter.from_config(app.config)
+    app.extensions["write_limiter"] = write_limiter
+
+    @app.before_request
+    def before_request():
+        """
+        リクエストの開始時にコンテキスト情報をバインドし、開始時刻を記録する
+        """
+        g.request_start = time.perf_counter()
+        requests_in_flight.inc()
+        reset_db_query_count()
+        bind_contextvars(
+            request_id=request.headers.get("X-Request-ID", str(uuid.uuid4())),
+            remote_addr=request.remote_addr,
+            method=request.method,
+            path=request.path,
+        )
+        # 過負荷のときは、DBに届く前に拒否して再試行させる（レイテンシが伸び続けるのを防ぐ）
+        if rate_limiter is not None:
+            from dependencies import get_rate_limit_store
+
+            retry_after = rate_limiter.check(
+                get_rate_limit_store(), request.path, request.remote_addr, request.headers
+            )
+            if retry_after > 0:
+                requests_rejected.inc("rate_limited")
+                raise TooManyRequestsError(headers={"Retry-After": retry_after_header(retry_after)})
+        if write_limiter is not None and request.method in WRITE_METHODS:
+            if not write_limiter.acquire():
+                requests_rejected.inc("overloaded")
+                raise ServiceOverloadedError(
+                    headers={"Retry-After": retry_after_header(write_limiter.retry_after)}
+                )
+            g.write_slot = True
+        if profiler is not None:
+            profile = profiler.start(request.path, request.headers.get(PROFILE_TOKEN_HEADER))
+            if profile is not None:
+                g.profile = profile
+
+    @app.after_request
+    def after_request(response):
+        """
+        リクエストの終了時に処理時間付きのアクセスログを1行出力し（抽出対象の場合のみ）、コンテキストをクリアする
+        """
+        duration = time.perf_counter() - g.get("request_start", time.perf_counter())
+        duration_ms = duration * 1000
+        profile = g.pop("profile", None)
+        if profile is not None:
+            # 要約はアクセスログに付与し、プロファイルしたリクエストのログは必ず出力する
+            bind_contextvars(profile=profiler.finish(profile))
+            response.headers["X-Profile-Id"] = profile.id
+        status_code = response.status_code
+        # パスではなくルールで集計し、ラベルの種類が増えすぎないようにする
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        request_duration.observe(duration, request.method, endpoint, str(status_code))
+        db_queries_per_request.observe(get_db_query_count())
+        if profile is not None or access_log_sampler.should_log(request.path, status_code, duration_ms):
+            if status_code >= 500:
+                log = logger.error
+            elif status_code >= 400:
+                log = logger.warning
+            else:
+                log = logger.info
+            log(
+                "Request completed",
+                status_code=status_code,
+                content_length=response.content_length,
+                duration_ms=round(duration_ms, 3),
+            )
+        clear_contextvars()
+        return response
+
+    if compressor is not None:
+
+        @app.after_request
+        def compress_response(response):
+            # after_requestは登録と逆順に呼ばれるので、アクセスログより先に圧縮される
+            return compressor.compress(response, request.accept_encodings)
+
+    @app.teardown_request
+    def teardown_request(exception):
+        # after_requestが呼ばれない場合も含めて、必ず処理中の数を戻す
+        if "request_start" in g:
+            requests_in_flight.dec()
+        if g.pop("write_slot", False):
+            write_limiter.release()
+        # after_requestが呼ばれなかった場合、プロファイルを終了する（サンプリングのスレッドを止める）
+        profile = g.pop("profile", None)
+        if profile is not None:
+            profiler.finish(profile)
+
+    # 例えば、Reactなどをbuildしたファイルをstatic配下に配置した場合、flaskから配信できる
+    @app.route("/", defaults={"path": ""})
+    @app.route("/<path:path>")
+    def serve(path):
+        # ファイルの有無はマニフェストで判定する（リクエストごとにファイルシステムを参照しない）
+        if path != "" and static_files.exists(path):
+            return static_files.send(path)
+        else:
+            return static_files.send("index.html")
+
+    @app.route("/error")
+    def trigger_error():
+        1 / 0  # ZeroDivisionErrorを意図的に発生させる
+
+    # エラーハンドラーを登録
+    register_error_handlers(app)
+
+    for path in BLUEPRINTS:
+        app.register_blueprint(load_blueprint(path))
+    app.cli.add_command(static_cli)
+    app.cli.add_command(profile_cli)
+
+    logger.info("Flask application created.")
+    return app
+
+
+def warmup(app):
     """
-    リクエストの終了時にレスポンスログを出力し、コンテキストをクリアする
+    ワーカープロセスごとに、最初のリクエストの前に呼び出す準備処理。
+    fork後のプロセスでコネクションを開き、最初のリクエストの遅延を減らす。
+    import時には作らないモデルのスキーマ（defer_build）もここで作る。
     """
-    logger.info(
-        "Outgoing response",
-        status_code=response.status_code,
-        content_length=response.content_length,
-    )
-    clear_contextvars()
-    return response
-
-
-# 例えば、Reactなどをbuildしたファイルをstatic配下に配置した場合、flaskから配信できる
-@app.route("/", defaults={"path": ""})
-@app.route("/<path:path>")
-def serve(path):
-    if path != "" and os.path.exists(app.static_folder + "/" + path):
-        return send_from_directory(app.static_folder, path)
-    else:
-        return send_from_directory(app.static_folder, "index.html")
+    from application.ports.user_dto import UserCreateDTO, user_response_list_adapter
+    from application.ports.user_query import UserQuery
 
+    build_models(UserCreateDTO, UserQuery, user_response_list_adapter)
+    with app.app_context():
+        # 書き込み用と読み込み用のプールで、それぞれ1つずつコネクションを開いておく
+        for pool in (get_pool(), get_read_pool()):
+            conn = pool.acquire()
+            try:
+                conn.execute("SELECT 1").fetchone()
+            finally:
+                pool.release(conn)
+    logger.info("Worker warmed up.", pid=os.getpid())
 
-@app.route("/error")
-def trigger_error():
-    1 / 0  # ZeroDivisionErrorを意図的に発生させる
 
+_default_app = None
 
-# エラーハンドラーを登録
-register_error_handlers(app)
 
-
-app.register_blueprint(hello_bp)
-app.register_blueprint(user_bp)
-app.register_blueprint(db_bp)
+def __getattr__(name):
+    """
+    `from app import app` や `flask --app app run` のために、初回参照時にデフォルトのアプリを作成する。
+    import時にはアプリを作成しない。
+    """
+    global _default_app
+    if name == "app":
+        if _default_app is None:
+            _default_app = create_app()
+        return _default_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
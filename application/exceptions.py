@@ -4,12 +4,17 @@ class ApplicationError(HTTPException):
     """アプリケーションの基底例外クラス"""
     code = 500 # デフォルトのHTTPステータスコード
     description = "An unexpected error occurred."
+    # 業務上起こりうる（想定内の）例外か。Noneの場合はステータスコードが5xx未満なら想定内とする
+    # 想定内の例外はトレースバックなしでログに記録される（utils.errors.report_error）
+    expected = None
 
-    def __init__(self, description=None, code=None, payload=None):
+    def __init__(self, description=None, code=None, payload=None, headers=None):
         super().__init__(description or self.description)
         if code is not None:
             self.code = code
         self.payload = payload
+        # レスポンスに付けるヘッダー（Retry-Afterなど）
+        self.headers = headers
 
     def to_dict(self):
         """JSONレスポンスのために辞書形式に変換"""
@@ -25,3 +30,17 @@ class UserNotFoundError(ApplicationError):
 class InvalidInputError(ApplicationError):
     code = 400
     description = "Invalid input provided."
+
+class DatabaseUnavailableError(ApplicationError):
+    code = 503
+    description = "Database is temporarily unavailable."
+
+class TooManyRequestsError(ApplicationError):
+    code = 429
+    description = "Too many requests. Please retry later."
+
+class ServiceOverloadedError(ApplicationError):
+    code = 503
+    description = "Server is busy. Please retry later."
+    # 過負荷時に意図して拒否したもので、障害ではない
+    expected = True
@@ -0,0 +1,44 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+from application.ports.user_query import UserQuery
+from domain.user_domain import User
+
+
+class IAsyncUserRepository(ABC):
+    """
+    IUserRepositoryの非同期版のポート。
+    AsyncUserServiceはこの抽象クラスに依存し、待ち時間の間に他の処理（並行クエリなど）を進められる。
+    各メソッドの意味は IUserRepository と同じ。
+    """
+
+    @abstractmethod
+    async def get_users(self, limit: int = 100, after_id: Optional[int] = None) -> List[User]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def find_users(self, query: UserQuery) -> List[User]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_version(self) -> int:
+        raise NotImplementedError
+
+    async def get_users_page(
+        self, limit: int = 100, after_id: Optional[int] = None, query: Optional[UserQuery] = None
+    ) -> Tuple[int, List[User]]:
+        """
+        (版番号, 一覧) を返す。並行に読み込むと、間に書き込みがあった場合に新しい版番号と古い一覧の組になる
+        （そのETagで古い一覧が304で返され続ける）ので、版番号を読んでから一覧を読む。
+        """
+        version = await self.get_version()
+        if query is not None:
+            return version, await self.find_users(query)
+        return version, await self.get_users(limit=limit, after_id=after_id)
+
+    @abstractmethod
+    async def add_user(self, user: User) -> User:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add_users(self, users: List[User]) -> List[User]:
+        raise NotImplementedError
@@ -1,15 +1,36 @@
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+
+from utils.models import trusted_factory
 
 
 class UserCreateDTO(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     name: str = Field(..., min_length=1)
     age: int = Field(..., ge=0)
     nickname: Optional[str] = None
 
 
+# trusted_factory で検証せずに作り、pydantic_core.to_json で直接シリアライズするので、
+# スキーマは遅延させない（defer_build のままだと to_json が失敗する）
 class UserResponse(BaseModel):
     id: int
     name: str
     age: int
     nickname: Optional[str] = None
+
+
+# UserResponseのリストを、中間の辞書を作らずに直接JSONへシリアライズするためのアダプター
+user_response_list_adapter = TypeAdapter(list[UserResponse], config=ConfigDict(defer_build=True))
+
+_build_user_response = trusted_factory(UserResponse)
+
+
+def to_user_response(user) -> UserResponse:
+    """
+    検証済みのドメインモデルから、再検証せずにUserResponseを組み立てます。
+    """
+    return _build_user_response(
+        {"id": user.id, "name": user.name, "age": user.age, "nickname": user.nickname}
+    )
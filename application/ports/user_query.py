@@ -0,0 +1,46 @@
+from typing import Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+class UserQuery(BaseModel):
+    """
+    ユーザー検索の条件（IUserRepository.find_users に渡すクエリオブジェクト）。
+    指定された条件はすべてANDで結合する。
+    """
+
+    model_config = ConfigDict(frozen=True, defer_build=True)
+
+    # 名前の前方一致（大文字・小文字を区別する）
+    name_prefix: Optional[str] = Field(None, min_length=1)
+    # ニックネームの完全一致
+    nickname: Optional[str] = None
+    min_age: Optional[int] = Field(None, ge=0)
+    max_age: Optional[int] = Field(None, ge=0)
+    # 名前の全文検索（空白区切りの各語の前方一致）
+    search: Optional[str] = Field(None, pattern=r"\S")
+    order_by: Literal["id", "name", "age"] = "id"
+    descending: bool = False
+    limit: int = Field(100, ge=1)
+    # 前のページの最後のユーザーのid（キーセットページネーション）
+    after_id: Optional[int] = Field(None, ge=0)
+
+    @model_validator(mode="after")
+    def _check_age_range(self):
+        if self.min_age is not None and self.max_age is not None and self.min_age > self.max_age:
+            raise ValueError("min_age must be less than or equal to max_age")
+        return self
+
+    def has_filters(self) -> bool:
+        """
+        絞り込みや並び替えが指定されているかを返す。
+        指定がなければ get_users と同じ結果になる。
+        """
+        return (
+            self.name_prefix is not None
+            or self.nickname is not None
+            or self.min_age is not None
+            or self.max_age is not None
+            or self.search is not None
+            or self.order_by != "id"
+            or self.descending
+        )
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List, Optional, Tuple
+from application.ports.user_query import UserQuery
 from domain.user_domain import User
 
 
@@ -10,9 +11,57 @@ class IUserRepository(ABC):
     """
 
     @abstractmethod
-    def get_users(self, limit: int = 100) -> List[User]:
+    def get_users(self, limit: int = 100, after_id: Optional[int] = None) -> List[User]:
+        """
+        idの昇順で、after_idより後のユーザーを最大limit件返す（キーセットページネーション）。
+        """
         raise NotImplementedError
 
+    @abstractmethod
+    def find_users(self, query: UserQuery) -> List[User]:
+        """
+        条件に一致するユーザーを、指定された順序で最大query.limit件返す。
+        query.after_id を指定した場合は、そのユーザーの次から返す（並び順が同じ値の場合はidの順）。
+        id以外で並び替える場合、after_idのユーザーが存在しなければInvalidInputErrorを送出する。
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_users(self, after_id: Optional[int] = None, batch_size: int = 500) -> Iterator[User]:
+        """
+        idの昇順で、after_idより後のユーザーを1件ずつ返す。
+        全件をメモリに載せずにエクスポートするために使う。
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_version(self) -> int:
+        """
+        ユーザーテーブルが変更されるたびに増える版番号を返す。
+        一覧を読み込まずに変更有無を判定する（ETagなど）ために使う。
+        """
+        raise NotImplementedError
+
+    def get_users_page(
+        self, limit: int = 100, after_id: Optional[int] = None, query: Optional[UserQuery] = None
+    ) -> Tuple[int, List[User]]:
+        """
+        (版番号, 一覧) を返す。queryを指定した場合は find_users、それ以外は get_users の結果。
+        版番号は一覧より先に読むので、版番号が一覧より新しくなることはない（ETagに使う）。
+        """
+        version = self.get_version()
+        if query is not None:
+            return version, self.find_users(query)
+        return version, self.get_users(limit=limit, after_id=after_id)
+
     @abstractmethod
     def add_user(self, user: User) -> User:
         raise NotImplementedError
+
+    @abstractmethod
+    def add_users(self, users: List[User]) -> List[User]:
+        """
+        複数のユーザーを1つのトランザクションでまとめて追加し、idを設定して返す。
+        途中で失敗した場合はすべてロールバックされる。
+        """
+        raise NotImplementedError
@@ -0,0 +1,69 @@
+"""
+Flask標準のJSONプロバイダーと FastJSONProvider（orjson / pydantic_core）の比較。
+
+    python -m pytest benchmarks/bench_json_provider.py
+"""
+import pytest
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from application.ports.user_dto import UserResponse
+from utils.json_provider import FastJSONProvider
+
+
+ROWS = 1000
+
+
+def _make_app(provider_class):
+    app = Flask(__name__)
+    app.json = provider_class(app)
+    return app
+
+
+@pytest.fixture(scope="module")
+def user_responses():
+    return [UserResponse(id=i, name=f"user{i}", age=i % 100, nickname=f"nick{i}") for i in range(ROWS)]
+
+
+@pytest.fixture(scope="module")
+def error_body():
+    return {"error": "Validation Error", "details": [{"loc": ["age"], "msg": "Field required", "type": "missing"}]}
+
+
+@pytest.fixture(scope="module")
+def default_app():
+    app = _make_app(DefaultJSONProvider)
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture(scope="module")
+def fast_app():
+    app = _make_app(FastJSONProvider)
+    with app.app_context():
+        yield app
+
+
+def bench_default_provider_user_list(benchmark, default_app, user_responses):
+    # 標準のプロバイダーはモデルを扱えないので、辞書に変換してから渡す
+    benchmark(lambda: jsonify([user.model_dump() for user in user_responses]).get_data())
+
+
+def bench_fast_provider_user_list(benchmark, fast_app, user_responses):
+    benchmark(lambda: jsonify(user_responses).get_data())
+
+
+def bench_default_provider_single_user(benchmark, default_app, user_responses):
+    benchmark(lambda: jsonify(user_responses[0].model_dump()).get_data())
+
+
+def bench_fast_provider_single_user(benchmark, fast_app, user_responses):
+    benchmark(lambda: jsonify(user_responses[0]).get_data())
+
+
+def bench_default_provider_error_body(benchmark, default_app, error_body):
+    benchmark(lambda: jsonify(error_body).get_data())
+
+
+def bench_fast_provider_error_body(benchmark, fast_app, error_body):
+    benchmark(lambda: jsonify(error_body).get_data())
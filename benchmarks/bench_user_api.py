@@ -0,0 +1,82 @@
+"""
+ユーザーAPIのマイクロベンチマーク。
+
+    python -m pytest benchmarks [--benchmark-json=results.json]
+"""
+import sqlite3
+from unittest.mock import MagicMock
+
+import pytest
+from flask import Flask, jsonify
+
+from application.ports.user_dto import UserResponse, user_response_list_adapter
+from application.ports.user_repository_port import IUserRepository
+from domain.user_domain import User
+from infra.client.migrations import upgrade
+from infra.repository.user_repository import UserRepository
+from services.user_service import UserService
+
+
+ROWS = 1000
+
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("bench") / "bench.db")
+    conn = sqlite3.connect(path, isolation_level=None)
+    upgrade(conn)
+    conn.executemany(
+        "INSERT INTO user (name, age, nickname) VALUES (?, ?, ?)",
+        ((f"user{i}", i % 100, f"nick{i}" if i % 2 else None) for i in range(ROWS)),
+    )
+    conn.close()
+
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope="module")
+def users():
+    return [User(id=i, name=f"user{i}", age=i % 100, nickname=f"nick{i}") for i in range(ROWS)]
+
+
+@pytest.fixture(scope="module")
+def user_responses(users):
+    return [UserResponse(**user.model_dump()) for user in users]
+
+
+@pytest.fixture(scope="module")
+def app_context():
+    app = Flask(__name__)
+    with app.app_context():
+        yield
+
+
+def bench_repository_get_users(benchmark, db):
+    repository = UserRepository(db)
+    result = benchmark(repository.get_users, limit=ROWS)
+    assert len(result) == ROWS
+
+
+def bench_repository_get_users_page(benchmark, db):
+    repository = UserRepository(db)
+    result = benchmark(repository.get_users, limit=100, after_id=ROWS // 2)
+    assert len(result) == 100
+
+
+def bench_service_get_users_dto_conversion(benchmark, users):
+    repository = MagicMock(spec=IUserRepository)
+    repository.get_users.return_value = users
+    service = UserService(repository)
+    result = benchmark(service.get_users, limit=ROWS)
+    assert len(result) == ROWS
+
+
+def bench_jsonify_user_list(benchmark, app_context, user_responses):
+    benchmark(lambda: jsonify([user.model_dump() for user in user_responses]).get_data())
+
+
+def bench_type_adapter_dump_json_user_list(benchmark, user_responses):
+    benchmark(user_response_list_adapter.dump_json, user_responses)
@@ -0,0 +1,71 @@
+"""
+GET /users の読み込み経路（行 → ドメインモデル → DTO → JSON）のスループットを比較するベンチマーク。
+
+    python -m benchmarks.bench_user_read_path [行数]
+"""
+import sqlite3
+import sys
+import time
+
+from flask import Flask, jsonify
+
+from application.ports.user_dto import UserResponse, to_user_response, user_response_list_adapter
+from domain.user_domain import User
+from infra.repository.row_mapper import execute_for_mapping, map_rows
+
+
+QUERY = "SELECT id, name, age, nickname FROM user ORDER BY id"
+
+
+def create_database(rows: int):
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        "CREATE TABLE user (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, age INTEGER NOT NULL, nickname TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO user (name, age, nickname) VALUES (?, ?, ?)",
+        ((f"user{i}", i % 100, f"nick{i}" if i % 2 else None) for i in range(rows)),
+    )
+    conn.commit()
+    return conn
+
+
+def legacy_read_path(conn):
+    """変更前: 行ごとに3回の検証と3回の辞書コピーを行う"""
+    users = [User(**dict(row)) for row in conn.execute(QUERY).fetchall()]
+    dtos = [UserResponse.model_validate(user.model_dump()) for user in users]
+    return jsonify([dto.model_dump() for dto in dtos]).get_data()
+
+
+def fast_read_path(conn):
+    """変更後: 検証済みデータを再検証せず、直接JSONへシリアライズする"""
+    cursor = execute_for_mapping(conn, QUERY)
+    users = map_rows(cursor, User, cursor.fetchall())
+    dtos = [to_user_response(user) for user in users]
+    return user_response_list_adapter.dump_json(dtos)
+
+
+def measure(func, conn, rows: int, repeat: int = 5) -> float:
+    """最良の実行時間から rows/sec を返します。"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(conn)
+        best = min(best, time.perf_counter() - start)
+    return rows / best
+
+
+def main(rows: int = 10_000):
+    conn = create_database(rows)
+    app = Flask(__name__)
+    with app.app_context():
+        legacy = measure(legacy_read_path, conn, rows)
+        fast = measure(fast_read_path, conn, rows)
+    print(f"rows: {rows}")
+    print(f"legacy read path: {legacy:,.0f} rows/sec")
+    print(f"fast read path:   {fast:,.0f} rows/sec ({fast / legacy:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
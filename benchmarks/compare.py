@@ -0,0 +1,97 @@
+"""
+ベンチマーク結果をベースライン（benchmarks/baseline.json）と比較し、
+許容範囲を超えて遅くなっている場合は終了コード1で終了する（CI用）。
+
+    python -m pytest benchmarks --benchmark-json=bench.json
+    python -m benchmarks.load_test --json load.json
+    python -m benchmarks.compare bench.json load.json [--tolerance 0.25]
+    python -m benchmarks.compare bench.json load.json --update   # ベースラインを更新
+"""
+import argparse
+import json
+import os
+import sys
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def load_results(paths: list[str]) -> dict:
+    """
+    pytest-benchmark形式のJSONと負荷テストのJSONを読み込み、
+    {"benchmarks": {名前: 平均秒}, "load": {キー: 結果}} にまとめます。
+    """
+    results = {"benchmarks": {}, "load": {}}
+    for path in paths:
+        with open(path) as f:
+            data = json.load(f)
+        if "benchmarks" in data:
+            for bench in data["benchmarks"]:
+                results["benchmarks"][bench["name"]] = bench["stats"]["mean"]
+        elif "latency_ms" in data:
+            results["load"][load_key(data)] = {
+                "requests_per_second": data["requests_per_second"],
+                "p99_ms": data["latency_ms"]["p99"],
+            }
+    return results
+
+
+def load_key(result: dict) -> str:
+    return f"{result['method']} {result['path']} c={result['concurrency']}"
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list[str]:
+    """ベースラインより `tolerance` の割合を超えて悪化した項目を返します。"""
+    regressions = []
+    for name, mean in current["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if base is not None and mean > base * (1 + tolerance):
+            regressions.append(f"{name}: mean {mean * 1e6:.1f} us > baseline {base * 1e6:.1f} us")
+    for key, result in current["load"].items():
+        base = baseline.get("load", {}).get(key)
+        if base is None:
+            continue
+        if result["p99_ms"] > base["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{key}: p99 {result['p99_ms']:.2f} ms > baseline {base['p99_ms']:.2f} ms")
+        if result["requests_per_second"] < base["requests_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{key}: {result['requests_per_second']:.1f} req/s < baseline {base['requests_per_second']:.1f} req/s"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare benchmark results against the baseline.")
+    parser.add_argument("results", nargs="+", help="pytest-benchmark形式または負荷テストのJSON")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="許容する悪化の割合")
+    parser.add_argument("--update", action="store_true", help="結果でベースラインを更新する")
+    args = parser.parse_args(argv)
+
+    current = load_results(args.results)
+
+    if args.update:
+        baseline = {"benchmarks": {}, "load": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline["benchmarks"].update(current["benchmarks"])
+        baseline["load"].update(current["load"])
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(baseline, current, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No regressions.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+ベンチマーク用のpytest設定。
+
+pytest-benchmarkがインストールされている場合はその `benchmark` フィクスチャを使う。
+インストールされていない場合は、同じ呼び出し方ができる簡易版を提供する。
+どちらの場合も `--benchmark-json` で pytest-benchmark と同じ形式のJSONを出力できる。
+"""
+import json
+import statistics
+import time
+
+import pytest
+
+from utils.logging import setup_logging
+
+# 本番と同じロギング設定で計測する
+setup_logging()
+
+try:
+    import pytest_benchmark  # noqa: F401
+
+    HAS_PYTEST_BENCHMARK = True
+except ImportError:
+    HAS_PYTEST_BENCHMARK = False
+
+
+if not HAS_PYTEST_BENCHMARK:
+
+    def pytest_addoption(parser):
+        parser.addoption(
+            "--benchmark-json", default=None, help="ベンチマーク結果をJSONで保存するパス"
+        )
+        parser.addoption(
+            "--benchmark-min-time", type=float, default=0.2, help="1つのベンチマークの最小計測時間（秒）"
+        )
+
+    class Benchmark:
+        """pytest-benchmarkの `benchmark(func, *args, **kwargs)` と同じ使い方ができる簡易版。"""
+
+        def __init__(self, name: str, min_time: float, min_rounds: int = 5):
+            self.name = name
+            self.min_time = min_time
+            self.min_rounds = min_rounds
+            self.stats = None
+
+        def __call__(self, func, *args, **kwargs):
+            result = func(*args, **kwargs)  # ウォームアップ
+            timings = []
+            started = time.perf_counter()
+            while len(timings) < self.min_rounds or time.perf_counter() - started < self.min_time:
+                start = time.perf_counter()
+                result = func(*args, **kwargs)
+                timings.append(time.perf_counter() - start)
+            mean = statistics.fmean(timings)
+            self.stats = {
+                "min": min(timings),
+                "max": max(timings),
+                "mean": mean,
+                "median": statistics.median(timings),
+                "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+                "rounds": len(timings),
+                "ops": 1 / mean if mean else 0.0,
+            }
+            return result
+
+    _results = []
+
+    @pytest.fixture
+    def benchmark(request):
+        bench = Benchmark(request.node.name, request.config.getoption("--benchmark-min-time"))
+        yield bench
+        if bench.stats is not None:
+            _results.append({"name": request.node.name, "fullname": request.node.nodeid, "stats": bench.stats})
+
+    def pytest_terminal_summary(terminalreporter, config):
+        if not _results:
+            return
+        terminalreporter.section("benchmarks")
+        for result in _results:
+            stats = result["stats"]
+            terminalreporter.write_line(
+                f"{result['name']:<45} mean {stats['mean'] * 1e6:>10.1f} us  "
+                f"median {stats['median'] * 1e6:>10.1f} us  ops {stats['ops']:>10.1f}/s"
+            )
+
+    def pytest_sessionfinish(session):
+        path = session.config.getoption("--benchmark-json")
+        if path and _results:
+            with open(path, "w") as f:
+                json.dump({"benchmarks": _results}, f, indent=2)
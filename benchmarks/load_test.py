@@ -0,0 +1,177 @@
+"""
+Flaskアプリを実際のWSGIサーバー（werkzeugのスレッドサーバー）で起動し、
+一定の同時接続数でリクエストを送り続けて p50/p99 レイテンシと req/s を計測する負荷ツール。
+
+    python -m benchmarks.load_test --path /users --concurrency 8 --requests 2000
+    python -m benchmarks.load_test --url http://127.0.0.1:8000/users   # 起動済みのサーバーを計測
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class _KeepAliveRequestHandler(WSGIRequestHandler):
+    # HTTP/1.1で応答し、クライアントが接続を使い回せるようにする
+    protocol_version = "HTTP/1.1"
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class ServerThread:
+    """WSGIアプリをバックグラウンドスレッドのwerkzeugサーバーで起動する。"""
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0):
+        self.server = make_server(
+            host, port, app, threaded=True, request_handler=_KeepAliveRequestHandler
+        )
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server.host}:{self.server.port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.thread.join()
+
+
+def run_load(
+    url: str,
+    concurrency: int = 8,
+    requests: int = 1000,
+    method: str = "GET",
+    body: bytes | None = None,
+    headers: dict | None = None,
+) -> dict:
+    """
+    `concurrency` 個のクライアントスレッドで合計 `requests` 回のリクエストを送り、結果を集計します。
+    各クライアントはkeep-aliveの接続を使い回す。
+    """
+    parts = urlsplit(url)
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+    headers = dict(headers or {})
+    if body is not None:
+        headers.setdefault("Content-Type", "application/json")
+
+    lock = threading.Lock()
+    remaining = [requests]
+    latencies = []
+    status_counts = {}
+    errors = [0]
+
+    def client():
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+        local_latencies = []
+        local_statuses = {}
+        local_errors = 0
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                conn.request(method, target, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                local_statuses[response.status] = local_statuses.get(response.status, 0) + 1
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+                continue
+            local_latencies.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+            for status, count in local_statuses.items():
+                status_counts[status] = status_counts.get(status, 0) + count
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "url": url,
+        "path": target,
+        "method": method,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors[0],
+        "status_counts": {str(status): count for status, count in sorted(status_counts.items())},
+        "elapsed_seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p90": percentile(latencies, 90) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": (latencies[-1] if latencies else 0.0) * 1000,
+        },
+    }
+
+
+def format_report(result: dict) -> str:
+    latency = result["latency_ms"]
+    return (
+        f"{result['method']} {result['url']} (concurrency={result['concurrency']})\n"
+        f"  requests: {result['requests']}  errors: {result['errors']}  status: {result['status_counts']}\n"
+        f"  throughput: {result['requests_per_second']:.1f} req/s\n"
+        f"  latency: p50 {latency['p50']:.2f} ms  p90 {latency['p90']:.2f} ms  "
+        f"p99 {latency['p99']:.2f} ms  max {latency['max']:.2f} ms"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test for the user API.")
+    parser.add_argument("--url", help="起動済みのサーバーのURL。省略時はアプリをこのプロセス内で起動する")
+    parser.add_argument("--path", default="/users", help="--url を省略した場合に計測するパス")
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--body", help="リクエストボディ（JSON文字列）")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--json", dest="json_path", help="結果をJSONで保存するパス")
+    args = parser.parse_args(argv)
+
+    body = args.body.encode() if args.body else None
+    if args.url:
+        result = run_load(args.url, args.concurrency, args.requests, args.method, body)
+    else:
+        from app import app
+
+        with ServerThread(app) as server:
+            result = run_load(server.url + args.path, args.concurrency, args.requests, args.method, body)
+
+    print(format_report(result))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+アプリの起動時間（`import app` と create_app()）を新しいプロセスで計測し、
+`-X importtime` の結果をブループリントごと・パッケージごとに集計するツール。
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 5 --budget 1.5   # 中央値が予算（秒）を超えたら終了コード1
+    python -m benchmarks.startup --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 起動時間の予算（秒）。tests/test_startup.py でも使う。遅い環境では STARTUP_BUDGET で上書きする
+STARTUP_BUDGET = float(os.environ.get("STARTUP_BUDGET", "2.0"))
+
+_RESULT_PREFIX = "STARTUP_RESULT "
+
+# 計測用のプロセスで実行するスクリプト。ログ（標準出力）と区別するため、結果には接頭辞を付ける
+_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app({"DATABASE": sys.argv[1], "STATIC_WATCH": False})
+created = time.perf_counter()
+print(%r + json.dumps({
+    "import_seconds": imported - start,
+    "create_app_seconds": created - imported,
+    "blueprints": list(app.BLUEPRINTS),
+}), flush=True)
+""" % _RESULT_PREFIX
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """
+    `-X importtime` の出力を [{"module", "self_us", "cumulative_us", "depth"}] に変換します。
+    depth は import のネストの深さで、0 は計測したコードが直接importしたモジュール。
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        stripped = name.lstrip(" ")
+        entries.append(
+            {
+                "module": stripped.strip(),
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(name) - len(stripped) - 1) // 2,
+            }
+        )
+    return entries
+
+
+def aggregate(entries: list[dict], blueprints: list[str], top: int = 10) -> dict:
+    """
+    import時間を集計します。
+
+    - app_imports: `import app` の内訳（app.py が直接importしたモジュールの時間、多い順に top 件）
+    - blueprints: ブループリントのモジュールを読み込むのにかかった時間（登録順。先に読み込まれたモジュールは0）
+    - packages: トップレベルのパッケージごとの import 時間の合計（self、多い順に top 件）
+    """
+    roots = {entry["module"]: entry["cumulative_us"] for entry in entries if entry["depth"] == 0}
+    # 出力は子が親より先に並ぶので、"app" の直前までの深さ1のモジュールが app.py の直接のimport
+    app_imports, children = [], []
+    for entry in entries:
+        if entry["depth"] == 1:
+            children.append(entry)
+        elif entry["depth"] == 0:
+            if entry["module"] == "app":
+                app_imports = children
+            children = []
+    app_imports = sorted(app_imports, key=lambda entry: entry["cumulative_us"], reverse=True)[:top]
+    app_imports = [{"module": entry["module"], "import_ms": entry["cumulative_us"] / 1000} for entry in app_imports]
+
+    by_blueprint = []
+    seen = set()
+    for path in blueprints:
+        module = path.split(":")[0]
+        cost = 0 if module in seen else roots.get(module, 0)
+        seen.add(module)
+        by_blueprint.append({"blueprint": path, "import_ms": cost / 1000})
+
+    by_package = {}
+    for entry in entries:
+        package = entry["module"].split(".")[0]
+        by_package[package] = by_package.get(package, 0) + entry["self_us"]
+    packages = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "app_imports": app_imports,
+        "blueprints": by_blueprint,
+        "packages": [{"package": name, "import_ms": us / 1000} for name, us in packages],
+    }
+
+
+def measure_startup(python: str = sys.executable) -> dict:
+    """新しいプロセスでアプリを起動し、起動時間とimportの内訳を返します。"""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, LOG_ASYNC="false")
+        proc = subprocess.run(
+            [python, "-X", "importtime", "-c", _SCRIPT, os.path.join(tmp, "startup.db")],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    line = next(line for line in proc.stdout.splitlines() if line.startswith(_RESULT_PREFIX))
+    result = json.loads(line[len(_RESULT_PREFIX):])
+    result["total_seconds"] = result["import_seconds"] + result["create_app_seconds"]
+    result.update(aggregate(parse_importtime(proc.stderr), result["blueprints"]))
+    return result
+
+
+def format_report(result: dict) -> str:
+    lines = [
+        f"import app:   {result['import_seconds'] * 1000:8.1f} ms",
+        f"create_app(): {result['create_app_seconds'] * 1000:8.1f} ms",
+        f"total:        {result['total_seconds'] * 1000:8.1f} ms",
+        "imports by app.py (cumulative):",
+    ]
+    for item in result["app_imports"]:
+        lines.append(f"  {item['module']:<40} {item['import_ms']:8.1f} ms")
+    lines.append("imports by blueprint (cumulative):")
+    for item in result["blueprints"]:
+        lines.append(f"  {item['blueprint']:<40} {item['import_ms']:8.1f} ms")
+    lines.append("imports by package (self):")
+    for item in result["packages"]:
+        lines.append(f"  {item['package']:<40} {item['import_ms']:8.1f} ms")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure app startup time and import cost.")
+    parser.add_argument("--repeat", type=int, default=1, help="計測回数（合計時間は中央値で判定する）")
+    parser.add_argument("--budget", type=float, help="起動時間の予算（秒）。超えた場合は終了コード1")
+    parser.add_argument("--json", dest="json_path", help="結果をJSONで保存するパス")
+    args = parser.parse_args(argv)
+
+    results = [measure_startup() for _ in range(args.repeat)]
+    # 内訳は中央値に最も近い回のものを表示する
+    median = statistics.median(result["total_seconds"] for result in results)
+    result = min(results, key=lambda result: abs(result["total_seconds"] - median))
+    print(format_report(result))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.budget is not None and median > args.budget:
+        print(f"startup {median:.3f}s exceeds budget {args.budget:.3f}s", file=sys.stderr)
+        sys.exit(1)
+    return result
+
+
+if __name__ == "__main__":
+    main()
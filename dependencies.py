@@ -1,12 +1,174 @@
-from flask import g
-from infra.client.db_client import get_db
+import threading
+
+from flask import current_app, has_request_context, request
+from infra.cache.cache_backend import InMemoryCacheBackend
+from infra.cache.lru_ttl_cache import LRUTTLCache
+from infra.cache.tiered_cache import TieredCache
+from infra.client.db_client import (
+    get_backend,
+    get_db,
+    get_db_executor,
+    get_group_commit_writer,
+    get_pool,
+    get_read_db,
+    get_read_pool,
+)
+from infra.rate_limit.rate_limit_store import InMemoryRateLimitStore, RateLimitStore
+from infra.repository.cached_user_repository import (
+    CachedUserRepository,
+    deserialize_cache_value,
+    serialize_cache_value,
+)
+from infra.repository.group_commit_user_repository import GroupCommitUserRepository
+from infra.repository.postgres_user_repository import PostgresUserRepository
+from infra.repository.threaded_user_repository import ThreadedUserRepository
 from infra.repository.user_repository import UserRepository
+from services.async_user_service import AsyncUserService
 from services.user_service import UserService
+from utils.container import Container
+
+
+# 共有層のバックエンド。Redisなどを追加する場合はここに登録する
+CACHE_BACKENDS = {
+    "memory": InMemoryCacheBackend,
+}
+
+# レート制限のストア（RATE_LIMIT_STORE）。Redisなどを追加する場合はここに登録する
+RATE_LIMIT_STORES = {
+    "memory": InMemoryRateLimitStore,
+}
+
+# DBのバックエンド（DB_BACKEND）ごとの、コネクションからリポジトリを作るクラス
+USER_REPOSITORY_BACKENDS = {
+    "sqlite": UserRepository,
+    "postgres": PostgresUserRepository,
+}
+
+_cache_lock = threading.Lock()
+
+
+def get_user_cache() -> TieredCache:
+    """
+    プロセス全体で共有するユーザー一覧のキャッシュを返します（初回利用時に作成）。
+    """
+    app = current_app._get_current_object()
+    cache = app.extensions.get("user_cache")
+    if cache is None:
+        with _cache_lock:
+            cache = app.extensions.get("user_cache")
+            if cache is None:
+                backend_name = app.config.get("USER_CACHE_SHARED_BACKEND")
+                shared = CACHE_BACKENDS[backend_name]() if backend_name else None
+                cache = app.extensions["user_cache"] = TieredCache(
+                    LRUTTLCache(
+                        max_size=app.config.get("USER_CACHE_MAX_SIZE", 128),
+                        ttl=app.config.get("USER_CACHE_TTL", 5.0),
+                    ),
+                    shared=shared,
+                    shared_ttl=app.config.get("USER_CACHE_SHARED_TTL", 60.0),
+                    serialize=serialize_cache_value,
+                    deserialize=deserialize_cache_value,
+                )
+    return cache
+
+
+def _uses_group_commit() -> bool:
+    # グループコミットはSQLiteの書き込みロック向け（PostgreSQLは同時のコミットをサーバー側でまとめる）
+    return get_backend() == "sqlite" and current_app.config.get("DB_GROUP_COMMIT_ENABLED", False)
+
+
+def _is_read_only_request() -> bool:
+    """
+    リクエストのコネクションを読み込み専用（レプリカ）にできるかを返します。
+    GETのリクエストと、書き込みをライタースレッドが行う（グループコミットの）場合は読み込みしかしない。
+    """
+    if _uses_group_commit():
+        return True
+    return has_request_context() and request.method in ("GET", "HEAD")
+
+
+def _user_repository_factory():
+    """
+    コネクションから同期のリポジトリを作る関数を返します。
+    DB_BACKEND に応じた実装を使い、設定に応じて書き込みをグループコミットにし、読み込みをキャッシュで包む。
+    """
+    repository_class = USER_REPOSITORY_BACKENDS[get_backend()]
+    if _uses_group_commit():
+        writer = get_group_commit_writer()
+        timeout = current_app.config.get("DB_GROUP_COMMIT_TIMEOUT", 5.0)
+
+        def factory(conn):
+            return GroupCommitUserRepository(repository_class(conn), writer, timeout)
+    else:
+        factory = repository_class
+    if current_app.config.get("USER_CACHE_ENABLED", False):
+        cache = get_user_cache()
+        # 書き込み後にキャッシュを破棄するため、キャッシュは外側に置く
+        return lambda conn: CachedUserRepository(factory(conn), cache)
+    return factory
+
+
+def _db_connection(container: Container):
+    # リクエストのコネクション。ScopedProxy 経由で、最初のクエリの実行時に取得される
+    return get_read_db() if _is_read_only_request() else get_db()
+
+
+def _build_container() -> Container:
+    """
+    アプリケーションの依存関係を登録したコンテナを作ります。
+    サービスとリポジトリは状態を持たないのでプロセスで1つだけ作り、コネクションはリクエストごとに解決する。
+    """
+    container = Container()
+    container.request("db_connection", _db_connection)
+    container.singleton("user_repository_factory", lambda c: _user_repository_factory())
+    container.singleton(
+        "user_repository", lambda c: c.resolve("user_repository_factory")(c.proxy("db_connection"))
+    )
+    container.singleton("user_service", lambda c: UserService(c.resolve("user_repository")))
+    # 読み込みのプールはリクエスト（read-your-writesのCookie）によって変わるので、リクエストごとに作る
+    container.request("async_user_service", _async_user_service)
+    container.singleton(
+        "rate_limit_store", lambda c: RATE_LIMIT_STORES[current_app.config.get("RATE_LIMIT_STORE", "memory")]()
+    )
+    return container
+
+
+def get_container() -> Container:
+    """アプリケーションのDIコンテナを返します（初回利用時に作成）。"""
+    app = current_app._get_current_object()
+    container = app.extensions.get("container")
+    if container is None:
+        with _cache_lock:
+            container = app.extensions.get("container")
+            if container is None:
+                container = app.extensions["container"] = _build_container()
+    return container
+
+
+def get_user_service() -> UserService:
+    return get_container().resolve("user_service")
+
+
+def _async_user_service(container: Container) -> AsyncUserService:
+    read_pool = get_read_pool()
+    # グループコミットの場合、書き込みはライタースレッドが行うので書き込み用のコネクションを使わない
+    write_pool = read_pool if _uses_group_commit() else get_pool()
+    return AsyncUserService(
+        ThreadedUserRepository(
+            write_pool, get_db_executor(), container.resolve("user_repository_factory"), read_pool=read_pool
+        )
+    )
+
+
+def get_async_user_service() -> AsyncUserService:
+    """
+    非同期版のUserServiceを返します（/async 配下のルートで使う）。
+    リポジトリの呼び出しごとにプールからコネクションを借りるため、リクエストのコネクションは使わない。
+    読み込みは読み込み用のプール（レプリカ）、書き込みは書き込み用のプールのコネクションで行う。
+    """
+    return get_container().resolve("async_user_service")
 
 
-def get_user_service():
-    if "user_service" not in g:
-        db = get_db()
-        user_repository = UserRepository(db)
-        g.user_service = UserService(user_repository)
-    return g.user_service
+def get_rate_limit_store() -> RateLimitStore:
+    """レート制限のストアを返します（プロセスで1つ、初回利用時に作成）。"""
+    return get_container().resolve("rate_limit_store")
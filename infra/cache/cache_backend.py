@@ -0,0 +1,75 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+
+class CacheBackend(ABC):
+    """
+    複数プロセスで共有するキャッシュ層のインターフェース。
+    Redis/Memcachedなどの実装は、JSONにできる値（辞書・リストなど）だけを扱えばよい。
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        """このバックエンドが持つ（名前空間内の）すべてのキーを削除する。"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_generation(self) -> int:
+        """全プロセスで共有する世代番号を返す（未設定の場合は0）。"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def incr_generation(self) -> int:
+        """世代番号をアトミックに1つ進め、進めた後の値を返す（RedisのINCRなど）。"""
+        raise NotImplementedError
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    テストやローカル開発用の、プロセス内で完結する共有キャッシュ層の代替実装。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._generation = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_generation(self):
+        with self._lock:
+            return self._generation
+
+    def incr_generation(self):
+        with self._lock:
+            self._generation += 1
+            # キーには世代番号が含まれるので、既存の値はもう読まれない。期限切れを待たずに捨てる
+            self._entries.clear()
+            return self._generation
@@ -0,0 +1,105 @@
+import threading
+from typing import Any, Callable, Optional
+
+from infra.cache.cache_backend import CacheBackend
+from infra.cache.lru_ttl_cache import LRUTTLCache
+
+
+_MISSING = object()
+
+
+class TieredCache:
+    """
+    プロセス内のLRU+TTL層と、任意の共有層（CacheBackend）の2段構成のキャッシュ。
+
+    書き込み時は invalidate() で両方の層を破棄する。
+    読み込み中に invalidate() された場合、その読み込み結果は保存しない（世代番号で判定）。
+    共有層のキーには共有層の世代番号を含めるので、他プロセスが invalidate() の前に読み込んだ
+    古い値を後から書き込んでも、その値は読まれない。
+    他プロセスのプロセス内層は破棄できないため、その鮮度はTTLの範囲で保証される。
+    """
+
+    def __init__(
+        self,
+        local: LRUTTLCache,
+        shared: Optional[CacheBackend] = None,
+        shared_ttl: float = 60.0,
+        serialize: Callable[[Any], Any] = lambda value: value,
+        deserialize: Callable[[Any], Any] = lambda data: data,
+    ):
+        self.local = local
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key) -> Optional[Any]:
+        """
+        キャッシュされた値を返します。どの層にもない場合はNone。
+        """
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        if self.shared is not None:
+            generation = self.current_generation()
+            data = self.shared.get(self._shared_key(generation[1], key))
+            if data is not None:
+                value = self.deserialize(data)
+                with self._lock:
+                    if generation[0] == self._generation:
+                        self.local.set(key, value)
+                self.shared_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def current_generation(self) -> tuple[int, int]:
+        """
+        読み込みを開始する前に呼び、set() に渡す世代番号を返します。
+        (プロセス内の世代番号, 共有層の世代番号) の組。
+        """
+        local_generation = self._generation
+        shared_generation = self.shared.get_generation() if self.shared is not None else 0
+        return local_generation, shared_generation
+
+    def set(self, key, value, generation: tuple[int, int]):
+        """
+        読み込みを開始した時点の世代番号（current_generation()）が現在と同じ場合のみ、値を保存します。
+        共有層には読み込み開始時の共有層の世代番号のキーで保存する。他のプロセスで
+        その後に invalidate() されていれば、そのキーはもう読まれない。
+        """
+        local_generation, shared_generation = generation
+        with self._lock:
+            if local_generation != self._generation:
+                return
+            self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set(self._shared_key(shared_generation, key), self.serialize(value), self.shared_ttl)
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self.local.clear()
+        if self.shared is not None:
+            # 古い世代のキーは読まれなくなり、TTLで消える
+            self.shared.incr_generation()
+
+    def stats(self) -> dict:
+        return {
+            "local": self.local.stats(),
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+    @staticmethod
+    def _shared_key(shared_generation: int, key) -> str:
+        return ":".join(str(part) for part in (shared_generation, *key))
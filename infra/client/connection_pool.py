@@ -0,0 +1,191 @@
+import os
+import sqlite3
+from urllib.parse import quote
+import threading
+import time
+from collections import deque
+
+from application.exceptions import DatabaseUnavailableError
+from utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class ConnectionPool:
+    """
+    SQLiteコネクションのスレッドセーフなプール。
+
+    - 同時に貸し出すコネクション数は `max_size` までに制限する
+    - 空きがない場合は `timeout` 秒まで待ち、超えたら DatabaseUnavailableError を送出する
+    - 一定時間使われていなかったコネクションは貸し出し前に `SELECT 1` で疎通確認する
+    - PRAGMAはコネクション作成時に1回だけ設定する
+    - `read_only=True` の場合はURIモード（mode=ro）で開き、`query_only` を設定する（読み込み専用のプール）
+
+    コネクションはスレッド間で受け渡されるため `check_same_thread=False` で作成するが、
+    同時に利用するのは借りているスレッドだけである。
+    """
+
+    def __init__(
+        self,
+        database: str,
+        max_size: int = 10,
+        timeout: float = 5.0,
+        health_check_interval: float = 30.0,
+        pragmas: dict | None = None,
+        on_connect=None,
+        read_only: bool = False,
+    ):
+        self.database = database
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.pragmas = pragmas or {}
+        # コネクション作成時に呼び出す関数（trace callbackの登録など）
+        self.on_connect = on_connect
+        self.read_only = read_only
+        self.pid = os.getpid()
+
+        self._cond = threading.Condition()
+        # (コネクション, 最終利用時刻)。直近に返却されたものから使う（LIFO）
+        self._idle = deque()
+        self._size = 0
+        self._in_use = 0
+        self._creations = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._health_check_failures = 0
+
+    def connect(self):
+        """
+        プールの設定（PRAGMAなど）で新しいコネクションを作ります。
+        プールでは管理しないので、専用のコネクションとして使い、呼び出し側で閉じる。
+        """
+        if self.read_only:
+            uri = f"file:{quote(os.path.abspath(self.database))}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.database, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        if self.read_only:
+            # 誤って書き込むSQLを実行した場合もエラーにする
+            conn.execute("PRAGMA query_only=ON")
+        if self.on_connect is not None:
+            self.on_connect(conn)
+        return conn
+
+    def _is_healthy(self, conn) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        self._discard_slot()
+
+    def acquire(self):
+        """
+        プールからコネクションを借ります。
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn = None
+            with self._cond:
+                waited = False
+                while not self._idle and self._size >= self.max_size:
+                    if not waited:
+                        self._waits += 1
+                        waited = True
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        logger.warning(
+                            "Connection pool checkout timed out",
+                            timeout=self.timeout,
+                            max_size=self.max_size,
+                        )
+                        raise DatabaseUnavailableError()
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                else:
+                    # 作成は時間がかかるのでロックの外で行い、枠だけ確保しておく
+                    self._size += 1
+                    last_used = None
+                self._in_use += 1
+
+            if conn is None:
+                try:
+                    conn = self.connect()
+                except Exception:
+                    with self._cond:
+                        self._in_use -= 1
+                    self._discard_slot()
+                    raise
+                with self._cond:
+                    self._creations += 1
+                return conn
+
+            if time.monotonic() - last_used < self.health_check_interval or self._is_healthy(conn):
+                return conn
+
+            logger.warning("Discarding unhealthy pooled connection")
+            with self._cond:
+                self._in_use -= 1
+                self._health_check_failures += 1
+            self._discard(conn)
+
+    def release(self, conn):
+        """
+        コネクションをプールに返却します。未完了のトランザクションはロールバックする。
+        """
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            with self._cond:
+                self._in_use -= 1
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close(self):
+        """
+        待機中のコネクションをすべて閉じます。貸し出し中のものは返却時にプールへ戻る。
+        """
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+        for conn, _ in idle:
+            conn.close()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "creations": self._creations,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "health_check_failures": self._health_check_failures,
+            }
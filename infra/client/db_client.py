@@ -1,51 +1,280 @@
+import math
+import os
 import sqlite3
-from flask import Blueprint, g
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import click
+from flask import Blueprint, current_app, g, has_request_context, request
 
-db_bp = Blueprint("db_bp", __name__)
+from infra.client.connection_pool import ConnectionPool
+from infra.client.group_commit_writer import GroupCommitWriter
+from infra.client import migrations, postgres_migrations
+from infra.client.postgres_client import PostgresConnectionPool, require_psycopg
+from infra.client.replica_router import ReplicaRouter
+from utils.metrics import count_db_query
+from utils.profiling import record_sql_statement
+
+
+db_bp = Blueprint("db_bp", __name__, cli_group="db")
 
 DATABASE = "database.db"
 
+# クライアントが最後に書き込んだ時刻（UNIX時間）を保持するCookie（read-your-writes用）
+LAST_WRITE_COOKIE = "db_last_write"
+
+# 書き込みを伴わないHTTPメソッド
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def _database_path():
+    return current_app.config.get("DATABASE", DATABASE)
+
+
+def get_backend(config=None) -> str:
+    """設定されたDBのバックエンド（"sqlite" または "postgres"）を返します。"""
+    config = current_app.config if config is None else config
+    return config.get("DB_BACKEND", "sqlite")
+
+
+_pool_lock = threading.Lock()
+
+
+def _trace_statement(statement):
+    count_db_query(statement)
+    record_sql_statement(statement)
+
+
+def _on_connect(conn):
+    # 実行されたSQL文をリクエストごとに数え（メトリクス用）、プロファイル中のリクエストでは記録する
+    conn.set_trace_callback(_trace_statement)
+
+
+def _create_pool(app, read_only: bool = False, dsn: str | None = None):
+    # 書き込み用は DB_WRITE_POOL_SIZE（SQLiteは書き込みが1つずつなので1）、読み込み用は DB_POOL_SIZE
+    max_size = app.config.get("DB_POOL_SIZE", 10) if read_only else app.config.get("DB_WRITE_POOL_SIZE", 1)
+    if get_backend(app.config) == "postgres":
+        return PostgresConnectionPool(
+            dsn or app.config["POSTGRES_DSN"],
+            min_size=min(app.config.get("POSTGRES_POOL_MIN_SIZE", 1), max_size),
+            max_size=max_size,
+            timeout=app.config.get("DB_POOL_TIMEOUT", 5.0),
+            read_only=read_only,
+        )
+    pragmas = dict(app.config.get("DB_PRAGMAS") or {})
+    if read_only:
+        # ジャーナルモードの変更は書き込みになるので、書き込み用のコネクションで設定する
+        pragmas.pop("journal_mode", None)
+    return ConnectionPool(
+        app.config.get("DATABASE", DATABASE),
+        max_size=max_size,
+        timeout=app.config.get("DB_POOL_TIMEOUT", 5.0),
+        health_check_interval=app.config.get("DB_POOL_HEALTH_CHECK_INTERVAL", 30.0),
+        pragmas=pragmas,
+        on_connect=_on_connect,
+        read_only=read_only,
+    )
+
+
+def _replica_dsns(config) -> list[str]:
+    if get_backend(config) != "postgres":
+        return []
+    return [dsn.strip() for dsn in config.get("POSTGRES_REPLICA_DSNS", "").split(",") if dsn.strip()]
+
+
+def _read_your_writes_window(config) -> float:
+    # レプリカは遅れて反映されるので、書き込み直後の読み込みはプライマリに送る
+    # レプリカがない場合（プライマリへの読み込み専用のコネクション）は反映の遅れがない
+    if _replica_dsns(config):
+        return config.get("DB_READ_YOUR_WRITES_WINDOW", 5.0)
+    return 0.0
+
+
+def _create_replica_router(app, primary) -> ReplicaRouter:
+    router_class = app.config.get("DB_REPLICA_ROUTER") or ReplicaRouter
+    dsns = _replica_dsns(app.config)
+    if dsns:
+        replicas = [_create_pool(app, read_only=True, dsn=dsn) for dsn in dsns]
+    else:
+        replicas = [_create_pool(app, read_only=True)]
+    return router_class(primary, replicas, _read_your_writes_window(app.config))
+
+
+def get_pool() -> ConnectionPool | PostgresConnectionPool:
+    """
+    アプリケーションごとの書き込み用（プライマリ）のコネクションプールを返します（DB_BACKEND に応じてSQLiteかPostgreSQL）。
+    初回利用時に作成するため、fork前にコネクションが開かれることはない。
+    """
+    app = current_app._get_current_object()
+    pool = app.extensions.get("db_pool")
+    # fork後の子プロセスでは親のプールを使わずに作り直す
+    if pool is None or pool.pid != os.getpid():
+        with _pool_lock:
+            pool = app.extensions.get("db_pool")
+            if pool is None or pool.pid != os.getpid():
+                pool = app.extensions["db_pool"] = _create_pool(app)
+    return pool
+
+
+def get_replica_router() -> ReplicaRouter:
+    """
+    読み込み用のプールを選ぶルーターを返します（初回利用時に作成）。
+    SQLiteの場合は読み込み専用（mode=ro）のプール、PostgreSQLの場合はレプリカ（POSTGRES_REPLICA_DSNS）に振り分ける。
+    """
+    app = current_app._get_current_object()
+    primary = get_pool()
+    router = app.extensions.get("db_replica_router")
+    # プライマリのプールが作り直された（fork後の）場合は、読み込み用のプールも作り直す
+    if router is None or router.primary is not primary:
+        with _pool_lock:
+            router = app.extensions.get("db_replica_router")
+            if router is None or router.primary is not primary:
+                router = app.extensions["db_replica_router"] = _create_replica_router(app, primary)
+    return router
+
 
-# リクエストごとにDBコネクション
+def last_write_at() -> float | None:
+    """このクライアントが最後に書き込んだ時刻（Cookie）を返します。"""
+    if not has_request_context():
+        return None
+    try:
+        return float(request.cookies[LAST_WRITE_COOKIE])
+    except (KeyError, ValueError):
+        return None
+
+
+def get_read_pool():
+    """このリクエストの読み込みに使うプールを返します（書き込み直後はプライマリ）。"""
+    return get_replica_router().read_pool(last_write_at())
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """
+    非同期のリポジトリがDBアクセスを実行するスレッドプールを返します（初回利用時に作成）。
+    スレッド数はコネクションプールと同じにし、コネクションの取得待ちでスレッドが塞がらないようにする。
+    """
+    app = current_app._get_current_object()
+    executor = app.extensions.get("db_executor")
+    # スレッドはforkで引き継がれないので、子プロセスでは作り直す
+    if executor is None or executor.pid != os.getpid():
+        with _pool_lock:
+            executor = app.extensions.get("db_executor")
+            if executor is None or executor.pid != os.getpid():
+                executor = app.extensions["db_executor"] = ThreadPoolExecutor(
+                    max_workers=app.config.get("DB_POOL_SIZE", 10),
+                    thread_name_prefix="db",
+                )
+                executor.pid = os.getpid()
+    return executor
+
+
+def get_group_commit_writer() -> GroupCommitWriter:
+    """
+    書き込みをまとめてコミットするライターを返します（初回利用時に作成）。
+    書き込み用のコネクションはプールと同じ設定で専用に作成する。
+    """
+    app = current_app._get_current_object()
+    writer = app.extensions.get("db_group_commit_writer")
+    # ライターのスレッドはforkで引き継がれないので、子プロセスでは作り直す
+    if writer is None or writer.pid != os.getpid():
+        pool = get_pool()
+        with _pool_lock:
+            writer = app.extensions.get("db_group_commit_writer")
+            if writer is None or writer.pid != os.getpid():
+                writer = app.extensions["db_group_commit_writer"] = GroupCommitWriter(
+                    pool,
+                    max_batch_size=app.config.get("DB_GROUP_COMMIT_MAX_BATCH_SIZE", 128),
+                    max_delay=app.config.get("DB_GROUP_COMMIT_MAX_DELAY", 0.002),
+                )
+    return writer
+
+
+# リクエストごとにプールから書き込み用のDBコネクションを借りる
 def get_db():
     db = getattr(g, "_database", None)
     if db is None:
-        db = g._database = sqlite3.connect(DATABASE)
-        db.row_factory = sqlite3.Row
+        db = g._database = get_pool().acquire()
+    return db
+
+
+# リクエストごとに読み込み用のDBコネクションを借りる（GETのリクエストで使う）
+def get_read_db():
+    db = getattr(g, "_read_database", None)
+    if db is None:
+        pool = get_read_pool()
+        db = g._read_database = pool.acquire()
+        g._read_database_pool = pool
     return db
 
 
-@db_bp.teardown_app_request
+# リクエスト終了時（アプリケーションコンテキスト終了時）にコネクションをプールへ返却する
 def close_connection(exception):
-    conn = getattr(g, "_database", None)
+    conn = g.pop("_database", None)
     if conn is not None:
-        conn.close()
+        get_pool().release(conn)
+    conn = g.pop("_read_database", None)
+    if conn is not None:
+        g.pop("_read_database_pool").release(conn)
 
 
-# テスト用に初回リクエスト時にテーブルを作成
-@db_bp.before_app_request
-def init_db():
-    conn = get_db()
-    # テーブル作成
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS user (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            age INTEGER NOT NULL,
-            nickname TEXT
-        )
-    """)
-
-    # userがいない場合、テストユーザーを作成
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM user")
-    user_count = cursor.fetchone()[0]
-
-    if user_count == 0:
-        conn.execute("INSERT INTO user (name, age) VALUES (?, ?)", ("test", 20))
-        conn.execute(
-            "INSERT INTO user (name, age, nickname) VALUES (?, ?, ?)",
-            ("test2", 22, "2"),
+@db_bp.record_once
+def _register_teardown(state):
+    state.app.teardown_appcontext(close_connection)
+
+
+@db_bp.after_app_request
+def _remember_last_write(response):
+    """
+    書き込みが成功したリクエストでは、書き込んだ時刻をCookieに記録する。
+    以降 DB_READ_YOUR_WRITES_WINDOW 秒間、そのクライアントの読み込みはプライマリで行う。
+    """
+    if request.method in _SAFE_METHODS or response.status_code >= 400:
+        return response
+    window = get_replica_router().read_your_writes_window
+    if window > 0:
+        response.set_cookie(
+            LAST_WRITE_COOKIE, f"{time.time():.3f}", max_age=math.ceil(window), httponly=True, samesite="Lax"
         )
-        conn.commit()
+    return response
+
+
+def init_db(app):
+    """
+    アプリケーション起動時に1回だけスキーマを準備します。
+    リクエスト処理中はスキーマ関連の処理を一切行いません。
+    """
+    if app.config.get("AUTO_MIGRATE", True):
+        _run_migrations(app.config)
+
+
+def _run_migrations(config) -> list[int]:
+    if get_backend(config) == "postgres":
+        return postgres_migrations.run_migrations(config["POSTGRES_DSN"])
+    return migrations.run_migrations(config.get("DATABASE", DATABASE))
+
+
+@db_bp.cli.command("upgrade")
+def upgrade_command():
+    """未適用のマイグレーションを適用します。"""
+    applied = _run_migrations(current_app.config)
+    if applied:
+        click.echo(f"Applied migrations: {', '.join(str(v) for v in applied)}")
+    else:
+        click.echo("Database is up to date.")
+
+
+@db_bp.cli.command("version")
+def version_command():
+    """現在のスキーマバージョンを表示します。"""
+    if get_backend() == "postgres":
+        psycopg = require_psycopg()
+        conn = psycopg.connect(current_app.config["POSTGRES_DSN"], autocommit=True)
+        get_schema_version = postgres_migrations.get_schema_version
+    else:
+        conn = sqlite3.connect(_database_path())
+        get_schema_version = migrations.get_schema_version
+    try:
+        click.echo(get_schema_version(conn))
+    finally:
+        conn.close()
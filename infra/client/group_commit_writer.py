@@ -0,0 +1,180 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import NamedTuple
+
+from infra.client.connection_pool import ConnectionPool
+from utils.logging import get_logger
+from utils.metrics import REGISTRY
+
+
+logger = get_logger(__name__)
+
+# 1回のコミットにまとめた書き込みの件数
+group_commit_batch_size = REGISTRY.histogram(
+    "db_group_commit_batch_size",
+    "Number of writes committed together by the group commit writer.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+
+_STOP = object()
+
+
+class _Write(NamedTuple):
+    sql: str
+    # many=Trueの場合はパラメータのリスト
+    params: object
+    many: bool
+    future: Future
+
+
+class GroupCommitWriter:
+    """
+    書き込み（INSERT）を1つのバックグラウンドスレッドに集め、まとめてコミットするライター（グループコミット）。
+
+    SQLiteは書き込みロックが1つしかなく、コミットごとにfsyncするため、
+    同時に来た書き込みを1件ずつコミットすると書き込みロックの待ちとfsyncで直列になる。
+    このライターは、最初の書き込みから max_delay 秒以内（最大 max_batch_size 件）に届いた書き込みを
+    1つのトランザクションで実行し、コミット後にそれぞれのFutureへ新しいidを返す。
+
+    - 書き込みごとにSAVEPOINTを作るので、制約違反などで失敗した書き込みだけがエラーになる
+    - コミットに失敗した場合は、そのバッチのすべての書き込みがエラーになる
+    - Futureはコミットが完了してから解決するので、呼び出し側に返したidは永続化されている
+
+    書き込み用のコネクションはプールと同じ設定で専用に作成し、スレッドの終了（close()）まで保持する。
+    プールから借りないので、リクエストがプールを使い切っていても書き込みは止まらない。
+    """
+
+    def __init__(self, pool: ConnectionPool, max_batch_size: int = 128, max_delay: float = 0.002):
+        self.pool = pool
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.pid = os.getpid()
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def _submit(self, sql: str, params, many: bool) -> Future:
+        future = Future()
+        # close() の後に登録された書き込みが処理されずに残らないよう、ロックの中で積む
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("GroupCommitWriter is closed.")
+            if self._thread is None:
+                # スレッドは初回の書き込み時に開始する（fork前に開始しない）
+                self._thread = threading.Thread(target=self._run, name="db-group-commit", daemon=True)
+                self._thread.start()
+            self._queue.put(_Write(sql, params, many, future))
+        return future
+
+    def submit(self, sql: str, params=()) -> Future:
+        """
+        INSERT文を1つ登録します。コミット後、Futureは挿入した行のidで解決される。
+        """
+        return self._submit(sql, params, many=False)
+
+    def submit_many(self, sql: str, seq_of_params: list) -> Future:
+        """
+        同じINSERT文を複数のパラメータで実行します（executemany）。
+        同じトランザクション内で連続して挿入するので、Futureは連番のidのリストで解決される。
+        """
+        return self._submit(sql, list(seq_of_params), many=True)
+
+    def _collect(self, first) -> tuple[list, bool]:
+        batch = [first]
+        stop = False
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    # 待ち時間を過ぎても、すでに届いているものはまとめる
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+        return batch, stop
+
+    def _run(self):
+        conn = None
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                batch, stop = self._collect(item)
+                # キャンセルされた書き込みは実行しない
+                batch = [write for write in batch if write.future.set_running_or_notify_cancel()]
+                if batch:
+                    try:
+                        if conn is None:
+                            conn = self.pool.connect()
+                        self._commit(conn, batch)
+                    except Exception as e:
+                        logger.error("Group commit failed", batch_size=len(batch), exc_info=e)
+                        for write in batch:
+                            if not write.future.done():
+                                write.future.set_exception(e)
+                if stop:
+                    break
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _execute(self, conn, write: _Write):
+        if write.many:
+            if not write.params:
+                return []
+            conn.executemany(write.sql, write.params)
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            first_id = last_id - len(write.params) + 1
+            return list(range(first_id, last_id + 1))
+        return conn.execute(write.sql, write.params).lastrowid
+
+    def _commit(self, conn, batch: list[_Write]):
+        results = []
+        # 書き込みロックを先に取得し、他の書き込みが割り込まないようにする
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for write in batch:
+                conn.execute("SAVEPOINT group_commit_write")
+                try:
+                    result = self._execute(conn, write)
+                except sqlite3.Error as e:
+                    # この書き込みだけを取り消し、残りはそのままコミットする
+                    conn.execute("ROLLBACK TO group_commit_write")
+                    conn.execute("RELEASE group_commit_write")
+                    write.future.set_exception(e)
+                    continue
+                conn.execute("RELEASE group_commit_write")
+                results.append((write, result))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        group_commit_batch_size.observe(len(batch))
+        for write, result in results:
+            write.future.set_result(result)
+
+    def close(self, timeout: float | None = None):
+        """
+        登録済みの書き込みをコミットしてからスレッドを終了します。
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join(timeout)
@@ -0,0 +1,179 @@
+import sqlite3
+from datetime import datetime, timezone
+
+from utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+# (バージョン, 説明, SQL文のリスト)
+# 追記のみとし、適用済みのマイグレーションは変更しないこと
+MIGRATIONS = [
+    (
+        1,
+        "create user table",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS user (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                age INTEGER NOT NULL,
+                nickname TEXT
+            )
+            """,
+        ],
+    ),
+    (
+        2,
+        "seed test users",
+        [
+            # userがいない場合のみ、テストユーザーを作成
+            """
+            INSERT INTO user (name, age, nickname)
+            SELECT name, age, nickname FROM (
+                SELECT 'test' AS name, 20 AS age, NULL AS nickname
+                UNION ALL
+                SELECT 'test2', 22, '2'
+            )
+            WHERE NOT EXISTS (SELECT 1 FROM user)
+            """,
+        ],
+    ),
+    (
+        3,
+        "add table version counter for user",
+        [
+            # テーブルが変更されるたびに増える版番号（ETagの生成に使う）
+            """
+            CREATE TABLE IF NOT EXISTS table_version (
+                name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+            """,
+            "INSERT OR IGNORE INTO table_version (name, version) VALUES ('user', 0)",
+            """
+            CREATE TRIGGER IF NOT EXISTS user_version_after_insert AFTER INSERT ON user
+            BEGIN
+                UPDATE table_version SET version = version + 1 WHERE name = 'user';
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS user_version_after_update AFTER UPDATE ON user
+            BEGIN
+                UPDATE table_version SET version = version + 1 WHERE name = 'user';
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS user_version_after_delete AFTER DELETE ON user
+            BEGIN
+                UPDATE table_version SET version = version + 1 WHERE name = 'user';
+            END
+            """,
+        ],
+    ),
+    (
+        4,
+        "add user search indexes and name full-text search",
+        [
+            # 絞り込み・並び替え用のインデックス（rowidを含むので、idとの複合キーとしても使える）
+            "CREATE INDEX IF NOT EXISTS idx_user_name ON user (name)",
+            "CREATE INDEX IF NOT EXISTS idx_user_nickname ON user (nickname)",
+            "CREATE INDEX IF NOT EXISTS idx_user_age ON user (age)",
+            # 名前の全文検索。本文はuserテーブルを参照し（external content）、索引のみを持つ
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS user_fts USING fts5(
+                name, content='user', content_rowid='id'
+            )
+            """,
+            "INSERT INTO user_fts (user_fts) VALUES ('rebuild')",
+            """
+            CREATE TRIGGER IF NOT EXISTS user_fts_after_insert AFTER INSERT ON user
+            BEGIN
+                INSERT INTO user_fts (rowid, name) VALUES (new.id, new.name);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS user_fts_after_update AFTER UPDATE OF name ON user
+            BEGIN
+                INSERT INTO user_fts (user_fts, rowid, name) VALUES ('delete', old.id, old.name);
+                INSERT INTO user_fts (rowid, name) VALUES (new.id, new.name);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS user_fts_after_delete AFTER DELETE ON user
+            BEGIN
+                INSERT INTO user_fts (user_fts, rowid, name) VALUES ('delete', old.id, old.name);
+            END
+            """,
+        ],
+    ),
+]
+
+
+def _ensure_version_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    """)
+
+
+def get_schema_version(conn) -> int:
+    """
+    適用済みの最新スキーマバージョンを返します。未適用の場合は0。
+    """
+    _ensure_version_table(conn)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def upgrade(conn) -> list[int]:
+    """
+    未適用のマイグレーションを順番に適用します。
+
+    各マイグレーションは `BEGIN IMMEDIATE` のトランザクション内で適用するため、
+    複数のワーカーが同時に起動しても二重に適用されることはありません。
+
+    Args:
+        conn: autocommitモード（isolation_level=None）のsqlite3コネクション。
+
+    Returns:
+        今回適用したバージョンのリスト。
+    """
+    _ensure_version_table(conn)
+    applied = []
+    for version, description, statements in MIGRATIONS:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # ロック取得後に再確認する（他プロセスが適用済みの場合がある）
+            if get_schema_version(conn) >= version:
+                conn.execute("ROLLBACK")
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (version, description, datetime.now(timezone.utc).isoformat()),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            logger.error("Migration failed", version=version, description=description, exc_info=True)
+            raise
+        logger.info("Migration applied", version=version, description=description)
+        applied.append(version)
+    return applied
+
+
+def run_migrations(database: str) -> list[int]:
+    """
+    専用のコネクションを開いてマイグレーションを適用し、コネクションを閉じます。
+    """
+    conn = sqlite3.connect(database, isolation_level=None)
+    try:
+        return upgrade(conn)
+    finally:
+        conn.close()
@@ -0,0 +1,122 @@
+import os
+
+from application.exceptions import DatabaseUnavailableError
+from utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+# (psycopg, psycopg_pool)。importは初回利用時に行う
+_modules = None
+
+
+def _import_psycopg():
+    """
+    psycopgは任意の依存（DB_BACKEND=postgres の場合のみ必要）。
+    importに時間がかかる（0.1秒程度）ため、SQLiteで起動する場合はimportしない。
+    インストールされていない場合は (None, None) を返します。
+    """
+    global _modules
+    if _modules is None:
+        try:
+            import psycopg
+            import psycopg_pool
+        except ImportError:
+            _modules = (None, None)
+        else:
+            _modules = (psycopg, psycopg_pool)
+    return _modules
+
+
+def require_psycopg():
+    psycopg, _ = _import_psycopg()
+    if psycopg is None:
+        raise RuntimeError(
+            "DB_BACKEND=postgres requires psycopg. Install it with `pip install \"psycopg[binary,pool]\"`."
+        )
+    return psycopg
+
+
+def __getattr__(name):
+    # `from infra.client.postgres_client import psycopg` で、初めて参照したときにimportする（未インストールならNone）
+    if name == "psycopg":
+        return _import_psycopg()[0]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class PostgresConnectionPool:
+    """
+    psycopg_pool のコネクションプールを、ConnectionPool（SQLite）と同じインターフェースで包みます。
+    acquire() / release() / close() / stats() を持つので、get_db() や ThreadedUserRepository からは区別なく使える。
+
+    コネクションはautocommitで作成する。読み込みのたびにトランザクションを開始・終了しないため、
+    書き込みやサーバーサイドカーソルはリポジトリ側で明示的にトランザクションを開始する。
+    `read_only=True` の場合は default_transaction_read_only を有効にし、書き込みをエラーにする。
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 5.0,
+        on_connect=None,
+        read_only: bool = False,
+    ):
+        self._psycopg = require_psycopg()
+        psycopg_pool = _import_psycopg()[1]
+        self._pool_timeout = psycopg_pool.PoolTimeout
+        self.dsn = dsn
+        self.max_size = max_size
+        self.timeout = timeout
+        self.read_only = read_only
+        self.pid = os.getpid()
+        self._timeouts = 0
+
+        def configure(conn):
+            conn.autocommit = True
+            if on_connect is not None:
+                on_connect(conn)
+
+        self._pool = psycopg_pool.ConnectionPool(
+            dsn,
+            min_size=min_size,
+            max_size=max_size,
+            timeout=timeout,
+            kwargs={"options": "-c default_transaction_read_only=on"} if read_only else None,
+            configure=configure,
+            name="users",
+            open=True,
+        )
+
+    def connect(self):
+        """プールでは管理しない、専用のコネクションを作ります（呼び出し側で閉じる）。"""
+        return self._psycopg.connect(self.dsn, autocommit=True)
+
+    def acquire(self):
+        try:
+            return self._pool.getconn()
+        except self._pool_timeout:
+            self._timeouts += 1
+            logger.warning("Connection pool checkout timed out", timeout=self.timeout, max_size=self.max_size)
+            raise DatabaseUnavailableError()
+
+    def release(self, conn):
+        # 未完了のトランザクションはpsycopg_poolが返却時にロールバックする
+        self._pool.putconn(conn)
+
+    def close(self):
+        self._pool.close()
+
+    def stats(self) -> dict:
+        stats = self._pool.get_stats()
+        return {
+            "max_size": self.max_size,
+            "size": stats.get("pool_size", 0),
+            "in_use": stats.get("pool_size", 0) - stats.get("pool_available", 0),
+            "idle": stats.get("pool_available", 0),
+            "creations": stats.get("connections_num", 0),
+            "waits": stats.get("requests_queued", 0),
+            "timeouts": self._timeouts,
+            "health_check_failures": stats.get("connections_lost", 0),
+        }
@@ -0,0 +1,144 @@
+from datetime import datetime, timezone
+
+from infra.client.postgres_client import require_psycopg
+from utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+# 同時に起動した複数のワーカーがマイグレーションを二重に適用しないためのアドバイザリーロックのキー
+_MIGRATION_LOCK_KEY = 5_432_001
+
+# (バージョン, 説明, SQL文のリスト)。SQLite版（infra.client.migrations）と同じスキーマをPostgreSQLで定義する
+# 追記のみとし、適用済みのマイグレーションは変更しないこと
+MIGRATIONS = [
+    (
+        1,
+        "create user table",
+        [
+            # userは予約語なので引用符で囲む
+            # 名前の比較・並び替えはSQLiteと同じくバイト順にする（COLLATE "C"）
+            """
+            CREATE TABLE IF NOT EXISTS "user" (
+                id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+                name TEXT COLLATE "C" NOT NULL,
+                age INTEGER NOT NULL,
+                nickname TEXT
+            )
+            """,
+        ],
+    ),
+    (
+        2,
+        "seed test users",
+        [
+            """
+            INSERT INTO "user" (name, age, nickname)
+            SELECT name, age, nickname FROM (VALUES ('test', 20, NULL), ('test2', 22, '2')) AS seed (name, age, nickname)
+            WHERE NOT EXISTS (SELECT 1 FROM "user")
+            """,
+        ],
+    ),
+    (
+        3,
+        "add table version counter for user",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS table_version (
+                name TEXT PRIMARY KEY,
+                version BIGINT NOT NULL
+            )
+            """,
+            "INSERT INTO table_version (name, version) VALUES ('user', 0) ON CONFLICT DO NOTHING",
+            """
+            CREATE OR REPLACE FUNCTION bump_user_version() RETURNS trigger AS $$
+            BEGIN
+                UPDATE table_version SET version = version + 1 WHERE name = 'user';
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            """,
+            # 一括登録でも1回だけ更新するよう、文単位のトリガーにする
+            """
+            CREATE TRIGGER user_version_after_change AFTER INSERT OR UPDATE OR DELETE ON "user"
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_user_version()
+            """,
+        ],
+    ),
+    (
+        4,
+        "add user search indexes and name full-text search",
+        [
+            # (列, id) の複合インデックスにし、キーセットページネーションでもそのまま使えるようにする
+            'CREATE INDEX IF NOT EXISTS idx_user_name ON "user" (name, id)',
+            'CREATE INDEX IF NOT EXISTS idx_user_nickname ON "user" (nickname, id)',
+            'CREATE INDEX IF NOT EXISTS idx_user_age ON "user" (age, id)',
+            # 名前の全文検索（SQLiteのFTS5に相当）
+            "CREATE INDEX IF NOT EXISTS idx_user_name_fts ON \"user\" USING GIN (to_tsvector('simple', name))",
+        ],
+    ),
+]
+
+
+def _ensure_version_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL
+        )
+    """)
+
+
+def get_schema_version(conn) -> int:
+    """
+    適用済みの最新スキーマバージョンを返します。未適用の場合は0。
+    """
+    _ensure_version_table(conn)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def upgrade(conn) -> list[int]:
+    """
+    未適用のマイグレーションを順番に適用します。
+
+    各マイグレーションはアドバイザリーロックを取得したトランザクション内で適用するため、
+    複数のワーカーが同時に起動しても二重に適用されることはありません。
+
+    Args:
+        conn: autocommitモードのpsycopgコネクション。
+
+    Returns:
+        今回適用したバージョンのリスト。
+    """
+    _ensure_version_table(conn)
+    applied = []
+    for version, description, statements in MIGRATIONS:
+        try:
+            with conn.transaction():
+                conn.execute("SELECT pg_advisory_xact_lock(%s)", (_MIGRATION_LOCK_KEY,))
+                # ロック取得後に再確認する（他プロセスが適用済みの場合がある）
+                if get_schema_version(conn) >= version:
+                    continue
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(
+                    "INSERT INTO schema_version (version, description, applied_at) VALUES (%s, %s, %s)",
+                    (version, description, datetime.now(timezone.utc)),
+                )
+        except Exception:
+            logger.error("Migration failed", version=version, description=description, exc_info=True)
+            raise
+        logger.info("Migration applied", version=version, description=description)
+        applied.append(version)
+    return applied
+
+
+def run_migrations(dsn: str) -> list[int]:
+    """
+    専用のコネクションを開いてマイグレーションを適用し、コネクションを閉じます。
+    """
+    psycopg = require_psycopg()
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        return upgrade(conn)
@@ -0,0 +1,42 @@
+import itertools
+import time
+
+
+class ReplicaRouter:
+    """
+    読み込みに使うコネクションプールを選びます（レプリカへの振り分けのフック）。
+
+    - 読み込みはレプリカ（読み込み専用のプール）に順番に振り分ける
+    - 直近 read_your_writes_window 秒以内に書き込んだクライアントの読み込みはプライマリに送り、
+      レプリカの遅延で自分の書き込みが見えない（read-your-writes が破れる）ことを防ぐ
+
+    振り分け方を変える場合は、このクラスを継承して read_pool() を上書きし、
+    `DB_REPLICA_ROUTER` に設定する。
+    """
+
+    def __init__(self, primary, replicas: list, read_your_writes_window: float = 0.0):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.read_your_writes_window = read_your_writes_window
+        self._next = itertools.count()
+
+    def is_sticky(self, last_write_at: float | None) -> bool:
+        """直前の書き込みがまだレプリカに反映されていない可能性があるかを返します。"""
+        if last_write_at is None or self.read_your_writes_window <= 0:
+            return False
+        return time.time() - last_write_at < self.read_your_writes_window
+
+    def read_pool(self, last_write_at: float | None = None):
+        """
+        読み込みに使うプールを返します。
+
+        Args:
+            last_write_at: このクライアントが最後に書き込んだ時刻（UNIX時間）。不明な場合はNone。
+        """
+        if not self.replicas or self.is_sticky(last_write_at):
+            return self.primary
+        return self.replicas[next(self._next) % len(self.replicas)]
+
+    def close(self):
+        for pool in self.replicas:
+            pool.close()
@@ -0,0 +1,66 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+
+
+class RateLimitStore(ABC):
+    """
+    トークンバケットの状態を保存するストアのインターフェース。
+
+    複数のワーカー・サーバーで上限を共有する場合は、Redisなどで consume() を
+    アトミックに（Luaスクリプトなどで）実装したものを `RATE_LIMIT_STORE` に登録する。
+    """
+
+    @abstractmethod
+    def consume(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        """
+        key のバケットから cost 個のトークンを取り出します。
+
+        バケットは1秒に rate 個ずつ、最大 burst 個まで補充される。
+        取り出せた場合は0.0、足りない場合は取り出せるようになるまでの秒数を返す（トークンは減らさない）。
+        """
+        raise NotImplementedError
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """
+    プロセス内で完結するストア（上限はワーカープロセスごとになる）。
+
+    満杯まで補充されたバケットは保存していない場合と同じなので、
+    キーの数が max_keys を超えたら削除する（それでも多い場合は満杯に近いものから削除する）。
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # key -> (トークン数, 更新時刻, 満杯になる時刻)
+        self._buckets = {}
+
+    def consume(self, key, rate, burst, cost=1.0):
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = burst
+            else:
+                tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            retry_after = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                retry_after = (cost - tokens) / rate
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+            if len(self._buckets) > self.max_keys:
+                self._evict(now)
+            return retry_after
+
+    def _evict(self, now: float):
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+        if len(self._buckets) > self.max_keys:
+            # 満杯に近い（最も早く満杯になる）ものから1割削除する
+            by_full_at = sorted(self._buckets, key=lambda key: self._buckets[key][2])
+            for key in by_full_at[: max(1, len(by_full_at) // 10)]:
+                del self._buckets[key]
+
+    def __len__(self):
+        return len(self._buckets)
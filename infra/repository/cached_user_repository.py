@@ -0,0 +1,118 @@
+from typing import Iterator
+
+from application.ports.user_query import UserQuery
+from application.ports.user_repository_port import IUserRepository
+from domain.user_domain import User
+from infra.cache.tiered_cache import TieredCache
+from utils.logging import get_logger
+from utils.models import trusted_factory
+
+
+logger = get_logger(__name__)
+
+_build_user = trusted_factory(User)
+
+
+def serialize_cache_value(value):
+    """
+    共有層に保存するため、ドメインモデルのリストと (版番号, 一覧) の組をJSONにできる形へ変換する。
+    版番号などのそれ以外の値はそのまま保存する。
+    """
+    if isinstance(value, list):
+        return [user.model_dump() for user in value]
+    if isinstance(value, tuple):
+        version, users = value
+        return {"version": version, "users": [user.model_dump() for user in users]}
+    return value
+
+
+def deserialize_cache_value(data):
+    # 共有層の値は書き込み時に検証済みのものなので再検証しない
+    if isinstance(data, list):
+        return [_build_user(dict(values)) for values in data]
+    if isinstance(data, dict):
+        return data["version"], [_build_user(dict(values)) for values in data["users"]]
+    return data
+
+
+class CachedUserRepository(IUserRepository):
+    """
+    IUserRepositoryをラップし、ユーザー一覧の読み込みをキャッシュするアダプター。
+    書き込みが行われたらキャッシュを破棄する。
+
+    キャッシュから返すリストはリクエスト間で共有されるため、呼び出し側で変更しないこと。
+    """
+
+    def __init__(self, user_repository: IUserRepository, cache: TieredCache):
+        self.user_repository = user_repository
+        self.cache = cache
+
+    def get_users(self, limit=100, after_id=None) -> list[User]:
+        key = ("users", "get_users", limit, after_id)
+        users = self.cache.get(key)
+        if users is not None:
+            logger.info("User cache hit", limit=limit, after_id=after_id)
+            return users
+
+        generation = self.cache.current_generation()
+        users = self.user_repository.get_users(limit=limit, after_id=after_id)
+        self.cache.set(key, users, generation)
+        return users
+
+    def find_users(self, query: UserQuery) -> list[User]:
+        key = ("users", "find_users", query.model_dump_json())
+        users = self.cache.get(key)
+        if users is not None:
+            logger.info("User cache hit", query=query.model_dump(exclude_defaults=True))
+            return users
+
+        generation = self.cache.current_generation()
+        users = self.user_repository.find_users(query)
+        self.cache.set(key, users, generation)
+        return users
+
+    def get_users_page(self, limit=100, after_id=None, query=None) -> tuple[int, list[User]]:
+        """
+        一覧は読み込んだときの版番号と組で保存する。別々に保存すると有効期限や破棄の時期がずれ、
+        新しい版番号（ETag）で古い一覧を返すことがあるため。
+        """
+        if query is not None:
+            key = ("users", "page", query.model_dump_json())
+        else:
+            key = ("users", "page", limit, after_id)
+        page = self.cache.get(key)
+        if page is not None:
+            logger.info("User cache hit", limit=limit, after_id=after_id)
+            return page
+
+        generation = self.cache.current_generation()
+        page = self.user_repository.get_users_page(limit=limit, after_id=after_id, query=query)
+        self.cache.set(key, page, generation)
+        return page
+
+    def iter_users(self, after_id=None, batch_size=500) -> Iterator[User]:
+        # ストリーミングは全件を保持することになるのでキャッシュしない
+        return self.user_repository.iter_users(after_id=after_id, batch_size=batch_size)
+
+    def get_version(self) -> int:
+        key = ("users", "version")
+        version = self.cache.get(key)
+        if version is not None:
+            return version
+
+        generation = self.cache.current_generation()
+        version = self.user_repository.get_version()
+        self.cache.set(key, version, generation)
+        return version
+
+    def add_user(self, user: User) -> User:
+        try:
+            return self.user_repository.add_user(user)
+        finally:
+            self.cache.invalidate()
+
+    def add_users(self, users: list[User]) -> list[User]:
+        try:
+            return self.user_repository.add_users(users)
+        finally:
+            self.cache.invalidate()
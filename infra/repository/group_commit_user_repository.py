@@ -0,0 +1,72 @@
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Iterator
+
+from application.exceptions import DatabaseUnavailableError
+from application.ports.user_query import UserQuery
+from application.ports.user_repository_port import IUserRepository
+from domain.user_domain import User
+from infra.client.group_commit_writer import GroupCommitWriter
+from utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+INSERT_USER_SQL = "INSERT INTO user (name, age, nickname) VALUES (?, ?, ?)"
+
+
+class GroupCommitUserRepository(IUserRepository):
+    """
+    IUserRepositoryをラップし、ユーザーの登録を GroupCommitWriter 経由で行うアダプター。
+    同時に来た登録はまとめて1回でコミットされる。読み込みはラップしたリポジトリにそのまま委譲する。
+
+    呼び出し側から見た動作（コミット後に採番済みのユーザーを返す）は UserRepository と同じ。
+    """
+
+    def __init__(self, user_repository: IUserRepository, writer: GroupCommitWriter, timeout: float = 5.0):
+        self.user_repository = user_repository
+        self.writer = writer
+        # コミットを待つ最大秒数。超えた場合は DatabaseUnavailableError
+        self.timeout = timeout
+
+    def _wait(self, future):
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # まだ実行されていなければ取り消す（実行中の場合はコミットされることがある）
+            future.cancel()
+            logger.warning("Group commit timed out", timeout=self.timeout)
+            raise DatabaseUnavailableError()
+
+    def get_users(self, limit=100, after_id=None) -> list[User]:
+        return self.user_repository.get_users(limit=limit, after_id=after_id)
+
+    def find_users(self, query: UserQuery) -> list[User]:
+        return self.user_repository.find_users(query)
+
+    def iter_users(self, after_id=None, batch_size=500) -> Iterator[User]:
+        return self.user_repository.iter_users(after_id=after_id, batch_size=batch_size)
+
+    def get_version(self) -> int:
+        return self.user_repository.get_version()
+
+    def get_users_page(self, limit=100, after_id=None, query=None) -> tuple[int, list[User]]:
+        return self.user_repository.get_users_page(limit=limit, after_id=after_id, query=query)
+
+    def add_user(self, user: User) -> User:
+        logger.info(f"Adding user: {user.name}")
+        user.id = self._wait(self.writer.submit(INSERT_USER_SQL, (user.name, user.age, user.nickname)))
+        logger.info(f"User added with ID: {user.id}")
+        return user
+
+    def add_users(self, users: list[User]) -> list[User]:
+        if not users:
+            return []
+        ids = self._wait(
+            self.writer.submit_many(
+                INSERT_USER_SQL, [(user.name, user.age, user.nickname) for user in users]
+            )
+        )
+        for user, user_id in zip(users, ids):
+            user.id = user_id
+        logger.info(f"Users added with IDs: {ids[0]}-{ids[-1]}")
+        return users
@@ -0,0 +1,105 @@
+import re
+import threading
+from typing import Iterator
+
+from application.ports.user_query import UserQuery
+from application.ports.user_repository_port import IUserRepository
+from domain.user_domain import User
+from infra.repository.user_repository import unknown_cursor_error
+
+
+def _tokens(text: str) -> list[str]:
+    # FTS5（unicode61）と同じく、英数字以外で区切り、大文字・小文字を区別しない
+    return re.findall(r"\w+", text.casefold())
+
+
+def _matches_search(name: str, search: str) -> bool:
+    tokens = _tokens(name)
+    terms = _tokens(search)
+    # 記号だけの検索語は何にも一致しない（FTS5と同じ）
+    return bool(terms) and all(any(token.startswith(term) for token in tokens) for term in terms)
+
+
+class InMemoryUserRepository(IUserRepository):
+    """
+    IUserRepositoryのメモリ上の実装（フェイク）。
+
+    DBを使わずにサービスやルートをテストするためのもので、
+    動作はリポジトリの契約テスト（tests/test_user_repository_contract.py）でSQLite版・PostgreSQL版と揃えている。
+    ユーザーはコピーを保存・返却するので、呼び出し側で変更しても保存済みの値には影響しない。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # id -> User。idは登録順に増えるので、辞書の順序がidの昇順になる
+        self._users = {}
+        self._next_id = 1
+        self._version = 0
+
+    def _snapshot(self) -> list[User]:
+        with self._lock:
+            return list(self._users.values())
+
+    def get_users(self, limit=100, after_id=None) -> list[User]:
+        users = [user for user in self._snapshot() if user.id > (after_id or 0)]
+        return [user.model_copy() for user in users[:limit]]
+
+    def find_users(self, query: UserQuery) -> list[User]:
+        users = self._snapshot()
+        if query.name_prefix is not None:
+            users = [user for user in users if user.name.startswith(query.name_prefix)]
+        if query.nickname is not None:
+            users = [user for user in users if user.nickname == query.nickname]
+        if query.min_age is not None:
+            users = [user for user in users if user.age >= query.min_age]
+        if query.max_age is not None:
+            users = [user for user in users if user.age <= query.max_age]
+        if query.search is not None:
+            users = [user for user in users if _matches_search(user.name, query.search)]
+
+        def sort_key(user):
+            if query.order_by == "id":
+                return (user.id,)
+            return (getattr(user, query.order_by), user.id)
+
+        users.sort(key=sort_key, reverse=query.descending)
+        if query.after_id is not None:
+            cursor_user = self._users.get(query.after_id)
+            if cursor_user is not None:
+                cursor_key = sort_key(cursor_user)
+            elif query.order_by == "id":
+                cursor_key = (query.after_id,)
+            else:
+                # SQLの実装と同じく、存在しないユーザーのカーソルは並び順の位置が分からないので不正な入力
+                raise unknown_cursor_error(query.after_id)
+            if query.descending:
+                users = [user for user in users if sort_key(user) < cursor_key]
+            else:
+                users = [user for user in users if sort_key(user) > cursor_key]
+        return [user.model_copy() for user in users[: query.limit]]
+
+    def iter_users(self, after_id=None, batch_size=500) -> Iterator[User]:
+        for user in self._snapshot():
+            if user.id > (after_id or 0):
+                yield user.model_copy()
+
+    def get_version(self) -> int:
+        return self._version
+
+    def add_user(self, user: User) -> User:
+        return self.add_users([user])[0]
+
+    def add_users(self, users: list[User]) -> list[User]:
+        if not users:
+            return []
+        # DBのNOT NULL制約と同じく、1件でも不正な値があればどれも登録しない
+        for user in users:
+            if user.name is None or user.age is None:
+                raise ValueError("name and age are required.")
+        with self._lock:
+            for user in users:
+                user.id = self._next_id
+                self._next_id += 1
+                self._users[user.id] = user.model_copy()
+            self._version += 1
+        return users
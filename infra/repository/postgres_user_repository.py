@@ -0,0 +1,181 @@
+import itertools
+from typing import Iterator
+
+from application.ports.user_query import UserQuery
+from application.ports.user_repository_port import IUserRepository
+from domain.user_domain import User
+from infra.repository.row_mapper import get_row_mapper, map_rows
+from infra.repository.user_repository import (
+    _prefix_upper_bound,
+    cursor_row_is_required,
+    unknown_cursor_error,
+)
+from utils.logging import get_logger
+from utils.decorators import log_errors, timed
+
+
+logger = get_logger(__name__)
+
+# サーバーサイドカーソルの名前に付ける連番（同じコネクションで同時に開いても重複しないように）
+_cursor_ids = itertools.count()
+
+
+def _tsquery_expression(search: str) -> str:
+    # 入力をtsqueryの構文として解釈させないよう、各語を引用符で囲み前方一致（:*）にする
+    terms = ("'" + term.replace("\\", "\\\\").replace("'", "''") + "':*" for term in search.split())
+    return " & ".join(terms)
+
+
+def build_find_users_sql(query: UserQuery) -> tuple[str, list]:
+    """
+    UserQueryから PostgreSQL 用の (SQL, パラメータ) を組み立てます。
+    条件と並び順は SQLite版（infra.repository.user_repository.build_find_users_sql）と同じ。
+    """
+    conditions = []
+    params = []
+    if query.name_prefix is not None:
+        # nameはCOLLATE "C" なので、範囲の比較でidx_user_nameを使える
+        conditions.append("name >= %s")
+        params.append(query.name_prefix)
+        upper_bound = _prefix_upper_bound(query.name_prefix)
+        if upper_bound is not None:
+            conditions.append("name < %s")
+            params.append(upper_bound)
+    if query.nickname is not None:
+        conditions.append("nickname = %s")
+        params.append(query.nickname)
+    if query.min_age is not None:
+        conditions.append("age >= %s")
+        params.append(query.min_age)
+    if query.max_age is not None:
+        conditions.append("age <= %s")
+        params.append(query.max_age)
+    if query.search is not None:
+        conditions.append("to_tsvector('simple', name) @@ to_tsquery('simple', %s)")
+        params.append(_tsquery_expression(query.search))
+
+    direction = "DESC" if query.descending else "ASC"
+    if query.after_id is not None:
+        op = "<" if query.descending else ">"
+        if query.order_by == "id":
+            conditions.append(f"id {op} %s")
+            params.append(query.after_id)
+        else:
+            # (並び替えの列, id) の組で比較し、カーソルのユーザーの次から返す
+            column = query.order_by
+            conditions.append(f'({column}, id) {op} ((SELECT {column} FROM "user" WHERE id = %s), %s)')
+            params += [query.after_id, query.after_id]
+
+    if query.order_by == "id":
+        order = f"id {direction}"
+    else:
+        order = f"{query.order_by} {direction}, id {direction}"
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f'SELECT id, name, age, nickname FROM "user"{where} ORDER BY {order} LIMIT %s'
+    params.append(query.limit)
+    return sql, params
+
+
+class PostgresUserRepository(IUserRepository):
+    """
+    IUserRepositoryのPostgreSQL実装（psycopg 3）。
+
+    コネクションはautocommit（PostgresConnectionPool）を前提とし、
+    書き込みとサーバーサイドカーソルは明示的にトランザクションを開始する。
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def _fetch(self, sql: str, params) -> list[User]:
+        with self.db.cursor() as cursor:
+            cursor.execute(sql, params)
+            return map_rows(cursor, User, cursor.fetchall())
+
+    @log_errors(logger_name=__name__)
+    @timed("repository_method_duration_seconds", repository="user_postgres")
+    def get_users(self, limit=100, after_id=None) -> list[User]:
+        logger.info(f"Fetching users with limit: {limit}, after_id: {after_id}")
+        users = self._fetch(
+            'SELECT id, name, age, nickname FROM "user" WHERE id > %s ORDER BY id LIMIT %s',
+            (after_id or 0, limit),
+        )
+        logger.info(f"Fetched users: {len(users)}")
+        return users
+
+    @log_errors(logger_name=__name__)
+    @timed("repository_method_duration_seconds", repository="user_postgres")
+    def find_users(self, query: UserQuery) -> list[User]:
+        logger.info("Finding users", query=query.model_dump(exclude_defaults=True))
+        users = self._fetch(*build_find_users_sql(query))
+        if cursor_row_is_required(query, users) and not self._user_exists(query.after_id):
+            raise unknown_cursor_error(query.after_id)
+        logger.info(f"Found users: {len(users)}")
+        return users
+
+    def _user_exists(self, user_id: int) -> bool:
+        return self.db.execute('SELECT 1 FROM "user" WHERE id = %s', (user_id,)).fetchone() is not None
+
+    # ジェネレーターなので、例外はイテレーション中に呼び出し側へ伝播する
+    def iter_users(self, after_id=None, batch_size=500) -> Iterator[User]:
+        """
+        サーバーサイドカーソル（DECLARE CURSOR）で batch_size 件ずつ取得する。
+        全件をクライアントのメモリに載せない。カーソルはトランザクション内でのみ使えるため、
+        イテレーションが終わるまでトランザクションを開いたままにする。
+        """
+        logger.info(f"Streaming users after_id: {after_id}")
+        with self.db.transaction():
+            with self.db.cursor(name=f"iter_users_{next(_cursor_ids)}") as cursor:
+                cursor.execute(
+                    'SELECT id, name, age, nickname FROM "user" WHERE id > %s ORDER BY id',
+                    (after_id or 0,),
+                )
+                mapper = None
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    if mapper is None:
+                        mapper = get_row_mapper(User, tuple(column[0] for column in cursor.description))
+                    for row in rows:
+                        yield mapper(row)
+
+    @log_errors(logger_name=__name__)
+    @timed("repository_method_duration_seconds", repository="user_postgres")
+    def get_version(self) -> int:
+        # 版番号はuserテーブルのトリガーで更新される
+        row = self.db.execute("SELECT version FROM table_version WHERE name = 'user'").fetchone()
+        return row[0] if row else 0
+
+    @log_errors(logger_name=__name__)
+    @timed("repository_method_duration_seconds", repository="user_postgres")
+    def add_user(self, user: User) -> User:
+        logger.info(f"Adding user: {user.name}")
+        with self.db.transaction():
+            row = self.db.execute(
+                'INSERT INTO "user" (name, age, nickname) VALUES (%s, %s, %s) RETURNING id',
+                (user.name, user.age, user.nickname),
+            ).fetchone()
+        user.id = row[0]
+        logger.info(f"User added with ID: {user.id}")
+        return user
+
+    @log_errors(logger_name=__name__)
+    @timed("repository_method_duration_seconds", repository="user_postgres")
+    def add_users(self, users: list[User]) -> list[User]:
+        if not users:
+            return []
+        logger.info(f"Adding users in bulk: {len(users)}")
+        with self.db.transaction():
+            with self.db.cursor() as cursor:
+                # パイプラインで送り、行ごとの往復を待たない。RETURNINGの結果は行の順に返る
+                cursor.executemany(
+                    'INSERT INTO "user" (name, age, nickname) VALUES (%s, %s, %s) RETURNING id',
+                    [(user.name, user.age, user.nickname) for user in users],
+                    returning=True,
+                )
+                for user in users:
+                    user.id = cursor.fetchone()[0]
+                    cursor.nextset()
+        logger.info(f"Users added with IDs: {users[0].id}-{users[-1].id}")
+        return users
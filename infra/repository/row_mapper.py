@@ -0,0 +1,40 @@
+from functools import lru_cache
+from typing import Callable
+
+from pydantic import BaseModel
+
+from utils.models import trusted_factory
+
+
+@lru_cache(maxsize=64)
+def get_row_mapper(model: type[BaseModel], columns: tuple[str, ...]) -> Callable:
+    """
+    クエリの列構成（列名のタプル）ごとに、行をモデルに変換する関数を1回だけ構築します。
+
+    DBの値は書き込み時にドメインモデルで検証済みなので、読み込み時は再検証しない。
+    列はすべてモデルのフィールドである必要がある。
+    """
+    build = trusted_factory(model)
+
+    def mapper(row):
+        return build(dict(zip(columns, row)))
+
+    return mapper
+
+
+def execute_for_mapping(db, sql: str, params=()):
+    """
+    行をタプルのまま取得するカーソルでクエリを実行します。
+    sqlite3.Row を経由しない分、取得が速い。
+    """
+    cursor = db.cursor()
+    cursor.row_factory = None
+    return cursor.execute(sql, params)
+
+
+def map_rows(cursor, model: type[BaseModel], rows) -> list:
+    """
+    カーソルの列構成に対応するマッパーで、取得済みの行をまとめて変換します。
+    """
+    mapper = get_row_mapper(model, tuple(column[0] for column in cursor.description))
+    return [mapper(row) for row in rows]
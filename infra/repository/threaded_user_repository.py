@@ -0,0 +1,71 @@
+import asyncio
+import contextvars
+from concurrent.futures import Executor
+from typing import Callable, List, Optional, Tuple
+
+from application.ports.async_user_repository_port import IAsyncUserRepository
+from application.ports.user_query import UserQuery
+from application.ports.user_repository_port import IUserRepository
+from domain.user_domain import User
+from infra.client.connection_pool import ConnectionPool
+from infra.repository.user_repository import UserRepository
+
+
+class ThreadedUserRepository(IAsyncUserRepository):
+    """
+    同期のリポジトリをスレッドプールで実行する非同期リポジトリ。
+
+    sqlite3はブロッキングAPIしかないため、呼び出しごとにプールからコネクションを借り、
+    executorのスレッドで同期のリポジトリを実行する。
+    呼び出しごとに別のコネクションを使うので、asyncio.gather で並行に実行できる。
+    read_pool を指定した場合、読み込みはそのプール（読み込み専用・レプリカ）のコネクションで行う。
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        executor: Executor,
+        repository_factory: Callable[[object], IUserRepository] = UserRepository,
+        read_pool: Optional[ConnectionPool] = None,
+    ):
+        self.pool = pool
+        self.read_pool = read_pool or pool
+        self.executor = executor
+        # コネクションから同期のリポジトリを作る関数（キャッシュで包む場合など）
+        self.repository_factory = repository_factory
+
+    def _call(self, pool: ConnectionPool, method: str, args, kwargs):
+        conn = pool.acquire()
+        try:
+            return getattr(self.repository_factory(conn), method)(*args, **kwargs)
+        finally:
+            pool.release(conn)
+
+    async def _run(self, pool: ConnectionPool, method: str, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # ログのコンテキスト（request_idなど）をexecutorのスレッドに引き継ぐ
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self.executor, context.run, self._call, pool, method, args, kwargs
+        )
+
+    async def get_users(self, limit: int = 100, after_id: Optional[int] = None) -> List[User]:
+        return await self._run(self.read_pool, "get_users", limit=limit, after_id=after_id)
+
+    async def find_users(self, query: UserQuery) -> List[User]:
+        return await self._run(self.read_pool, "find_users", query)
+
+    async def get_version(self) -> int:
+        return await self._run(self.read_pool, "get_version")
+
+    async def get_users_page(
+        self, limit: int = 100, after_id: Optional[int] = None, query: Optional[UserQuery] = None
+    ) -> Tuple[int, List[User]]:
+        # 版番号と一覧は1回の呼び出しで、同じコネクションで順に読む（キャッシュでも組で保存される）
+        return await self._run(self.read_pool, "get_users_page", limit=limit, after_id=after_id, query=query)
+
+    async def add_user(self, user: User) -> User:
+        return await self._run(self.pool, "add_user", user)
+
+    async def add_users(self, users: List[User]) -> List[User]:
+        return await self._run(self.pool, "add_users", users)
@@ -1,29 +1,157 @@
+import sys
+from typing import Iterator, Optional
+
+from application.exceptions import InvalidInputError
+from application.ports.user_query import UserQuery
 from application.ports.user_repository_port import IUserRepository
 from domain.user_domain import User
+from infra.repository.row_mapper import execute_for_mapping, get_row_mapper, map_rows
 from utils.logging import get_logger
-from utils.decorators import log_errors
+from utils.decorators import log_errors, timed
 
 
 logger = get_logger(__name__)
 
 
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    # 最後の文字を1つ進めた文字列。prefixで始まる文字列はすべてこれより小さい
+    # 末尾の最大のコードポイントは進められないので取り除き、何も残らなければ上限なし（None）
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def cursor_row_is_required(query: UserQuery, users: list) -> bool:
+    """
+    id以外で並び替えたページが空の場合、カーソル（after_id）のユーザーが存在するか確認が必要かを返す。
+    カーソルのユーザーが削除されていると比較の値がNULLになり、続きがあっても空のページになるため。
+    """
+    return not users and query.after_id is not None and query.order_by != "id"
+
+
+def unknown_cursor_error(after_id: int) -> InvalidInputError:
+    return InvalidInputError(f"'after_id' {after_id} does not refer to an existing user.")
+
+
+def _fts_match_expression(search: str) -> str:
+    # 入力をFTS5の構文として解釈させないよう、各語をフレーズとして囲み前方一致にする
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in search.split())
+
+
+def build_find_users_sql(query: UserQuery) -> tuple[str, list]:
+    """
+    UserQueryから (SQL, パラメータ) を組み立てます。
+    各条件はインデックス（idx_user_name, idx_user_nickname, idx_user_age, user_fts）で絞り込める形にする。
+    """
+    conditions = []
+    params = []
+    if query.name_prefix is not None:
+        # LIKEはNOCASEのインデックスがないと使えないので、範囲の比較にする
+        conditions.append("name >= ?")
+        params.append(query.name_prefix)
+        upper_bound = _prefix_upper_bound(query.name_prefix)
+        if upper_bound is not None:
+            conditions.append("name < ?")
+            params.append(upper_bound)
+    if query.nickname is not None:
+        conditions.append("nickname = ?")
+        params.append(query.nickname)
+    if query.min_age is not None:
+        conditions.append("age >= ?")
+        params.append(query.min_age)
+    if query.max_age is not None:
+        conditions.append("age <= ?")
+        params.append(query.max_age)
+    if query.search is not None:
+        conditions.append("id IN (SELECT rowid FROM user_fts WHERE user_fts MATCH ?)")
+        params.append(_fts_match_expression(query.search))
+
+    direction = "DESC" if query.descending else "ASC"
+    if query.after_id is not None:
+        op = "<" if query.descending else ">"
+        if query.order_by == "id":
+            conditions.append(f"id {op} ?")
+            params.append(query.after_id)
+        else:
+            # (並び替えの列, id) の組で比較し、カーソルのユーザーの次から返す
+            column = query.order_by
+            conditions.append(f"({column}, id) {op} ((SELECT {column} FROM user WHERE id = ?), ?)")
+            params += [query.after_id, query.after_id]
+
+    if query.order_by == "id":
+        order = f"id {direction}"
+    else:
+        order = f"{query.order_by} {direction}, id {direction}"
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"SELECT id, name, age, nickname FROM user{where} ORDER BY {order} LIMIT ?"
+    params.append(query.limit)
+    return sql, params
+
+
 # SQLiteに実装が依存しているが、利用する側はIUserRepositoryを見るだけで良い
 class UserRepository(IUserRepository):
     def __init__(self, db):
         self.db = db
 
     @log_errors(logger_name=__name__)
-    def get_users(self, limit=100) -> list[User]:
-        logger.info(f"Fetching users with limit: {limit}")
-        cursor = self.db.execute(
-            "SELECT id, name, age, nickname FROM user LIMIT ?", (limit,)
+    @timed("repository_method_duration_seconds", repository="user")
+    def get_users(self, limit=100, after_id=None) -> list[User]:
+        logger.info(f"Fetching users with limit: {limit}, after_id: {after_id}")
+        # idは1始まりなので、after_idがない場合は0より後として扱う
+        cursor = execute_for_mapping(
+            self.db,
+            "SELECT id, name, age, nickname FROM user WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id or 0, limit),
+        )
+        rows = cursor.fetchall()
+
+        logger.info(f"Fetched users: {len(rows)}")
+        return map_rows(cursor, User, rows)
+
+    @log_errors(logger_name=__name__)
+    @timed("repository_method_duration_seconds", repository="user")
+    def find_users(self, query: UserQuery) -> list[User]:
+        logger.info("Finding users", query=query.model_dump(exclude_defaults=True))
+        sql, params = build_find_users_sql(query)
+        cursor = execute_for_mapping(self.db, sql, params)
+        rows = cursor.fetchall()
+        if cursor_row_is_required(query, rows) and not self._user_exists(query.after_id):
+            raise unknown_cursor_error(query.after_id)
+
+        logger.info(f"Found users: {len(rows)}")
+        return map_rows(cursor, User, rows)
+
+    def _user_exists(self, user_id: int) -> bool:
+        return self.db.execute("SELECT 1 FROM user WHERE id = ?", (user_id,)).fetchone() is not None
+
+    # ジェネレーターなので、例外はイテレーション中に呼び出し側へ伝播する
+    def iter_users(self, after_id=None, batch_size=500) -> Iterator[User]:
+        logger.info(f"Streaming users after_id: {after_id}")
+        cursor = execute_for_mapping(
+            self.db,
+            "SELECT id, name, age, nickname FROM user WHERE id > ? ORDER BY id",
+            (after_id or 0,),
         )
-        users = cursor.fetchall()
+        mapper = get_row_mapper(User, tuple(column[0] for column in cursor.description))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield mapper(row)
 
-        logger.info(f"Fetched users: {len(users)}")
-        return [User(**dict(row)) for row in users]
+    @log_errors(logger_name=__name__)
+    @timed("repository_method_duration_seconds", repository="user")
+    def get_version(self) -> int:
+        # 版番号はuserテーブルのトリガーで更新される
+        row = self.db.execute(
+            "SELECT version FROM table_version WHERE name = 'user'"
+        ).fetchone()
+        return row[0] if row else 0
 
     @log_errors(logger_name=__name__)
+    @timed("repository_method_duration_seconds", repository="user")
     def add_user(self, user: User) -> User:
         logger.info(f"Adding user: {user.name}")
         cursor = self.db.execute(
@@ -34,3 +162,28 @@ class UserRepository(IUserRepository):
         user.id = cursor.lastrowid
         logger.info(f"User added with ID: {user.id}")
         return user
+
+    @log_errors(logger_name=__name__)
+    @timed("repository_method_duration_seconds", repository="user")
+    def add_users(self, users: list[User]) -> list[User]:
+        if not users:
+            return []
+        logger.info(f"Adding users in bulk: {len(users)}")
+        try:
+            # 書き込みロックを先に取得し、他の書き込みが割り込まないようにする
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.executemany(
+                "INSERT INTO user (name, age, nickname) VALUES (?, ?, ?)",
+                [(user.name, user.age, user.nickname) for user in users],
+            )
+            last_id = self.db.execute("SELECT last_insert_rowid()").fetchone()[0]
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        # ロックを保持したまま連続して挿入しているので、idは連番になる
+        first_id = last_id - len(users) + 1
+        for offset, user in enumerate(users):
+            user.id = first_id + offset
+        logger.info(f"Users added with IDs: {first_id}-{last_id}")
+        return users
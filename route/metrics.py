@@ -0,0 +1,84 @@
+from flask import Blueprint, Response, current_app
+
+from utils.metrics import REGISTRY
+
+
+metrics_bp = Blueprint("metrics", __name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _db_pool_stats():
+    pool = current_app.extensions.get("db_pool")
+    if pool is None:
+        return {}
+    return {(name,): value for name, value in pool.stats().items()}
+
+
+def _db_read_pool_stats():
+    router = current_app.extensions.get("db_replica_router")
+    if router is None:
+        return {}
+    return {
+        (str(index), name): value
+        for index, pool in enumerate(router.replicas)
+        for name, value in pool.stats().items()
+    }
+
+
+# キャッシュの統計のうち、現在値（それ以外は増えるだけの値なのでカウンターにする）
+_USER_CACHE_GAUGE_STATS = frozenset({"local_size", "local_max_size"})
+
+
+def _user_cache_stats_values():
+    cache = current_app.extensions.get("user_cache")
+    if cache is None:
+        return {}
+    stats = cache.stats()
+    values = {"local_" + name: value for name, value in stats.pop("local").items()}
+    values.update(stats)
+    return values
+
+
+def _user_cache_stats():
+    return {(name,): value for name, value in _user_cache_stats_values().items() if name in _USER_CACHE_GAUGE_STATS}
+
+
+def _user_cache_events():
+    return {
+        (name,): value for name, value in _user_cache_stats_values().items() if name not in _USER_CACHE_GAUGE_STATS
+    }
+
+
+def _write_limiter_stats():
+    limiter = current_app.extensions.get("write_limiter")
+    if limiter is None:
+        return {}
+    return {("in_flight",): limiter.in_flight, ("limit",): limiter.limit}
+
+
+REGISTRY.callback_gauge(
+    "db_pool", "Connection pool statistics (in use, waits, creations, ...).", ("stat",), _db_pool_stats
+)
+REGISTRY.callback_gauge(
+    "db_read_pool",
+    "Read-only / replica connection pool statistics.",
+    ("replica", "stat"),
+    _db_read_pool_stats,
+)
+REGISTRY.callback_gauge("user_cache", "User query cache size.", ("stat",), _user_cache_stats)
+REGISTRY.callback_counter(
+    "user_cache_events_total",
+    "User query cache events (hits, misses, evictions, invalidations, ...).",
+    ("event",),
+    _user_cache_events,
+)
+
+REGISTRY.callback_gauge(
+    "write_limiter", "Write requests admitted by the concurrency limiter.", ("stat",), _write_limiter_stats
+)
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(REGISTRY.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,22 +1,145 @@
-from flask import Blueprint, jsonify, request
+import hashlib
+from itertools import islice
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context, url_for
+
+from dependencies import get_async_user_service, get_user_service
+from pydantic import ValidationError
 
-from dependencies import get_user_service
 from utils.logging import get_logger
-from application.ports.user_dto import UserCreateDTO
+from application.exceptions import InvalidInputError
+from application.ports.user_dto import UserCreateDTO, user_response_list_adapter
+from application.ports.user_query import UserQuery
 
 user_bp = Blueprint("user", __name__)
+# 同じAPIの非同期版（/async/users）。同期版と並べて計測できるように別のパスで公開する
+async_user_bp = Blueprint("async_user", __name__, url_prefix="/async")
 
 logger = get_logger(__name__)
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NDJSON_MIMETYPE = "application/x-ndjson"
+# 一括登録で1トランザクションにまとめる件数
+BULK_CHUNK_SIZE = 500
+# GET /users の絞り込み・並び替えのクエリパラメータ
+FILTER_PARAMS = ("name_prefix", "nickname", "min_age", "max_age", "q", "order_by", "order")
+
+
+def _get_int_arg(name, default=None, min_value=None, max_value=None):
+    """
+    クエリパラメータを整数として取得します。不正な値の場合はInvalidInputErrorを送出します。
+    """
+    value = request.args.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise InvalidInputError(f"'{name}' must be an integer.")
+    if (min_value is not None and value < min_value) or (
+        max_value is not None and value > max_value
+    ):
+        raise InvalidInputError(f"'{name}' must be between {min_value} and {max_value}.")
+    return value
+
+
+def _wants_stream():
+    return (
+        request.args.get("stream") == "ndjson"
+        or request.accept_mimetypes.best == NDJSON_MIMETYPE
+    )
+
+
+def _get_user_query(limit, after_id):
+    """
+    絞り込み・並び替えのクエリパラメータからUserQueryを作ります。指定がなければNoneを返す。
+    不正な値の場合はInvalidInputError（またはValidationError）を送出します。
+    """
+    if not any(name in request.args for name in FILTER_PARAMS):
+        return None
+    order = request.args.get("order", "asc")
+    if order not in ("asc", "desc"):
+        raise InvalidInputError("'order' must be 'asc' or 'desc'.")
+    return UserQuery(
+        name_prefix=request.args.get("name_prefix"),
+        nickname=request.args.get("nickname"),
+        min_age=_get_int_arg("min_age", min_value=0),
+        max_age=_get_int_arg("max_age", min_value=0),
+        search=request.args.get("q"),
+        order_by=request.args.get("order_by", "id"),
+        descending=order == "desc",
+        limit=limit,
+        after_id=after_id,
+    )
+
+
+def _users_etag(version, limit, after_id, query=None):
+    if query is not None:
+        # 条件ごとに別のETagにする
+        digest = hashlib.blake2b(query.model_dump_json().encode(), digest_size=8).hexdigest()
+        return f"users-v{version}-q{digest}"
+    return f"users-v{version}-{limit}-{after_id or 0}"
+
+
+def _not_modified_response(etag):
+    logger.info("Users not modified", etag=etag)
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+
+def _users_page_response(users_dto, etag, limit):
+    # DTOを中間の辞書に変換せず、直接JSONにする
+    response = Response(
+        user_response_list_adapter.dump_json(users_dto), mimetype="application/json"
+    )
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    # ページが埋まっている場合は続きがある可能性があるので、次ページのカーソルを返す
+    if len(users_dto) == limit:
+        next_cursor = users_dto[-1].id
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+        # 絞り込み・並び替えの条件は引き継ぐ
+        filters = {name: value for name, value in request.args.items() if name in FILTER_PARAMS}
+        next_url = url_for(request.endpoint, after_id=next_cursor, limit=limit, **filters)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response
+
 
 @user_bp.route("/users", methods=["GET"])
 def get_users():
-    logger.info("Fetching users")
+    after_id = _get_int_arg("after_id", min_value=0)
     user_service = get_user_service()
-    users_dto = user_service.get_users()  # DTOを受け取る
+
+    if _wants_stream():
+        if any(name in request.args for name in FILTER_PARAMS):
+            raise InvalidInputError("Filters are not supported with streaming.")
+        # 1行1ユーザーのNDJSONで、カーソルから読んだ順に送出する（メモリ使用量は一定）
+        logger.info("Streaming users", after_id=after_id)
+
+        def generate():
+            for user in user_service.iter_users(after_id=after_id):
+                yield user.model_dump_json() + "\n"
+
+        return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+    limit = _get_int_arg("limit", DEFAULT_PAGE_SIZE, min_value=1, max_value=MAX_PAGE_SIZE)
+    query = _get_user_query(limit, after_id)
+
+    # テーブルの版番号とページの指定から強いETagを作り、変更がなければ一覧を読み込まずに304を返す
+    etag = _users_etag(user_service.get_users_version(), limit, after_id, query)
+    # 圧縮されたレスポンスのETagは弱いETagになるので、弱い比較で判定する
+    if request.if_none_match.contains_weak(etag):
+        return _not_modified_response(etag)
+
+    logger.info("Fetching users")
+    # 返すETagは、実際に返す一覧と組で読み込まれた版番号から作る（キャッシュの一覧と版番号がずれないように）
+    version, users_dto = user_service.get_users_page(limit=limit, after_id=after_id, query=query)
+    etag = _users_etag(version, limit, after_id, query)
     logger.info(f"Fetched {len(users_dto)} users")
-    # DTOを辞書に変換してからJSONにする
-    return jsonify([user.model_dump() for user in users_dto])
+    return _users_page_response(users_dto, etag, limit)
 
 
 @user_bp.route("/users", methods=["POST"])
@@ -31,4 +154,121 @@ def add_user():
     user_service = get_user_service()
     created_user_dto = user_service.add_user(user_create_dto)
     logger.info(f"User added: {created_user_dto.id}")
-    return jsonify(created_user_dto.model_dump()), 201
+    # DTOを辞書に変換せず、そのままJSONにする
+    return jsonify(created_user_dto), 201
+
+
+def _iter_bulk_items():
+    """
+    一括登録のリクエストボディから (行番号, 要素) を1件ずつ返します。
+    NDJSONの場合はボディを全て読み込まずに1行ずつ処理する。
+    要素がJSONとして不正な場合は、要素の代わりに例外を返す。
+    """
+    if request.mimetype == NDJSON_MIMETYPE:
+        index = 0
+        for line in request.stream:
+            if not line.strip():
+                continue
+            try:
+                yield index, current_app.json.loads(line)
+            except ValueError as e:
+                yield index, e
+            index += 1
+        return
+
+    items = request.get_json(silent=True)
+    if not isinstance(items, list):
+        raise InvalidInputError("Request body must be a JSON array or NDJSON.")
+    yield from enumerate(items)
+
+
+def _validate_bulk_chunk(chunk, errors):
+    """
+    チャンク内の要素を検証し、正常なDTOのリストを返します。不正な行は errors に追加する。
+    """
+    valid = []
+    for index, item in chunk:
+        if isinstance(item, ValueError):
+            errors.append({"index": index, "errors": [{"msg": f"Invalid JSON: {item}"}]})
+            continue
+        try:
+            valid.append(UserCreateDTO.model_validate(item))
+        except ValidationError as e:
+            errors.append({"index": index, "errors": e.errors(include_url=False)})
+    return valid
+
+
+def _bulk_response(created_ids, errors):
+    logger.info(f"Bulk add finished: created={len(created_ids)}, failed={len(errors)}")
+    if not errors:
+        status = 201
+    elif created_ids:
+        status = 207  # 一部のみ成功
+    else:
+        status = 400
+    return jsonify({"created": len(created_ids), "ids": created_ids, "errors": errors}), status
+
+
+@user_bp.route("/users/bulk", methods=["POST"])
+def add_users_bulk():
+    logger.info("Adding users in bulk")
+    user_service = get_user_service()
+    created_ids = []
+    errors = []
+
+    items = _iter_bulk_items()
+    while chunk := list(islice(items, BULK_CHUNK_SIZE)):
+        # チャンク単位で検証し、正常な行だけを1トランザクションで登録する
+        valid = _validate_bulk_chunk(chunk, errors)
+        if valid:
+            created_ids.extend(user.id for user in user_service.add_users(valid))
+
+    return _bulk_response(created_ids, errors)
+
+
+@async_user_bp.route("/users", methods=["GET"])
+async def get_users_async():
+    after_id = _get_int_arg("after_id", min_value=0)
+    limit = _get_int_arg("limit", DEFAULT_PAGE_SIZE, min_value=1, max_value=MAX_PAGE_SIZE)
+    query = _get_user_query(limit, after_id)
+    user_service = get_async_user_service()
+
+    # 版番号と一覧を1回の呼び出しで取得する（304の場合も一覧を読み込むが、待ち合わせは1回で済む）
+    logger.info("Fetching users")
+    version, users_dto = await user_service.get_users_page(limit=limit, after_id=after_id, query=query)
+    etag = _users_etag(version, limit, after_id, query)
+    if request.if_none_match.contains_weak(etag):
+        return _not_modified_response(etag)
+    logger.info(f"Fetched {len(users_dto)} users")
+    return _users_page_response(users_dto, etag, limit)
+
+
+@async_user_bp.route("/users", methods=["POST"])
+async def add_user_async():
+    logger.info("Adding new user")
+    user_data = request.get_json()
+    if not user_data:
+        logger.warning("No user data provided in request")
+        return jsonify({"error": "No user data provided"}), 400
+
+    user_create_dto = UserCreateDTO(**user_data)
+    created_user_dto = await get_async_user_service().add_user(user_create_dto)
+    logger.info(f"User added: {created_user_dto.id}")
+    # DTOを辞書に変換せず、そのままJSONにする
+    return jsonify(created_user_dto), 201
+
+
+@async_user_bp.route("/users/bulk", methods=["POST"])
+async def add_users_bulk_async():
+    logger.info("Adding users in bulk")
+    user_service = get_async_user_service()
+    created_ids = []
+    errors = []
+
+    items = _iter_bulk_items()
+    while chunk := list(islice(items, BULK_CHUNK_SIZE)):
+        valid = _validate_bulk_chunk(chunk, errors)
+        if valid:
+            created_ids.extend(user.id for user in await user_service.add_users(valid))
+
+    return _bulk_response(created_ids, errors)
@@ -0,0 +1,97 @@
+"""
+本番用のサーバー起動エントリーポイント（gunicorn）。
+
+    python serve.py --workers 4 --threads 8 --preload
+    kill -HUP <masterのpid>   # ワーカーを順次入れ替える（graceful reload）
+
+各オプションは環境変数でも指定できる（WEB_BIND, WEB_CONCURRENCY, WEB_THREADS, WEB_PRELOAD,
+WEB_TIMEOUT, WEB_GRACEFUL_TIMEOUT, WEB_MAX_REQUESTS, WEB_MAX_REQUESTS_JITTER）。
+`--preload` の場合はmasterでアプリを1回だけ作成し、ワーカーはfork後に warmup() で準備する。
+HUPでコードを読み込み直したい場合は `--preload` を付けないこと。
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+
+
+def default_workers() -> int:
+    return multiprocessing.cpu_count() * 2 + 1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the app under gunicorn.")
+    parser.add_argument("--bind", default=os.environ.get("WEB_BIND", "0.0.0.0:8000"))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", default_workers()))
+    )
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("WEB_THREADS", "4")))
+    parser.add_argument(
+        "--preload",
+        action=argparse.BooleanOptionalAction,
+        default=os.environ.get("WEB_PRELOAD", "true") == "true",
+        help="masterでアプリを作成してからforkする",
+    )
+    parser.add_argument("--timeout", type=int, default=int(os.environ.get("WEB_TIMEOUT", "30")))
+    parser.add_argument(
+        "--graceful-timeout", type=int, default=int(os.environ.get("WEB_GRACEFUL_TIMEOUT", "30"))
+    )
+    # メモリリーク対策として、一定数のリクエストを処理したワーカーを入れ替える（0で無効）
+    parser.add_argument(
+        "--max-requests", type=int, default=int(os.environ.get("WEB_MAX_REQUESTS", "0"))
+    )
+    parser.add_argument(
+        "--max-requests-jitter", type=int, default=int(os.environ.get("WEB_MAX_REQUESTS_JITTER", "0"))
+    )
+    return parser.parse_args(argv)
+
+
+def build_options(args) -> dict:
+    """gunicornの設定を組み立てます。"""
+    return {
+        "bind": args.bind,
+        "workers": args.workers,
+        "threads": args.threads,
+        # threads > 1 の場合、各ワーカーはスレッドプールでリクエストを処理する
+        "worker_class": "gthread" if args.threads > 1 else "sync",
+        "preload_app": args.preload,
+        "timeout": args.timeout,
+        "graceful_timeout": args.graceful_timeout,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests_jitter,
+        # ログは structlog で出力するので、gunicornのアクセスログは出さない
+        "accesslog": None,
+        "post_worker_init": post_worker_init,
+    }
+
+
+def post_worker_init(worker):
+    """ワーカーごとに、アプリの読み込み後・最初のリクエストの前に呼ばれる。"""
+    from app import warmup
+
+    warmup(worker.wsgi)
+
+
+def main(argv=None):
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        sys.exit("gunicorn is not installed. Run `pip install -r requirements.txt`.")
+
+    args = parse_args(argv)
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in build_options(args).items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app import create_app
+
+            return create_app()
+
+    Application().run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+from typing import Optional
+
+from application.ports.user_dto import UserResponse, UserCreateDTO, to_user_response
+from application.ports.async_user_repository_port import IAsyncUserRepository
+from application.ports.user_query import UserQuery
+from utils.logging import get_logger
+from utils.decorators import log_errors
+from application.exceptions import UserNotFoundError
+from domain.user_domain import User
+
+
+logger = get_logger(__name__)
+
+
+class AsyncUserService:
+    """
+    UserServiceの非同期版。ビジネスロジックは UserService と同じ。
+    """
+
+    def __init__(self, user_repository: IAsyncUserRepository):
+        self.user_repository = user_repository
+
+    @log_errors(logger_name=__name__)
+    async def get_users(self, limit: int = 100, after_id: Optional[int] = None) -> list[UserResponse]:
+        logger.info("Fetching users from repository")
+        users = await self.user_repository.get_users(limit=limit, after_id=after_id)
+        # 2ページ目以降が空なのは正常な結果なので、先頭ページのみ対象とする
+        if not users and after_id is None:
+            raise UserNotFoundError("No users found in the system.")
+        logger.info("Fetched users from repository")
+        return [to_user_response(user) for user in users]
+
+    @log_errors(logger_name=__name__)
+    async def search_users(self, query: UserQuery) -> list[UserResponse]:
+        users = await self.user_repository.find_users(query)
+        return [to_user_response(user) for user in users]
+
+    async def get_users_version(self) -> int:
+        return await self.user_repository.get_version()
+
+    @log_errors(logger_name=__name__)
+    async def get_users_page(
+        self, limit: int = 100, after_id: Optional[int] = None, query: Optional[UserQuery] = None
+    ) -> tuple[int, list[UserResponse]]:
+        """
+        (版番号, 一覧) を返す。版番号は一覧より先に読むので、一覧より新しくなることはない（ETagに使う）。
+        queryを指定した場合は search_users、それ以外は get_users と同じ結果（とエラー）になる。
+        """
+        version, users = await self.user_repository.get_users_page(limit=limit, after_id=after_id, query=query)
+        if query is None and not users and after_id is None:
+            raise UserNotFoundError("No users found in the system.")
+        return version, [to_user_response(user) for user in users]
+
+    @log_errors(logger_name=__name__)
+    async def add_user(self, user_create_dto: UserCreateDTO) -> UserResponse:
+        logger.info(f"Adding user: {user_create_dto.name}")
+        user = User(name=user_create_dto.name, age=user_create_dto.age, nickname=user_create_dto.nickname)
+        created_user = await self.user_repository.add_user(user)
+        logger.info(f"User added with ID: {created_user.id}")
+        return to_user_response(created_user)
+
+    @log_errors(logger_name=__name__)
+    async def add_users(self, user_create_dtos: list[UserCreateDTO]) -> list[UserResponse]:
+        logger.info(f"Adding users in bulk: {len(user_create_dtos)}")
+        users = [
+            User(name=dto.name, age=dto.age, nickname=dto.nickname)
+            for dto in user_create_dtos
+        ]
+        created_users = await self.user_repository.add_users(users)
+        return [to_user_response(user) for user in created_users]
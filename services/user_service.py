@@ -1,4 +1,7 @@
-from application.ports.user_dto import UserResponse, UserCreateDTO
+from typing import Iterator, Optional
+
+from application.ports.user_dto import UserResponse, UserCreateDTO, to_user_response
+from application.ports.user_query import UserQuery
 from application.ports.user_repository_port import IUserRepository
 from utils.logging import get_logger
 from utils.decorators import log_errors
@@ -14,16 +17,50 @@ class UserService:
         self.user_repository = user_repository
 
     @log_errors(logger_name=__name__)
-    def get_users(self) -> list[UserResponse]:
+    def get_users(self, limit: int = 100, after_id: Optional[int] = None) -> list[UserResponse]:
         logger.info("Fetching users from repository")
-        users = self.user_repository.get_users()
-        if (
-            not users
-        ):  # 例として、ビジネスロジック層でユーザーが見つからない場合に例外を発生させる
+        users = self.user_repository.get_users(limit=limit, after_id=after_id)
+        # 例として、ビジネスロジック層でユーザーが見つからない場合に例外を発生させる
+        # 2ページ目以降が空なのは正常な結果なので、先頭ページのみ対象とする
+        if not users and after_id is None:
             raise UserNotFoundError("No users found in the system.")
         logger.info("Fetched users from repository")
-        # ドメインモデルからDTOへの変換
-        return [UserResponse.model_validate(user.model_dump()) for user in users]
+        # ドメインモデルからDTOへの変換（検証済みなので再検証しない）
+        return [to_user_response(user) for user in users]
+
+    @log_errors(logger_name=__name__)
+    def search_users(self, query: UserQuery) -> list[UserResponse]:
+        """
+        条件に一致するユーザーを返す。一致しない場合は空のリスト（エラーにはしない）。
+        """
+        users = self.user_repository.find_users(query)
+        return [to_user_response(user) for user in users]
+
+    def get_users_version(self) -> int:
+        """
+        ユーザー一覧の版番号を返す。一覧が変更されていないかを安価に判定するために使う。
+        """
+        return self.user_repository.get_version()
+
+    @log_errors(logger_name=__name__)
+    def get_users_page(
+        self, limit: int = 100, after_id: Optional[int] = None, query: Optional[UserQuery] = None
+    ) -> tuple[int, list[UserResponse]]:
+        """
+        (版番号, 一覧) を返す。版番号は返す一覧と組で読み込まれたもので、ETagに使う。
+        queryを指定した場合は search_users、それ以外は get_users と同じ結果（とエラー）になる。
+        """
+        version, users = self.user_repository.get_users_page(limit=limit, after_id=after_id, query=query)
+        if query is None and not users and after_id is None:
+            raise UserNotFoundError("No users found in the system.")
+        return version, [to_user_response(user) for user in users]
+
+    def iter_users(self, after_id: Optional[int] = None) -> Iterator[UserResponse]:
+        """
+        ユーザーを1件ずつDTOに変換して返す（ストリーミング用）。
+        """
+        for user in self.user_repository.iter_users(after_id=after_id):
+            yield to_user_response(user)
 
     @log_errors(logger_name=__name__)
     def add_user(self, user_create_dto: UserCreateDTO) -> UserResponse:
@@ -31,4 +68,14 @@ class UserService:
         user = User(name=user_create_dto.name, age=user_create_dto.age, nickname=user_create_dto.nickname)
         created_user = self.user_repository.add_user(user)
         logger.info(f"User added with ID: {created_user.id}")
-        return UserResponse.model_validate(created_user.model_dump())
+        return to_user_response(created_user)
+
+    @log_errors(logger_name=__name__)
+    def add_users(self, user_create_dtos: list[UserCreateDTO]) -> list[UserResponse]:
+        logger.info(f"Adding users in bulk: {len(user_create_dtos)}")
+        users = [
+            User(name=dto.name, age=dto.age, nickname=dto.nickname)
+            for dto in user_create_dtos
+        ]
+        created_users = self.user_repository.add_users(users)
+        return [to_user_response(user) for user in created_users]
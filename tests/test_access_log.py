@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+from app import app
+from utils.access_log import AccessLogSampler, parse_path_rates
+
+
+def test_parse_path_rates():
+    assert parse_path_rates("/users=0.1, /hello=0") == {"/users": 0.1, "/hello": 0.0}
+    assert parse_path_rates("") == {}
+
+
+def test_errors_and_slow_requests_are_always_logged():
+    sampler = AccessLogSampler(default_rate=0.0, slow_ms=100)
+
+    assert sampler.should_log("/users", 500, 1)
+    assert sampler.should_log("/users", 404, 1)
+    assert sampler.should_log("/users", 200, 150)
+    assert not sampler.should_log("/users", 200, 1)
+
+
+def test_static_and_excluded_paths_are_skipped():
+    sampler = AccessLogSampler(exclude_prefixes=("/health",))
+
+    assert not sampler.should_log("/style.css", 200, 1)
+    assert not sampler.should_log("/health/live", 200, 1)
+    assert sampler.should_log("/users", 200, 1)
+
+
+def test_longest_path_rule_wins():
+    sampler = AccessLogSampler(default_rate=1.0, path_rates={"/users": 0.0, "/users/bulk": 1.0})
+
+    assert sampler.rate_for("/users") == 0.0
+    assert sampler.rate_for("/users/bulk") == 1.0
+    assert sampler.rate_for("/hello") == 1.0
+
+
+def test_rate_based_sampling():
+    sampler = AccessLogSampler(default_rate=0.5)
+
+    with patch("utils.access_log.random.random", side_effect=[0.2, 0.8]):
+        assert sampler.should_log("/users", 200, 1)
+        assert not sampler.should_log("/users", 200, 1)
+
+
+def test_single_access_log_line_per_request():
+    app.config["TESTING"] = True
+    with patch("app.logger") as mock_logger, app.test_client() as client:
+        client.get("/hello?name=test")
+
+    mock_logger.info.assert_called_once()
+    args, kwargs = mock_logger.info.call_args
+    assert args == ("Request completed",)
+    assert kwargs["status_code"] == 200
+    assert "duration_ms" in kwargs
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import serve
+from app import create_app, warmup
+
+
+def _make_app(tmp_path, **overrides):
+    config = {"TESTING": True, "DATABASE": str(tmp_path / "factory.db")}
+    config.update(overrides)
+    return create_app(config)
+
+
+def test_create_app_applies_config_overrides(tmp_path):
+    app = _make_app(tmp_path, USER_CACHE_ENABLED=False)
+
+    assert app.config["TESTING"] is True
+    assert app.config["DATABASE"] == str(tmp_path / "factory.db")
+    assert app.config["USER_CACHE_ENABLED"] is False
+
+
+def test_create_app_returns_independent_apps(tmp_path):
+    first = _make_app(tmp_path)
+    second = _make_app(tmp_path)
+
+    assert first is not second
+    assert first.extensions is not second.extensions
+
+
+def test_create_app_does_not_open_pool_before_first_request(tmp_path):
+    # fork前に呼ばれても、プロセス固有のリソースを持たないこと
+    app = _make_app(tmp_path)
+    assert "db_pool" not in app.extensions
+
+    response = app.test_client().get("/users")
+
+    assert response.status_code == 200
+    assert "db_pool" in app.extensions
+
+
+def test_warmup_opens_a_pooled_connection(tmp_path):
+    app = _make_app(tmp_path)
+
+    warmup(app)
+
+    stats = app.extensions["db_pool"].stats()
+    assert stats["creations"] == 1
+    assert stats["idle"] == 1
+    assert stats["in_use"] == 0
+
+
+def test_build_options_uses_threaded_workers():
+    args = serve.parse_args(["--workers", "3", "--threads", "8", "--no-preload", "--max-requests", "1000"])
+
+    options = serve.build_options(args)
+
+    assert options["workers"] == 3
+    assert options["threads"] == 8
+    assert options["worker_class"] == "gthread"
+    assert options["preload_app"] is False
+    assert options["max_requests"] == 1000
+    assert options["post_worker_init"] is serve.post_worker_init
+
+
+def test_build_options_uses_sync_worker_for_single_thread():
+    options = serve.build_options(serve.parse_args(["--threads", "1"]))
+
+    assert options["worker_class"] == "sync"
+
+
+def test_post_worker_init_warms_up_worker_app(tmp_path):
+    app = _make_app(tmp_path)
+
+    serve.post_worker_init(SimpleNamespace(wsgi=app))
+
+    assert app.extensions["db_pool"].stats()["creations"] == 1
+
+
+def test_spa_deep_link_serves_index_html(tmp_path):
+    app = _make_app(tmp_path)
+    client = app.test_client()
+
+    deep_link = client.get("/some/deep/link")
+    index = client.get("/")
+
+    assert deep_link.status_code == 200
+    assert deep_link.mimetype == "text/html"
+    assert deep_link.data == index.data
+    assert client.get("/style.css").mimetype == "text/css"
@@ -0,0 +1,129 @@
+import atexit
+import io
+import logging
+import os
+import threading
+
+from utils import async_logging
+from utils.async_logging import AsyncLogSink
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, s):
+        self.writes += 1
+        return super().write(s)
+
+
+def _record(message):
+    return logging.LogRecord("test", logging.INFO, __file__, 0, message, None, None)
+
+
+def test_records_are_written_in_batches():
+    release = threading.Event()
+    started = threading.Event()
+
+    class BlockingFormatter(logging.Formatter):
+        def format(self, record):
+            started.set()
+            release.wait()
+            return super().format(record)
+
+    stream = CountingStream()
+    sink = AsyncLogSink(stream, BlockingFormatter("%(message)s"), batch_size=100)
+    sink.handler.handle(_record("first"))
+    started.wait()  # 1件目の書き込み中に残りをキューに積む
+    for i in range(10):
+        sink.handler.handle(_record(f"line {i}"))
+
+    release.set()
+    sink.stop()
+
+    assert stream.getvalue().splitlines() == ["first"] + [f"line {i}" for i in range(10)]
+    # 1件目と、残りの10件をまとめた2回の書き込み
+    assert stream.writes == 2
+
+
+def test_drop_policy_discards_when_queue_is_full():
+    release = threading.Event()
+    started = threading.Event()
+
+    class BlockingFormatter(logging.Formatter):
+        def format(self, record):
+            started.set()
+            release.wait()
+            return super().format(record)
+
+    stream = io.StringIO()
+    sink = AsyncLogSink(stream, BlockingFormatter("%(message)s"), max_queue_size=1, batch_size=1)
+    sink.handler.handle(_record("first"))
+    started.wait()  # 1件目の書き込み中
+    sink.handler.handle(_record("second"))  # キューに積まれる
+    sink.handler.handle(_record("third"))  # キューが満杯なので破棄される
+
+    release.set()
+    sink.stop()
+
+    assert sink.dropped == 1
+    assert stream.getvalue().splitlines() == ["first", "second"]
+
+
+def test_flush_waits_until_written():
+    stream = io.StringIO()
+    sink = AsyncLogSink(stream, logging.Formatter("%(message)s"))
+    for i in range(100):
+        sink.handler.handle(_record(f"line {i}"))
+
+    sink.flush()
+
+    assert len(stream.getvalue().splitlines()) == 100
+    sink.stop()
+
+
+def test_sinks_do_not_register_process_hooks(monkeypatch):
+    registered = []
+    monkeypatch.setattr(atexit, "register", lambda *args, **kwargs: registered.append(args))
+    monkeypatch.setattr(os, "register_at_fork", lambda **kwargs: registered.append(kwargs))
+
+    sinks = [AsyncLogSink(io.StringIO(), logging.Formatter("%(message)s")) for _ in range(3)]
+    assert registered == []
+    assert all(sink in async_logging._live_sinks for sink in sinks)
+
+    for sink in sinks:
+        sink.stop()
+    # 停止したシンクは終了時・fork時のフックの対象から外れる
+    assert not any(sink in async_logging._live_sinks for sink in sinks)
+
+
+def test_dropped_count_is_exact_under_concurrency():
+    release = threading.Event()
+    started = threading.Event()
+
+    class BlockingFormatter(logging.Formatter):
+        def format(self, record):
+            started.set()
+            release.wait()
+            return super().format(record)
+
+    sink = AsyncLogSink(io.StringIO(), BlockingFormatter("%(message)s"), max_queue_size=1, batch_size=1)
+    sink.enqueue(_record("first"))
+    started.wait()  # 1件目の書き込み中
+
+    def emit():
+        for i in range(1000):
+            sink.enqueue(_record(f"line {i}"))
+
+    threads = [threading.Thread(target=emit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    queued = sink.queue.qsize()
+    release.set()
+    sink.stop()
+
+    # キューに残った件数以外はすべて破棄として数えられる
+    assert sink.dropped + queued == 8 * 1000
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock
+
+import pytest
+
+from application.exceptions import UserNotFoundError
+from application.ports.async_user_repository_port import IAsyncUserRepository
+from application.ports.user_dto import UserCreateDTO, UserResponse
+from domain.user_domain import User
+from infra.client.connection_pool import ConnectionPool
+from infra.client.migrations import run_migrations
+from infra.repository.threaded_user_repository import ThreadedUserRepository
+from services.async_user_service import AsyncUserService
+
+
+def test_get_users_with_mock():
+    repository = AsyncMock()
+    repository.get_users.return_value = [User(id=1, name="Async User", age=30, nickname=None)]
+
+    result = asyncio.run(AsyncUserService(repository).get_users(limit=10))
+
+    repository.get_users.assert_awaited_once_with(limit=10, after_id=None)
+    assert result == [UserResponse(id=1, name="Async User", age=30, nickname=None)]
+
+
+def test_get_users_raises_when_first_page_is_empty():
+    repository = AsyncMock()
+    repository.get_users.return_value = []
+
+    with pytest.raises(UserNotFoundError):
+        asyncio.run(AsyncUserService(repository).get_users())
+
+
+class _WriteBetweenReadsRepository(IAsyncUserRepository):
+    """一覧を読み込んだ直後に、別のリクエストの書き込みが割り込むリポジトリ。"""
+
+    def __init__(self):
+        self.version = 1
+        self.users = [User(id=1, name="Async User", age=30, nickname=None)]
+
+    async def get_users(self, limit=100, after_id=None):
+        users = list(self.users)
+        # 一覧を読んだ後に書き込みが行われる
+        self.users.append(User(id=2, name="New User", age=20, nickname=None))
+        self.version += 1
+        return users
+
+    async def find_users(self, query):
+        raise NotImplementedError
+
+    async def get_version(self):
+        # 別のコネクションでの読み込みの待ち時間
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return self.version
+
+    async def add_user(self, user):
+        raise NotImplementedError
+
+    async def add_users(self, users):
+        raise NotImplementedError
+
+
+def test_get_users_page_does_not_pair_new_version_with_old_list():
+    version, users = asyncio.run(AsyncUserService(_WriteBetweenReadsRepository()).get_users_page(limit=10))
+
+    # 一覧は版番号1の時点のもの。版番号2（書き込み後）のETagで古い一覧を返さない
+    assert version == 1
+    assert [user.id for user in users] == [1]
+
+
+def test_get_users_page_raises_when_first_page_is_empty():
+    repository = AsyncMock()
+    repository.get_users_page.return_value = (1, [])
+
+    with pytest.raises(UserNotFoundError):
+        asyncio.run(AsyncUserService(repository).get_users_page())
+
+
+@pytest.fixture
+def threaded_repository(tmp_path):
+    database = str(tmp_path / "async.db")
+    run_migrations(database)
+    pool = ConnectionPool(database, max_size=2, timeout=1.0)
+    executor = ThreadPoolExecutor(max_workers=2)
+    yield ThreadedUserRepository(pool, executor)
+    executor.shutdown()
+    pool.close()
+
+
+def test_threaded_repository_reads_and_writes(threaded_repository):
+    async def scenario():
+        service = AsyncUserService(threaded_repository)
+        created = await service.add_users(
+            [UserCreateDTO(name="A", age=20), UserCreateDTO(name="B", age=21)]
+        )
+        version, users = await service.get_users_page(limit=100, after_id=created[0].id - 1)
+        return created, version, users
+
+    created, version, users = asyncio.run(scenario())
+
+    assert [user.name for user in users] == ["A", "B"]
+    assert [user.id for user in users] == [user.id for user in created]
+    assert version > 0
+
+
+def test_threaded_repository_runs_off_the_event_loop_thread(threaded_repository):
+    threads = set()
+
+    def factory(conn):
+        threads.add(threading.current_thread())
+        from infra.repository.user_repository import UserRepository
+
+        return UserRepository(conn)
+
+    threaded_repository.repository_factory = factory
+    asyncio.run(threaded_repository.get_version())
+
+    assert threads and threading.current_thread() not in threads
+    # コネクションはプールに返却されている
+    assert threaded_repository.pool.stats()["in_use"] == 0
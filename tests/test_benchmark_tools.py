@@ -0,0 +1,37 @@
+from app import app
+from benchmarks.compare import compare
+from benchmarks.load_test import ServerThread, percentile, run_load
+
+
+def test_percentile():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 99) == 0.0
+
+
+def test_run_load_against_wsgi_server():
+    with ServerThread(app) as server:
+        result = run_load(server.url + "/hello?name=load", concurrency=2, requests=20)
+
+    assert result["requests"] == 20
+    assert result["errors"] == 0
+    assert result["status_counts"] == {"200": 20}
+    assert result["latency_ms"]["p99"] >= result["latency_ms"]["p50"] > 0
+
+
+def test_compare_detects_regressions():
+    baseline = {
+        "benchmarks": {"bench_a": 1.0, "bench_b": 1.0},
+        "load": {"GET /users c=8": {"p99_ms": 10.0, "requests_per_second": 100.0}},
+    }
+    current = {
+        "benchmarks": {"bench_a": 1.1, "bench_b": 2.0},
+        "load": {"GET /users c=8": {"p99_ms": 20.0, "requests_per_second": 100.0}},
+    }
+
+    regressions = compare(baseline, current, tolerance=0.25)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("bench_b")
+    assert "p99" in regressions[1]
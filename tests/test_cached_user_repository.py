@@ -0,0 +1,154 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from application.ports.user_repository_port import IUserRepository
+from domain.user_domain import User
+from infra.cache.cache_backend import InMemoryCacheBackend
+from infra.cache.lru_ttl_cache import LRUTTLCache
+from infra.cache.tiered_cache import TieredCache
+from infra.repository.cached_user_repository import (
+    CachedUserRepository,
+    deserialize_cache_value,
+    serialize_cache_value,
+)
+
+
+@pytest.fixture
+def inner_repository():
+    repository = MagicMock(spec=IUserRepository)
+    repository.get_users.return_value = [User(id=1, name="Cached User", age=30)]
+    return repository
+
+
+@pytest.fixture
+def shared_backend():
+    return InMemoryCacheBackend()
+
+
+@pytest.fixture
+def cache(shared_backend):
+    return TieredCache(
+        LRUTTLCache(max_size=2, ttl=60),
+        shared=shared_backend,
+        serialize=serialize_cache_value,
+        deserialize=deserialize_cache_value,
+    )
+
+
+def test_get_users_is_cached(inner_repository, cache):
+    repository = CachedUserRepository(inner_repository, cache)
+
+    first = repository.get_users(limit=10)
+    second = repository.get_users(limit=10)
+
+    assert first == second
+    inner_repository.get_users.assert_called_once_with(limit=10, after_id=None)
+    assert cache.stats()["local"]["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_add_user_invalidates_cache(inner_repository, cache):
+    repository = CachedUserRepository(inner_repository, cache)
+    repository.get_users()
+
+    repository.add_user(User(name="New User", age=20))
+    repository.get_users()
+
+    assert inner_repository.get_users.call_count == 2
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_shared_tier_is_used_after_local_miss(inner_repository, cache):
+    repository = CachedUserRepository(inner_repository, cache)
+    repository.get_users()
+    cache.local.clear()  # 別プロセスを模擬
+
+    users = repository.get_users()
+
+    inner_repository.get_users.assert_called_once()
+    assert users == [User(id=1, name="Cached User", age=30)]
+    assert cache.stats()["shared_hits"] == 1
+
+
+def test_local_tier_evicts_least_recently_used(inner_repository, cache):
+    repository = CachedUserRepository(inner_repository, cache)
+    repository.get_users(limit=1)
+    repository.get_users(limit=2)
+    repository.get_users(limit=3)
+
+    assert cache.stats()["local"]["evictions"] == 1
+    assert cache.stats()["local"]["size"] == 2
+
+
+def test_stale_read_is_not_stored_after_invalidation(cache):
+    generation = cache.current_generation()
+    cache.invalidate()  # 読み込み中に書き込みが行われた
+
+    cache.set(("users", "get_users", 100, None), [], generation)
+
+    assert cache.get(("users", "get_users", 100, None)) is None
+
+
+def test_stale_read_from_another_process_is_not_served_from_shared_tier(inner_repository, shared_backend):
+    def make_cache():
+        return TieredCache(
+            LRUTTLCache(max_size=2, ttl=60),
+            shared=shared_backend,
+            serialize=serialize_cache_value,
+            deserialize=deserialize_cache_value,
+        )
+
+    # 同じ共有層を使う2つのプロセスを模擬する
+    reader, writer = make_cache(), make_cache()
+    key = ("users", "get_users", 100, None)
+    generation = reader.current_generation()  # readerが書き込みの前に読み込みを開始
+    writer.invalidate()  # 別プロセスで書き込みが行われた
+
+    # readerのプロセス内の世代番号は変わっていないので、古い値を保存しようとする
+    reader.set(key, [User(id=1, name="Stale", age=30)], generation)
+
+    assert make_cache().get(key) is None
+    assert writer.get(key) is None
+
+
+def test_lru_ttl_cache_expires_entries():
+    local = LRUTTLCache(max_size=10, ttl=0)
+    local.set("key", "value")
+
+    assert local.get("key") is None
+    assert local.stats()["expirations"] == 1
+
+
+def test_get_version_is_cached_until_write(inner_repository, cache):
+    inner_repository.get_version.side_effect = [1, 2]
+    repository = CachedUserRepository(inner_repository, cache)
+
+    assert repository.get_version() == 1
+    assert repository.get_version() == 1
+    repository.add_user(User(name="New User", age=20))
+    assert repository.get_version() == 2
+
+
+def test_cached_page_keeps_the_version_it_was_read_with(inner_repository, cache):
+    inner_repository.get_users_page.return_value = (1, [User(id=1, name="Cached User", age=30)])
+    repository = CachedUserRepository(inner_repository, cache)
+
+    assert repository.get_users_page(limit=10) == (1, [User(id=1, name="Cached User", age=30)])
+    # 版番号のキーだけが先に期限切れになり、別プロセスの書き込み後の版番号が読み込まれた場合
+    cache.local.set(("users", "version"), 2)
+    assert repository.get_version() == 2
+
+    # キャッシュされた一覧は、一緒に読み込んだ版番号と組で返る
+    assert repository.get_users_page(limit=10)[0] == 1
+    inner_repository.get_users_page.assert_called_once_with(limit=10, after_id=None, query=None)
+
+
+def test_cached_page_round_trips_through_shared_tier(inner_repository, cache):
+    inner_repository.get_users_page.return_value = (7, [User(id=1, name="Cached User", age=30)])
+    repository = CachedUserRepository(inner_repository, cache)
+    repository.get_users_page(limit=10)
+    cache.local.clear()  # 別プロセスを模擬
+
+    assert repository.get_users_page(limit=10) == (7, [User(id=1, name="Cached User", age=30)])
+    assert cache.stats()["shared_hits"] == 1
@@ -0,0 +1,104 @@
+import gzip
+
+import pytest
+from flask import Flask, Response, request, stream_with_context
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+import utils.compression as compression
+from utils.compression import ResponseCompressor, negotiate_encoding
+
+
+BODY = b'{"name": "user"}' * 200
+
+
+@pytest.fixture
+def app(monkeypatch):
+    # brotliの有無に関わらず同じ結果になるよう、gzipのみで検証する
+    monkeypatch.setattr(compression, "brotli", None)
+    app = Flask(__name__)
+    compressor = ResponseCompressor(min_size=100)
+
+    @app.route("/large")
+    def large():
+        response = Response(BODY, mimetype="application/json")
+        response.set_etag("v1")
+        return response
+
+    @app.route("/small")
+    def small():
+        return Response(b"{}", mimetype="application/json")
+
+    @app.route("/image")
+    def image():
+        return Response(BODY, mimetype="image/png")
+
+    @app.route("/stream")
+    def stream():
+        def generate():
+            for i in range(3):
+                yield f'{{"id": {i}}}\n'
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    @app.after_request
+    def compress(response):
+        return compressor.compress(response, request.accept_encodings)
+
+    return app
+
+
+def test_large_response_is_gzipped(app):
+    response = app.test_client().get("/large", headers={"Accept-Encoding": "gzip, deflate"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert int(response.headers["Content-Length"]) == len(response.data) < len(BODY)
+    assert gzip.decompress(response.data) == BODY
+    assert "Accept-Encoding" in response.vary
+    assert response.headers["ETag"] == 'W/"v1"'
+
+
+def test_response_is_not_compressed_without_accept_encoding(app):
+    response = app.test_client().get("/large", headers={"Accept-Encoding": "identity"})
+
+    assert "Content-Encoding" not in response.headers
+    assert response.data == BODY
+    assert "Accept-Encoding" in response.vary
+
+
+@pytest.mark.parametrize("path", ["/small", "/image"])
+def test_small_or_incompressible_response_is_not_compressed(app, path):
+    response = app.test_client().get(path, headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+
+
+def test_streamed_response_is_compressed_per_chunk(app):
+    response = app.test_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert gzip.decompress(response.data) == b'{"id": 0}\n{"id": 1}\n{"id": 2}\n'
+
+
+def test_negotiate_encoding_prefers_quality_then_order():
+    accept = parse_accept_header("gzip;q=1.0, br;q=0.5", Accept)
+    assert negotiate_encoding(accept, ("br", "gzip")) == "gzip"
+
+    accept = parse_accept_header("gzip, br", Accept)
+    assert negotiate_encoding(accept, ("br", "gzip")) == "br"
+
+    accept = parse_accept_header("deflate", Accept)
+    assert negotiate_encoding(accept, ("br", "gzip")) is None
+
+
+def test_brotli_is_used_when_available():
+    brotli = pytest.importorskip("brotli")
+    app = Flask(__name__)
+    compressor = ResponseCompressor(min_size=100)
+
+    with app.test_request_context(headers={"Accept-Encoding": "gzip, br"}):
+        response = compressor.compress(Response(BODY, mimetype="application/json"), request.accept_encodings)
+
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(response.get_data()) == BODY
@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+from application.exceptions import DatabaseUnavailableError
+from infra.client.connection_pool import ConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(
+        str(tmp_path / "pool.db"),
+        max_size=2,
+        timeout=0.05,
+        pragmas={"journal_mode": "WAL", "synchronous": "NORMAL"},
+    )
+    yield pool
+    pool.close()
+
+
+def test_connection_is_reused(pool):
+    conn = pool.acquire()
+    pool.release(conn)
+
+    assert pool.acquire() is conn
+    assert pool.stats()["creations"] == 1
+    assert pool.stats()["in_use"] == 1
+
+
+def test_pragmas_are_applied(pool):
+    conn = pool.acquire()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    # NORMAL == 1
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    pool.release(conn)
+
+
+def test_checkout_timeout_when_exhausted(pool):
+    pool.acquire()
+    pool.acquire()
+
+    with pytest.raises(DatabaseUnavailableError):
+        pool.acquire()
+
+    stats = pool.stats()
+    assert stats["in_use"] == 2
+    assert stats["waits"] == 1
+    assert stats["timeouts"] == 1
+
+
+def test_waiter_gets_released_connection(pool):
+    pool.timeout = 2.0
+    conn1 = pool.acquire()
+    pool.acquire()
+    result = {}
+
+    def borrow():
+        result["conn"] = pool.acquire()
+
+    thread = threading.Thread(target=borrow)
+    thread.start()
+    pool.release(conn1)
+    thread.join()
+
+    assert result["conn"] is conn1
+    assert pool.stats()["creations"] == 2
+
+
+def test_unhealthy_connection_is_replaced(pool):
+    pool.health_check_interval = 0
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.close()  # 壊れたコネクションを模擬
+
+    new_conn = pool.acquire()
+
+    assert new_conn is not conn
+    assert pool.stats()["health_check_failures"] == 1
+    assert pool.stats()["size"] == 1
+
+
+def test_release_rolls_back_open_transaction(pool):
+    conn = pool.acquire()
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.commit()
+    conn.execute("INSERT INTO t VALUES (1)")
+    pool.release(conn)
+
+    conn = pool.acquire()
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    pool.release(conn)
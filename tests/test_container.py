@@ -0,0 +1,125 @@
+import pytest
+from flask import Flask, g
+
+from app import create_app
+from dependencies import get_container, get_user_service
+from infra.client.db_client import get_read_pool
+from infra.repository.in_memory_user_repository import InMemoryUserRepository
+from utils.container import Container
+
+
+@pytest.fixture
+def flask_app():
+    return Flask(__name__)
+
+
+def test_singleton_is_created_once(flask_app):
+    container = Container()
+    calls = []
+    container.singleton("service", lambda c: calls.append(1) or object())
+
+    with flask_app.app_context():
+        first = container.resolve("service")
+    with flask_app.app_context():
+        assert container.resolve("service") is first
+    assert len(calls) == 1
+
+    container.reset()
+    assert container.resolve("service") is not first
+
+
+def test_request_scope_is_per_app_context(flask_app):
+    container = Container()
+    container.request("conn", lambda c: object())
+
+    with flask_app.app_context():
+        first = container.resolve("conn")
+        assert container.resolve("conn") is first
+    with flask_app.app_context():
+        assert container.resolve("conn") is not first
+
+
+def test_proxy_resolves_on_attribute_access(flask_app):
+    container = Container()
+    created = []
+
+    class Conn:
+        def execute(self):
+            return "executed"
+
+    container.request("conn", lambda c: created.append(1) or Conn())
+    proxy = container.proxy("conn")
+
+    with flask_app.app_context():
+        assert created == []
+        assert proxy.execute() == "executed"
+        assert proxy.execute() == "executed"
+    assert len(created) == 1
+
+
+def test_override_replaces_provider(flask_app):
+    container = Container()
+    container.singleton("service", lambda c: "real")
+
+    with container.override("service", "fake"):
+        assert container.resolve("service") == "fake"
+    assert container.resolve("service") == "real"
+
+
+def test_singletons_built_during_override_are_discarded(flask_app):
+    container = Container()
+    container.singleton("repository", lambda c: "real")
+    container.singleton("service", lambda c: f"service({c.resolve('repository')})")
+
+    assert container.resolve("service") == "service(real)"
+    with container.override("repository", "fake"):
+        # 作成済みの依存先も差し替えた値で作り直される
+        assert container.resolve("service") == "service(fake)"
+    assert container.resolve("service") == "service(real)"
+
+
+def test_register_rejects_unknown_scope():
+    with pytest.raises(ValueError):
+        Container().register("service", lambda c: None, scope="session")
+
+
+def test_user_service_is_shared_across_requests(tmp_path):
+    app = create_app({"DATABASE": str(tmp_path / "app.db")})
+
+    with app.test_request_context("/users"):
+        first = get_user_service()
+    with app.test_request_context("/users"):
+        assert get_user_service() is first
+
+
+def test_override_user_repository_with_fake(tmp_path):
+    app = create_app({"DATABASE": str(tmp_path / "app.db"), "USER_CACHE_ENABLED": False})
+    fake = InMemoryUserRepository()
+
+    with app.app_context():
+        container = get_container()
+    with container.override("user_repository", fake):
+        response = app.test_client().post("/users", json={"name": "Fake", "age": 20})
+        assert response.status_code == 201
+    assert [user.name for user in fake.get_users()] == ["Fake"]
+
+    # with ブロックを抜けたら本来のリポジトリに戻る
+    response = app.test_client().post("/users", json={"name": "Real", "age": 30})
+    assert response.status_code == 201
+    names = [user["name"] for user in app.test_client().get("/users").get_json()]
+    assert "Real" in names
+    assert "Fake" not in names
+    assert [user.name for user in fake.get_users()] == ["Fake"]
+
+
+def test_cached_read_does_not_acquire_connection(tmp_path):
+    app = create_app({"DATABASE": str(tmp_path / "app.db"), "USER_CACHE_ENABLED": True})
+    app.test_client().get("/users")
+
+    with app.test_request_context("/users"):
+        in_use = get_read_pool().stats()["in_use"]
+        response = app.full_dispatch_request()
+        assert response.status_code == 200
+        # キャッシュから返したので、リクエストのコネクションは取得していない
+        assert "_read_database" not in g
+        assert get_read_pool().stats()["in_use"] == in_use
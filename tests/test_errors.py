@@ -0,0 +1,100 @@
+import logging
+from unittest.mock import MagicMock
+
+import pytest
+from flask import Flask
+from pydantic import BaseModel, ValidationError
+from werkzeug.exceptions import NotFound
+
+from application.exceptions import DatabaseUnavailableError, InvalidInputError, UserNotFoundError
+from utils.decorators import log_errors
+from utils.errors import errors_total, is_expected_error, report_error
+
+
+class _Model(BaseModel):
+    value: int
+
+
+def _validation_error():
+    try:
+        _Model(value="x")
+    except ValidationError as e:
+        return e
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (UserNotFoundError(), True),
+        (InvalidInputError(), True),
+        (NotFound(), True),
+        (_validation_error(), True),
+        (DatabaseUnavailableError(), False),
+        (ZeroDivisionError(), False),
+    ],
+)
+def test_is_expected_error(error, expected):
+    assert is_expected_error(error) is expected
+
+
+def test_expected_error_is_logged_without_traceback():
+    logger = MagicMock()
+    before = errors_total.collect().get(("UserNotFoundError", "true"), 0)
+
+    assert report_error(logger, "failed", UserNotFoundError("none"), function="get_users")
+
+    logger.log.assert_called_once_with(
+        logging.INFO, "failed", error_type="UserNotFoundError", error="404 Not Found: none", function="get_users"
+    )
+    logger.error.assert_not_called()
+    assert errors_total.collect()[("UserNotFoundError", "true")] == before + 1
+
+
+def test_unexpected_error_is_logged_with_traceback():
+    logger = MagicMock()
+    error = ZeroDivisionError("boom")
+
+    report_error(logger, "failed", error)
+
+    logger.error.assert_called_once_with("failed", error_type="ZeroDivisionError", exc_info=error)
+
+
+def test_error_is_reported_only_once():
+    logger = MagicMock()
+    error = ZeroDivisionError("boom")
+
+    assert report_error(logger, "first", error)
+    assert not report_error(logger, "second", error)
+
+    assert logger.error.call_count == 1
+
+
+def test_expected_error_log_level_is_configurable():
+    logger = MagicMock()
+    app = Flask(__name__)
+    app.config["EXPECTED_ERROR_LOG_LEVEL"] = "debug"
+
+    with app.app_context():
+        report_error(logger, "failed", InvalidInputError())
+
+    assert logger.log.call_args.args[0] == logging.DEBUG
+
+
+def test_nested_log_errors_report_once(monkeypatch):
+    logger = MagicMock()
+    monkeypatch.setattr("utils.decorators.get_logger", lambda name: logger)
+
+    @log_errors()
+    def inner():
+        raise ZeroDivisionError()
+
+    @log_errors()
+    def outer():
+        inner()
+
+    with pytest.raises(ZeroDivisionError):
+        outer()
+
+    # 最も内側のデコレーターだけが記録する
+    logger.error.assert_called_once()
+    assert logger.error.call_args.kwargs["function"] == "inner"
@@ -0,0 +1,128 @@
+import sqlite3
+import threading
+
+import pytest
+
+from app import create_app
+from dependencies import get_user_service
+from domain.user_domain import User
+from infra.client.connection_pool import ConnectionPool
+from infra.client.group_commit_writer import GroupCommitWriter
+from infra.client.migrations import run_migrations
+from infra.repository.group_commit_user_repository import INSERT_USER_SQL, GroupCommitUserRepository
+from infra.repository.user_repository import UserRepository
+
+
+@pytest.fixture
+def pool(tmp_path):
+    database = str(tmp_path / "group_commit.db")
+    run_migrations(database)
+    pool = ConnectionPool(database, max_size=4, pragmas={"journal_mode": "WAL"})
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def writer(pool):
+    writer = GroupCommitWriter(pool, max_batch_size=64, max_delay=0.05)
+    yield writer
+    writer.close()
+
+
+def _count_users(pool) -> int:
+    conn = pool.acquire()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM user").fetchone()[0]
+    finally:
+        pool.release(conn)
+
+
+@pytest.fixture
+def last_id(pool) -> int:
+    # マイグレーションで登録済みのユーザーの最大のid
+    conn = pool.acquire()
+    try:
+        return conn.execute("SELECT COALESCE(MAX(id), 0) FROM user").fetchone()[0]
+    finally:
+        pool.release(conn)
+
+
+def test_concurrent_writes_are_committed_together(writer, pool, last_id):
+    initial_count = _count_users(pool)
+    barrier = threading.Barrier(8)
+    ids = []
+
+    def insert(i):
+        barrier.wait()
+        ids.append(writer.submit(INSERT_USER_SQL, (f"User {i}", 20 + i, None)).result(timeout=5))
+
+    threads = [threading.Thread(target=insert, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(ids) == list(range(last_id + 1, last_id + 9))
+    assert _count_users(pool) == initial_count + 8
+
+
+def test_failed_write_does_not_affect_others_in_batch(writer, pool, last_id):
+    initial_count = _count_users(pool)
+    # ageはNOT NULLなので、2件目だけが失敗する
+    first = writer.submit(INSERT_USER_SQL, ("First", 20, None))
+    invalid = writer.submit(INSERT_USER_SQL, ("Invalid", None, None))
+    last = writer.submit(INSERT_USER_SQL, ("Last", 30, None))
+
+    assert first.result(timeout=5) == last_id + 1
+    with pytest.raises(sqlite3.IntegrityError):
+        invalid.result(timeout=5)
+    assert last.result(timeout=5) == last_id + 2
+    assert _count_users(pool) == initial_count + 2
+
+
+def test_submit_many_returns_sequential_ids(writer, last_id):
+    writer.submit(INSERT_USER_SQL, ("Before", 20, None))
+    ids = writer.submit_many(INSERT_USER_SQL, [("A", 21, None), ("B", 22, None), ("C", 23, None)])
+
+    assert ids.result(timeout=5) == [last_id + 2, last_id + 3, last_id + 4]
+
+
+def test_close_commits_pending_writes(pool, last_id):
+    writer = GroupCommitWriter(pool, max_delay=1.0)
+    future = writer.submit(INSERT_USER_SQL, ("Pending", 20, None))
+    writer.close()
+
+    assert future.result(timeout=0) == last_id + 1
+    with pytest.raises(RuntimeError):
+        writer.submit(INSERT_USER_SQL, ("Closed", 20, None))
+
+
+def test_group_commit_repository_sets_ids(writer, pool, last_id):
+    conn = pool.acquire()
+    try:
+        repository = GroupCommitUserRepository(UserRepository(conn), writer)
+        created = repository.add_user(User(name="Alice", age=30))
+        bulk = repository.add_users([User(name="Bob", age=31), User(name="Carol", age=32)])
+
+        assert created.id == last_id + 1
+        assert [user.id for user in bulk] == [last_id + 2, last_id + 3]
+        users = repository.get_users(after_id=last_id)
+        assert [user.name for user in users] == ["Alice", "Bob", "Carol"]
+    finally:
+        pool.release(conn)
+
+
+def test_user_service_uses_group_commit_when_enabled(tmp_path):
+    app = create_app(
+        {"DATABASE": str(tmp_path / "app.db"), "DB_GROUP_COMMIT_ENABLED": True, "USER_CACHE_ENABLED": True}
+    )
+    with app.app_context():
+        service = get_user_service()
+        assert isinstance(service.user_repository.user_repository, GroupCommitUserRepository)
+    with app.test_client() as client:
+        response = client.post("/users", json={"name": "Dave", "age": 40})
+        assert response.status_code == 201
+        created_id = response.get_json()["id"]
+        users = client.get(f"/users?after_id={created_id - 1}").get_json()
+        assert users[0]["name"] == "Dave"
+    app.extensions["db_group_commit_writer"].close()
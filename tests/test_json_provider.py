@@ -0,0 +1,76 @@
+import decimal
+import json
+
+import pytest
+from flask import Flask, jsonify
+
+import utils.json_provider as json_provider
+from application.ports.user_dto import UserResponse
+from utils.json_provider import FastJSONProvider
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
+
+
+def test_jsonify_pydantic_model(app):
+    with app.app_context():
+        response = jsonify(UserResponse(id=1, name="名前", age=20))
+
+    assert response.mimetype == "application/json"
+    assert response.get_data() == '{"id":1,"name":"名前","age":20,"nickname":null}'.encode()
+
+
+def test_jsonify_list_of_models(app):
+    users = [UserResponse(id=1, name="A", age=20), UserResponse(id=2, name="B", age=21, nickname="b")]
+    with app.app_context():
+        response = jsonify(users)
+
+    assert json.loads(response.get_data()) == [user.model_dump() for user in users]
+
+
+def test_nested_models_and_special_values(app):
+    with app.app_context():
+        response = jsonify(
+            {"user": UserResponse(id=1, name="A", age=20), "price": decimal.Decimal("1.50"), "error": ValueError("bad")}
+        )
+
+    assert json.loads(response.get_data()) == {
+        "user": {"id": 1, "name": "A", "age": 20, "nickname": None},
+        "price": "1.50",
+        "error": "bad",
+    }
+
+
+def test_compact_unless_debug(app):
+    with app.app_context():
+        assert app.json.dumps({"a": [1, 2]}) == '{"a":[1,2]}'
+        app.debug = True
+        assert app.json.dumps({"a": [1, 2]}) == '{\n  "a": [\n    1,\n    2\n  ]\n}'
+
+
+def test_falls_back_to_stdlib_for_big_integers(app):
+    with app.app_context():
+        assert app.json.dumps({"n": 2**70}) == '{"n":%d}' % 2**70
+
+
+def test_falls_back_to_stdlib_without_orjson(app, monkeypatch):
+    monkeypatch.setattr(json_provider, "orjson", None)
+    with app.app_context():
+        assert app.json.dumps({"a": "é"}) == '{"a":"é"}'
+        assert app.json.loads('{"a": 1}') == {"a": 1}
+
+
+def test_request_json_is_parsed_and_invalid_json_is_rejected(app):
+    @app.post("/echo")
+    def echo():
+        from flask import request
+
+        return jsonify(request.get_json())
+
+    client = app.test_client()
+    assert client.post("/echo", json={"a": 1}).json == {"a": 1}
+    assert client.post("/echo", data="{", content_type="application/json").status_code == 400
@@ -0,0 +1,115 @@
+import contextvars
+import threading
+
+from app import app, create_app
+from utils.decorators import timed
+from utils.metrics import REGISTRY, MetricsRegistry, count_db_query, get_db_query_count, reset_db_query_count
+
+
+def test_counter_aggregates_all_threads():
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "Test counter.", ("kind",))
+
+    def work():
+        for _ in range(1000):
+            counter.inc("a")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc("b", amount=2)
+
+    # 終了したスレッドの値も失われない
+    assert counter.collect() == {("a",): 4000.0, ("b",): 2.0}
+    assert counter.collect() == {("a",): 4000.0, ("b",): 2.0}
+
+
+def test_gauge_inc_and_dec():
+    registry = MetricsRegistry()
+    gauge = registry.gauge("test_in_flight", "Test gauge.")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+
+    assert gauge.collect() == {(): 1.0}
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("test_seconds", "Test histogram.", ("path",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, '/a"b')
+    histogram.observe(0.5, '/a"b')
+    histogram.observe(5, '/a"b')
+
+    text = registry.render()
+
+    assert '# TYPE test_seconds histogram' in text
+    assert 'test_seconds_bucket{path="/a\\"b",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{path="/a\\"b",le="1.0"} 2' in text
+    assert 'test_seconds_bucket{path="/a\\"b",le="+Inf"} 3' in text
+    assert 'test_seconds_count{path="/a\\"b"} 3' in text
+
+
+def test_registry_returns_existing_metric():
+    registry = MetricsRegistry()
+    assert registry.counter("same_total", "Help.") is registry.counter("same_total", "Help.")
+
+
+def test_timed_decorator_records_duration():
+    @timed("test_timed_seconds", component="test")
+    def work():
+        return "done"
+
+    assert work() == "done"
+    histogram = REGISTRY.histogram("test_timed_seconds", "")
+    assert histogram.collect()[("test", "work")][-1] == 1
+
+
+def test_metrics_endpoint():
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        client.get("/users")
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    text = response.get_data(as_text=True)
+    assert 'http_request_duration_seconds_count{method="GET",endpoint="/users",status="200"}' in text
+    assert 'repository_method_duration_seconds_count{repository="user",method="get_users"}' in text
+    assert "db_queries_per_request_count" in text
+    assert "http_requests_in_flight" in text
+
+
+def test_db_query_count_includes_executor_threads():
+    reset_db_query_count()
+    count_db_query("SELECT 1")
+    # /async 配下のリポジトリと同じく、コンテキストを引き継いだスレッドで実行する
+    context = contextvars.copy_context()
+    thread = threading.Thread(target=context.run, args=(count_db_query, "SELECT 2"))
+    thread.start()
+    thread.join()
+
+    assert get_db_query_count() == 2
+
+
+def test_async_requests_record_db_query_count(tmp_path):
+    histogram = REGISTRY.histogram("db_queries_per_request", "")
+    before = histogram.collect().get((), [0.0, 0])[-2]
+
+    client = create_app({"DATABASE": str(tmp_path / "app.db")}).test_client()
+    assert client.get("/async/users").status_code == 200
+
+    assert histogram.collect()[()][-2] > before
+
+
+def test_user_cache_events_are_counters(tmp_path):
+    client = create_app({"DATABASE": str(tmp_path / "app.db"), "USER_CACHE_ENABLED": True}).test_client()
+    client.get("/users")
+    client.get("/users")
+
+    text = client.get("/metrics").get_data(as_text=True)
+    assert "# TYPE user_cache_events_total counter" in text
+    assert 'user_cache_events_total{event="local_hits"}' in text
+    assert 'user_cache{stat="local_size"}' in text
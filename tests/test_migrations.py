@@ -0,0 +1,50 @@
+import sqlite3
+
+from app import app
+from infra.client.migrations import MIGRATIONS, get_schema_version, run_migrations
+
+
+def test_run_migrations_creates_schema(tmp_path):
+    database = str(tmp_path / "test.db")
+
+    applied = run_migrations(database)
+
+    assert applied == [version for version, _, _ in MIGRATIONS]
+    conn = sqlite3.connect(database)
+    assert get_schema_version(conn) == MIGRATIONS[-1][0]
+    # シードデータが投入されていること
+    assert conn.execute("SELECT COUNT(*) FROM user").fetchone()[0] == 2
+    conn.close()
+
+
+def test_run_migrations_is_idempotent(tmp_path):
+    database = str(tmp_path / "test.db")
+    run_migrations(database)
+
+    # 2回目は何も適用されず、シードデータも重複しない
+    assert run_migrations(database) == []
+    conn = sqlite3.connect(database)
+    assert conn.execute("SELECT COUNT(*) FROM user").fetchone()[0] == 2
+    conn.close()
+
+
+def test_db_upgrade_command(tmp_path):
+    database = str(tmp_path / "test.db")
+    original = app.config["DATABASE"]
+    app.config["DATABASE"] = database
+    try:
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=["db", "upgrade"])
+        assert result.exit_code == 0
+        assert "Applied migrations" in result.output
+
+        result = runner.invoke(args=["db", "version"])
+        assert result.output.strip() == str(MIGRATIONS[-1][0])
+    finally:
+        app.config["DATABASE"] = original
+
+
+def test_request_does_not_touch_schema():
+    """リクエスト処理中にスキーマ関連の処理が行われないこと"""
+    hooks = [f.__name__ for funcs in app.before_request_funcs.values() for f in funcs]
+    assert "init_db" not in hooks
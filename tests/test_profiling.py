@@ -0,0 +1,98 @@
+import threading
+import time
+from unittest.mock import patch
+
+from structlog.contextvars import bind_contextvars
+
+from app import create_app
+from utils.profiling import (
+    PROFILE_TOKEN_HEADER,
+    RequestProfiler,
+    StackSampler,
+    sign_profile_token,
+    summarize_statements,
+    verify_profile_token,
+)
+
+
+def test_verify_profile_token():
+    token = sign_profile_token("secret", "/users", 2000)
+
+    assert verify_profile_token("secret", "/users", token, now=1000)
+    assert not verify_profile_token("secret", "/users", token, now=3000)
+    assert not verify_profile_token("secret", "/hello", token, now=1000)
+    assert not verify_profile_token("other", "/users", token, now=1000)
+    assert not verify_profile_token("", "/users", token, now=1000)
+    assert not verify_profile_token("secret", "/users", "garbage", now=1000)
+
+
+def test_profiler_is_disabled_by_default():
+    assert RequestProfiler.from_config({}) is None
+
+
+def test_summarize_statements_times_until_next_statement():
+    summary = summarize_statements([(1.0, "SELECT 1"), (1.5, "SELECT\n  2")], ended=1.6)
+
+    assert summary["count"] == 2
+    assert summary["total_ms"] == 600.0
+    assert summary["slowest"][0] == {"statement": "SELECT 1", "ms": 500.0}
+    assert summary["slowest"][1]["statement"] == "SELECT 2"
+
+
+def _busy_work(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_stack_sampler_collects_folded_stacks():
+    sampler = StackSampler(threading.get_ident(), interval=0.001)
+    sampler.start()
+    _busy_work(0.05)
+    sampler.stop()
+
+    assert sampler.samples > 0
+    assert sampler.top_functions()[0]["function"] == f"{__name__}:_busy_work"
+    stack, count = sampler.folded().splitlines()[0].rsplit(" ", 1)
+    assert stack.endswith(f"{__name__}:_busy_work")
+    assert int(count) > 0
+
+
+def test_only_profiles_requests_with_valid_token(tmp_path):
+    app = create_app(
+        {
+            "DATABASE": str(tmp_path / "app.db"),
+            "USER_CACHE_ENABLED": False,
+            "PROFILE_SECRET": "secret",
+            "PROFILE_DIR": str(tmp_path / "profiles"),
+        }
+    )
+    client = app.test_client()
+    token = sign_profile_token("secret", "/users", int(time.time()) + 60)
+
+    assert "X-Profile-Id" not in client.get("/users").headers
+    assert "X-Profile-Id" not in client.get("/users", headers={PROFILE_TOKEN_HEADER: "0.bad"}).headers
+
+    with patch("app.bind_contextvars", wraps=bind_contextvars) as bind:
+        response = client.get("/users", headers={PROFILE_TOKEN_HEADER: token})
+
+    profile_id = response.headers["X-Profile-Id"]
+    summary = next(call.kwargs["profile"] for call in bind.call_args_list if "profile" in call.kwargs)
+    assert summary["id"] == profile_id
+    assert summary["file"] == str(tmp_path / "profiles" / f"{profile_id}.folded")
+    assert summary["sql"]["count"] >= 1
+    assert any("FROM user" in item["statement"] for item in summary["sql"]["slowest"])
+
+
+def test_sample_rate_profiles_requests(tmp_path):
+    app = create_app(
+        {
+            "DATABASE": str(tmp_path / "app.db"),
+            "PROFILE_SAMPLE_RATE": 1.0,
+            "PROFILE_DIR": str(tmp_path / "profiles"),
+        }
+    )
+
+    response = app.test_client().get("/hello?name=profile")
+
+    assert (tmp_path / "profiles" / f"{response.headers['X-Profile-Id']}.folded").exists()
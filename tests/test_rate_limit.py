@@ -0,0 +1,120 @@
+from unittest.mock import patch
+
+import pytest
+
+from app import create_app
+from infra.rate_limit.rate_limit_store import InMemoryRateLimitStore
+from utils.rate_limit import ConcurrencyLimiter, RateLimiter, retry_after_header
+
+
+@pytest.fixture
+def clock():
+    now = [1000.0]
+    with patch("infra.rate_limit.rate_limit_store.time.monotonic", side_effect=lambda: now[0]):
+        yield now
+
+
+def test_token_bucket_allows_burst_then_refills(clock):
+    store = InMemoryRateLimitStore()
+
+    assert [store.consume("a", rate=2.0, burst=3) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert store.consume("a", rate=2.0, burst=3) == pytest.approx(0.5)
+    # 他のクライアントのバケットは別
+    assert store.consume("b", rate=2.0, burst=3) == 0.0
+
+    clock[0] += 0.5
+    assert store.consume("a", rate=2.0, burst=3) == 0.0
+    assert store.consume("a", rate=2.0, burst=3) > 0.0
+
+
+def test_store_evicts_refilled_buckets(clock):
+    store = InMemoryRateLimitStore(max_keys=2)
+    store.consume("a", rate=1.0, burst=1)
+    store.consume("b", rate=1.0, burst=1)
+
+    clock[0] += 10
+    store.consume("c", rate=1.0, burst=1)
+
+    assert len(store) == 1
+
+
+def test_client_key_ignores_key_header_by_default():
+    limiter = RateLimiter(rate=1.0, burst=1.0)
+
+    assert limiter.client_key("10.0.0.1", {}) == "ip:10.0.0.1"
+    assert limiter.client_key("10.0.0.1", {"X-API-Key": "secret"}) == "ip:10.0.0.1"
+
+
+def test_client_key_uses_configured_key_header():
+    limiter = RateLimiter(rate=1.0, burst=1.0, key_header="X-Authenticated-Key")
+
+    assert limiter.client_key("10.0.0.1", {"X-API-Key": "secret"}) == "ip:10.0.0.1"
+    key = limiter.client_key("10.0.0.1", {"X-Authenticated-Key": "secret"})
+    assert key.startswith("key:") and "secret" not in key
+
+
+@pytest.mark.parametrize("rate, burst", [(0.0, 20.0), (-1.0, 20.0), (10.0, 0.5)])
+def test_invalid_rate_limit_config_is_rejected(tmp_path, rate, burst):
+    config = {
+        "DATABASE": str(tmp_path / "app.db"),
+        "RATE_LIMIT_ENABLED": True,
+        "RATE_LIMIT_RATE": rate,
+        "RATE_LIMIT_BURST": burst,
+    }
+
+    with pytest.raises(ValueError):
+        create_app(config)
+
+
+def test_retry_after_header_rounds_up():
+    assert retry_after_header(0.2) == "1"
+    assert retry_after_header(2.1) == "3"
+
+
+def test_concurrency_limiter_sheds_when_full():
+    limiter = ConcurrencyLimiter(limit=1, timeout=0.0)
+
+    assert limiter.acquire()
+    assert not limiter.acquire()
+    assert limiter.in_flight == 1
+    limiter.release()
+    assert limiter.acquire()
+
+
+def test_rate_limited_requests_get_429(tmp_path):
+    app = create_app(
+        {"DATABASE": str(tmp_path / "app.db"), "RATE_LIMIT_ENABLED": True, "RATE_LIMIT_RATE": 0.5, "RATE_LIMIT_BURST": 2}
+    )
+    client = app.test_client()
+
+    assert [client.get("/hello").status_code for _ in range(2)] == [200, 200]
+    response = client.get("/hello")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+    assert response.get_json()["code"] == 429
+
+    # /metrics は制限しない
+    assert client.get("/metrics").status_code == 200
+    # ヘッダーを付けても同じクライアントとして数える（RATE_LIMIT_KEY_HEADER が未設定のため）
+    assert client.get("/hello", headers={"X-API-Key": "team-a"}).status_code == 429
+
+
+def test_write_requests_are_shed_when_limit_is_reached(tmp_path):
+    app = create_app(
+        {"DATABASE": str(tmp_path / "app.db"), "WRITE_CONCURRENCY_LIMIT": 1, "WRITE_QUEUE_TIMEOUT": 0.0}
+    )
+    client = app.test_client()
+    limiter = app.extensions["write_limiter"]
+
+    # 別の書き込みが処理中の状態にする
+    assert limiter.acquire()
+    response = client.post("/users", json={"name": "Busy", "age": 20})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    # 読み込みは制限しない
+    assert client.get("/users").status_code == 200
+    limiter.release()
+
+    assert client.post("/users", json={"name": "Free", "age": 20}).status_code == 201
+    assert limiter.in_flight == 0
+    assert 'write_limiter{stat="limit"} 1' in client.get("/metrics").get_data(as_text=True)
@@ -0,0 +1,109 @@
+import os
+import sqlite3
+import time
+
+import pytest
+from flask import g
+
+from app import create_app
+from infra.client.connection_pool import ConnectionPool
+from infra.client.db_client import LAST_WRITE_COOKIE, get_pool, get_replica_router
+from infra.client.migrations import run_migrations
+from infra.client.postgres_client import PostgresConnectionPool, psycopg
+from infra.client.replica_router import ReplicaRouter
+
+
+POSTGRES_DSN = os.environ.get("TEST_POSTGRES_DSN")
+
+
+class StickyRouter(ReplicaRouter):
+    # SQLiteでもread-your-writesの動作を確認できるよう、常に書き込み直後をプライマリに送る
+    def __init__(self, primary, replicas, read_your_writes_window=0.0):
+        super().__init__(primary, replicas, read_your_writes_window=5.0)
+
+
+@pytest.fixture
+def app(tmp_path):
+    return create_app({"DATABASE": str(tmp_path / "app.db"), "USER_CACHE_ENABLED": False})
+
+
+def test_read_only_pool_rejects_writes_and_sees_commits(tmp_path):
+    database = str(tmp_path / "ro.db")
+    run_migrations(database)
+    writer = ConnectionPool(database, max_size=1, pragmas={"journal_mode": "WAL"})
+    reader = ConnectionPool(database, max_size=2, read_only=True)
+    write_conn = writer.acquire()
+    read_conn = reader.acquire()
+
+    write_conn.execute("INSERT INTO user (name, age) VALUES ('Reader Test', 20)")
+    write_conn.commit()
+
+    assert read_conn.execute("SELECT COUNT(*) FROM user WHERE name = 'Reader Test'").fetchone()[0] == 1
+    with pytest.raises(sqlite3.OperationalError):
+        read_conn.execute("INSERT INTO user (name, age) VALUES ('Forbidden', 20)")
+    writer.release(write_conn)
+    reader.release(read_conn)
+    writer.close()
+    reader.close()
+
+
+def test_router_round_robins_replicas_and_sticks_after_write():
+    primary, replica_a, replica_b = object(), object(), object()
+    router = ReplicaRouter(primary, [replica_a, replica_b], read_your_writes_window=5.0)
+
+    assert [router.read_pool() for _ in range(3)] == [replica_a, replica_b, replica_a]
+    assert router.read_pool(last_write_at=time.time()) is primary
+    assert router.read_pool(last_write_at=time.time() - 10) is replica_b
+
+
+def test_router_without_replicas_reads_from_primary():
+    primary = object()
+    assert ReplicaRouter(primary, []).read_pool() is primary
+
+
+def test_get_uses_read_only_connection(app):
+    with app.test_request_context("/users"):
+        response = app.full_dispatch_request()
+        assert response.status_code == 200
+        assert "_database" not in g
+        assert g._read_database_pool.read_only
+        assert g._read_database_pool is not get_pool()
+
+
+def test_post_uses_write_connection_without_sticky_cookie(app):
+    with app.test_client() as client:
+        response = client.post("/users", json={"name": "Writer", "age": 30})
+
+    assert response.status_code == 201
+    # SQLiteの読み込み専用のコネクションには反映の遅れがないので、Cookieは設定しない
+    assert LAST_WRITE_COOKIE not in response.headers.get("Set-Cookie", "")
+
+
+def test_reads_after_write_go_to_primary(tmp_path):
+    app = create_app(
+        {"DATABASE": str(tmp_path / "app.db"), "USER_CACHE_ENABLED": False, "DB_REPLICA_ROUTER": StickyRouter}
+    )
+    response = app.test_client().post("/users", json={"name": "Writer", "age": 30})
+    last_write = response.headers["Set-Cookie"].split(";")[0]
+    assert last_write.startswith(LAST_WRITE_COOKIE + "=")
+
+    with app.test_request_context("/users", headers={"Cookie": last_write}):
+        app.full_dispatch_request()
+        assert g._read_database_pool is get_pool()
+
+    with app.test_request_context("/users"):
+        app.full_dispatch_request()
+        assert g._read_database_pool is get_replica_router().replicas[0]
+
+
+@pytest.mark.skipif(psycopg is None or not POSTGRES_DSN, reason="TEST_POSTGRES_DSN is not set")
+def test_postgres_read_only_pool_rejects_writes():
+    pool = PostgresConnectionPool(POSTGRES_DSN, min_size=1, max_size=1, read_only=True)
+    conn = pool.acquire()
+    try:
+        assert conn.execute("SELECT 1").fetchone()[0] == 1
+        with pytest.raises(psycopg.errors.ReadOnlySqlTransaction):
+            conn.execute("CREATE TEMP TABLE forbidden (id INTEGER)")
+    finally:
+        pool.release(conn)
+        pool.close()
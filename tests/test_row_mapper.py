@@ -0,0 +1,89 @@
+import sqlite3
+
+import pydantic
+import pytest
+
+from application.ports.user_dto import UserResponse, to_user_response, user_response_list_adapter
+from domain.user_domain import User
+from infra.repository.row_mapper import execute_for_mapping, get_row_mapper, map_rows
+from utils import models
+from utils.models import FAST_PATH_PYDANTIC_VERSION, trusted_factory
+
+
+def _create_db():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("CREATE TABLE user (id INTEGER PRIMARY KEY, name TEXT, age INTEGER, nickname TEXT)")
+    conn.execute("INSERT INTO user VALUES (1, 'a', 10, NULL), (2, 'b', 20, 'bb')")
+    return conn
+
+
+def test_map_rows_matches_validated_model():
+    conn = _create_db()
+    cursor = execute_for_mapping(conn, "SELECT id, name, age, nickname FROM user ORDER BY id")
+
+    users = map_rows(cursor, User, cursor.fetchall())
+
+    assert users == [
+        User(id=1, name="a", age=10, nickname=None),
+        User(id=2, name="b", age=20, nickname="bb"),
+    ]
+    assert users[0].model_fields_set == {"id", "name", "age", "nickname"}
+    # 代入などの通常の操作ができること
+    users[0].nickname = "aa"
+    assert users[0].model_dump() == {"id": 1, "name": "a", "age": 10, "nickname": "aa"}
+
+
+def test_row_mapper_is_built_once_per_query_shape():
+    columns = ("id", "name", "age", "nickname")
+    assert get_row_mapper(User, columns) is get_row_mapper(User, columns)
+    assert get_row_mapper(User, columns) is not get_row_mapper(User, ("id", "name", "age"))
+
+
+def test_to_user_response_serializes_directly():
+    users = [User(id=1, name="a", age=10), User(id=2, name="b", age=20, nickname="bb")]
+
+    dtos = [to_user_response(user) for user in users]
+
+    assert all(isinstance(dto, UserResponse) for dto in dtos)
+    assert user_response_list_adapter.dump_json(dtos) == (
+        b'[{"id":1,"name":"a","age":10,"nickname":null},{"id":2,"name":"b","age":20,"nickname":"bb"}]'
+    )
+
+
+def test_pydantic_version_matches_fast_path():
+    # requirements.txt で固定しているバージョンと、高速な経路を確認したバージョンが一致すること
+    assert pydantic.VERSION.startswith(FAST_PATH_PYDANTIC_VERSION + ".")
+
+
+@pytest.mark.parametrize("model", [User, UserResponse])
+@pytest.mark.parametrize(
+    "values", [{"id": 1, "name": "a", "age": 10, "nickname": None}, {"id": 2, "name": "b", "age": 20}]
+)
+def test_trusted_factory_matches_model_construct(model, values):
+    built = trusted_factory(model)(dict(values))
+    constructed = model.model_construct(**values)
+
+    assert type(built) is model
+    assert built == constructed
+    assert built.model_fields_set == constructed.model_fields_set
+    assert built.__pydantic_extra__ == constructed.__pydantic_extra__
+    assert built.__pydantic_private__ == constructed.__pydantic_private__
+    assert built.model_dump_json() == constructed.model_dump_json()
+    assert built.model_copy(update={"name": "c"}) == constructed.model_copy(update={"name": "c"})
+
+
+def test_trusted_factory_falls_back_on_other_pydantic_versions(monkeypatch):
+    monkeypatch.setattr(models.pydantic, "VERSION", "2.99.0")
+    calls = []
+
+    class Model(pydantic.BaseModel):
+        id: int
+
+        @classmethod
+        def model_construct(cls, **values):
+            calls.append(values)
+            return super().model_construct(**values)
+
+    assert trusted_factory(Model)({"id": 1}) == Model(id=1)
+    assert calls == [{"id": 1}]
@@ -0,0 +1,94 @@
+import json
+import statistics
+import subprocess
+import sys
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+
+from benchmarks.startup import ROOT, STARTUP_BUDGET, aggregate, measure_startup, parse_importtime
+from utils.models import build_models
+
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     flask.json
+import time:       200 |        300 |   flask
+import time:        50 |         50 |   utils.models
+import time:        10 |        360 | app
+import time:        30 |         30 |   dependencies
+import time:        40 |         70 | route.user
+import time:         5 |          5 | route.hello
+"""
+
+
+def test_parse_importtime():
+    entries = parse_importtime(IMPORTTIME)
+
+    assert entries[0] == {"module": "flask.json", "self_us": 100, "cumulative_us": 100, "depth": 2}
+    assert [entry["depth"] for entry in entries] == [2, 1, 1, 0, 1, 0, 0]
+
+
+def test_aggregate_by_blueprint_and_package():
+    result = aggregate(
+        parse_importtime(IMPORTTIME),
+        ["route.hello:hello_bp", "route.user:user_bp", "route.user:async_user_bp"],
+    )
+
+    assert result["app_imports"] == [
+        {"module": "flask", "import_ms": 0.3},
+        {"module": "utils.models", "import_ms": 0.05},
+    ]
+    assert [item["import_ms"] for item in result["blueprints"]] == [0.005, 0.07, 0.0]
+    assert result["packages"][0] == {"package": "flask", "import_ms": 0.3}
+
+
+def test_import_app_does_not_load_routes_or_optional_dependencies():
+    script = "import json, sys, app; print(json.dumps(sorted(sys.modules)))"
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    modules = set(json.loads(output.splitlines()[-1]))
+
+    # ブループリントは create_app() で、psycopgは DB_BACKEND=postgres の場合のみimportする
+    assert "route.user" not in modules
+    assert "psycopg" not in modules
+
+
+def test_build_models_builds_deferred_schemas():
+    class Deferred(BaseModel):
+        model_config = ConfigDict(defer_build=True)
+
+        value: int
+
+    adapter = TypeAdapter(list[Deferred], config=ConfigDict(defer_build=True))
+    assert not Deferred.__pydantic_complete__
+
+    build_models(Deferred, adapter)
+
+    assert Deferred.__pydantic_complete__
+    assert adapter.dump_json([Deferred(value=1)]) == b'[{"value":1}]'
+
+
+def test_startup_within_budget():
+    # 1回だけだとディスクキャッシュや負荷の影響を受けるので、python -m benchmarks.startup と同じく中央値で判定する
+    median = statistics.median(measure_startup()["total_seconds"] for _ in range(5))
+
+    assert median < STARTUP_BUDGET, f"startup took {median:.3f}s (median of 5, budget {STARTUP_BUDGET}s)"
+
+
+def test_first_request_without_warmup_serializes_responses(tmp_path):
+    # 新しいプロセスで、warmup() を呼ばずに最初のリクエストを処理する（スキーマが未作成のモデルがないこと）
+    script = (
+        "import sys, app\n"
+        "client = app.create_app({'DATABASE': sys.argv[1]}).test_client()\n"
+        "print(client.post('/users', json={'name': 'First', 'age': 20}).status_code)\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script, str(tmp_path / "app.db")],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    assert output.splitlines()[-1] == "201"
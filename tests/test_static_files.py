@@ -0,0 +1,238 @@
+import time
+
+import pytest
+from flask import Flask
+
+from utils.static_files import HASHED_ASSET_MAX_AGE, StaticFiles
+
+
+@pytest.fixture
+def static_files(tmp_path):
+    (tmp_path / "index.html").write_text("<p>index</p>")
+    (tmp_path / "main.3f2a9c1b.js").write_text("console.log('hashed')")
+    static_files = StaticFiles(str(tmp_path))
+    static_files.refresh()
+    return static_files
+
+
+@pytest.fixture
+def client(static_files):
+    app = Flask(__name__)
+
+    @app.route("/<path:path>")
+    def serve(path):
+        return static_files.send(path)
+
+    with app.test_client() as client:
+        yield client
+
+
+def test_hashed_asset_is_cached_long(client):
+    response = client.get("/main.3f2a9c1b.js")
+
+    assert response.status_code == 200
+    assert response.cache_control.max_age == HASHED_ASSET_MAX_AGE
+    assert response.cache_control.immutable
+    assert response.cache_control.public
+
+
+def test_unhashed_file_is_revalidated(client, static_files):
+    response = client.get("/index.html")
+
+    assert response.status_code == 200
+    assert response.cache_control.no_cache
+    assert response.headers["ETag"] == f'"{static_files.etag_for("index.html")}"'
+
+
+def test_conditional_request_returns_304(client, static_files):
+    etag = static_files.etag_for("index.html")
+
+    response = client.get("/index.html", headers={"If-None-Match": f'"{etag}"'})
+
+    assert response.status_code == 304
+
+
+def test_etag_changes_with_content(tmp_path, static_files):
+    before = static_files.etag_for("index.html")
+    (tmp_path / "index.html").write_text("<p>changed content</p>")
+    static_files.refresh()
+
+    assert static_files.etag_for("index.html") != before
+
+
+def test_paths_outside_static_folder_are_not_read(tmp_path):
+    static_dir = tmp_path / "static"
+    static_dir.mkdir()
+    (static_dir / "index.html").write_text("<p>index</p>")
+    (tmp_path / "secret.txt").write_text("secret")
+    (static_dir / "zero").symlink_to("/dev/zero")
+    static_files = StaticFiles(str(static_dir))
+    static_files.refresh()
+
+    app = Flask(__name__)
+
+    @app.route("/<path:path>")
+    def serve(path):
+        return static_files.send(path)
+
+    assert not static_files.exists("../secret.txt")
+    assert not static_files.exists("/dev/zero")
+    assert not static_files.exists("zero")
+    assert app.test_client().get("/..%2Fsecret.txt").status_code == 404
+    # マニフェストにあるファイルだけを読み、ハッシュを計算している
+    assert set(static_files._etags) == {"index.html"}
+
+
+def test_app_does_not_read_files_outside_static_folder():
+    from app import app
+
+    response = app.test_client().get("/..%2Fconfig.py")
+
+    # static配下にないパスは index.html を返す
+    assert b"Config" not in response.data
+
+
+def test_precompress_writes_compressed_siblings(tmp_path):
+    import gzip
+
+    from utils.compression import brotli
+    from utils.static_files import precompress
+
+    (tmp_path / "app.css").write_text("body { color: red; }\n" * 50)
+    (tmp_path / "small.css").write_text("a{}")
+    (tmp_path / "image.png").write_bytes(b"\x89PNG" * 200)
+
+    written = precompress(str(tmp_path), min_size=256)
+
+    expected = {"app.css.gz"} | ({"app.css.br"} if brotli is not None else set())
+    assert {path.rsplit("/", 1)[-1] for path in written} == expected
+    assert gzip.decompress((tmp_path / "app.css.gz").read_bytes()) == (tmp_path / "app.css").read_bytes()
+    # 元のファイルが変わっていなければ作り直さない
+    assert precompress(str(tmp_path), min_size=256) == []
+
+
+def test_precompressed_variant_is_served(tmp_path):
+    import gzip
+
+    (tmp_path / "app.css").write_text("body { color: red; }\n" * 50)
+    (tmp_path / "app.css.gz").write_bytes(gzip.compress((tmp_path / "app.css").read_bytes()))
+    static_files = StaticFiles(str(tmp_path))
+    static_files.refresh()
+    app = Flask(__name__)
+    app.add_url_rule("/<path:path>", view_func=static_files.send)
+    client = app.test_client()
+
+    compressed = client.get("/app.css", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.mimetype == "text/css"
+    assert "Accept-Encoding" in compressed.vary
+    assert gzip.decompress(compressed.data) == (tmp_path / "app.css").read_bytes()
+
+    plain = client.get("/app.css", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in plain.headers
+    assert plain.data == (tmp_path / "app.css").read_bytes()
+    # 表現ごとに別のETagになる
+    assert plain.headers["ETag"] != compressed.headers["ETag"]
+
+    # 事前圧縮したファイルは、単体のパスとしては配信しない
+    assert not static_files.exists("app.css.gz")
+    assert client.get("/app.css.gz").status_code == 404
+
+
+def test_manifest_lookup_does_not_touch_filesystem(tmp_path, client, static_files):
+    assert static_files.exists("index.html")
+    assert not static_files.exists("missing.js")
+    assert not static_files.exists("../secret.txt")
+
+    # index.htmlはメモリから配信するので、削除されても配信できる（refresh()までは）
+    (tmp_path / "index.html").unlink()
+    response = client.get("/index.html")
+    assert response.status_code == 200
+    assert response.data == b"<p>index</p>"
+
+    assert client.get("/missing.js").status_code == 404
+
+
+def test_in_memory_file_supports_conditional_requests(client, static_files):
+    etag = static_files.etag_for("index.html")
+
+    response = client.get("/index.html", headers={"If-None-Match": f'"{etag}"'})
+
+    assert response.status_code == 304
+    assert response.data == b""
+
+
+def test_small_assets_are_served_from_memory(tmp_path):
+    (tmp_path / "small.css").write_text("a{}")
+    (tmp_path / "large.css").write_text("a{}" * 100)
+    static_files = StaticFiles(str(tmp_path), memory_max_size=64)
+    static_files.refresh()
+    app = Flask(__name__)
+    app.add_url_rule("/<path:path>", view_func=static_files.send)
+
+    (tmp_path / "small.css").unlink()
+    response = app.test_client().get("/small.css")
+
+    assert response.status_code == 200
+    assert response.data == b"a{}"
+    assert response.mimetype == "text/css"
+    assert response.cache_control.no_cache
+    # 大きいファイルはディスクから配信する
+    assert app.test_client().get("/large.css").data == b"a{}" * 100
+
+
+def test_watcher_refreshes_manifest(tmp_path, static_files):
+    static_files.start_watcher(interval=0.01)
+    try:
+        (tmp_path / "new.js").write_text("console.log('new')")
+        for _ in range(200):
+            if static_files.exists("new.js"):
+                break
+            time.sleep(0.01)
+    finally:
+        static_files.stop_watcher()
+
+    assert static_files.exists("new.js")
+
+
+def test_refresh_skips_files_deleted_after_scan(tmp_path, static_files, monkeypatch):
+    (tmp_path / "gone.css").write_text("a{}")
+    (tmp_path / "kept.css").write_text("b{}")
+    scan = static_files._scan
+
+    def scan_then_delete():
+        # 走査とopenの間にファイルが消えた状態を再現する
+        signature = scan()
+        (tmp_path / "gone.css").unlink()
+        return signature
+
+    monkeypatch.setattr(static_files, "_scan", scan_then_delete)
+    static_files.refresh()
+
+    assert not static_files.exists("gone.css")
+    assert static_files.exists("kept.css")
+
+
+def test_watcher_survives_refresh_errors(tmp_path, static_files, monkeypatch):
+    refresh = static_files.refresh
+    calls = []
+
+    def flaky_refresh():
+        calls.append(None)
+        if len(calls) == 1:
+            raise OSError("temporary failure")
+        refresh()
+
+    monkeypatch.setattr(static_files, "refresh", flaky_refresh)
+    static_files.start_watcher(interval=0.01)
+    try:
+        (tmp_path / "new.js").write_text("console.log('new')")
+        for _ in range(200):
+            if static_files.exists("new.js"):
+                break
+            time.sleep(0.01)
+    finally:
+        static_files.stop_watcher()
+
+    assert len(calls) >= 2
+    assert static_files.exists("new.js")
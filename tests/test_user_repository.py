@@ -55,3 +55,71 @@ def test_add_user():
         # テスト後にデータをクリーンアップ（オプションだが推奨）
         db.execute("DELETE FROM user WHERE id = ?", (created_user.id,))
         db.commit()
+
+
+def test_get_users_with_after_id():
+    with app.app_context():
+        db = get_db()
+        user_repository = UserRepository(db)
+        first_page = user_repository.get_users(limit=1)
+        second_page = user_repository.get_users(limit=1, after_id=first_page[0].id)
+
+        assert len(second_page) == 1
+        assert second_page[0].id > first_page[0].id
+
+
+def test_get_users_ordered_by_id():
+    with app.app_context():
+        db = get_db()
+        user_repository = UserRepository(db)
+        ids = [user.id for user in user_repository.get_users()]
+        assert ids == sorted(ids)
+
+
+def test_iter_users():
+    with app.app_context():
+        db = get_db()
+        user_repository = UserRepository(db)
+        expected = user_repository.get_users(limit=1000)
+
+        streamed = list(user_repository.iter_users(batch_size=1))
+
+        assert [user.id for user in streamed] == [user.id for user in expected]
+
+
+def test_add_users():
+    with app.app_context():
+        db = get_db()
+        user_repository = UserRepository(db)
+        new_users = [
+            User(name="Bulk User 1", age=30),
+            User(name="Bulk User 2", age=31, nickname="Bulk2"),
+        ]
+
+        created_users = user_repository.add_users(new_users)
+
+        ids = [user.id for user in created_users]
+        assert ids[1] == ids[0] + 1
+        rows = db.execute(
+            "SELECT id, name FROM user WHERE id IN (?, ?) ORDER BY id", ids
+        ).fetchall()
+        assert [(row["id"], row["name"]) for row in rows] == [
+            (ids[0], "Bulk User 1"),
+            (ids[1], "Bulk User 2"),
+        ]
+
+        db.execute("DELETE FROM user WHERE id IN (?, ?)", ids)
+        db.commit()
+
+
+def test_get_version_changes_on_write():
+    with app.app_context():
+        db = get_db()
+        user_repository = UserRepository(db)
+        initial_version = user_repository.get_version()
+
+        created_user = user_repository.add_user(User(name="Version User", age=40))
+        assert user_repository.get_version() > initial_version
+
+        db.execute("DELETE FROM user WHERE id = ?", (created_user.id,))
+        db.commit()
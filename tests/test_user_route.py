@@ -1,14 +1,18 @@
+import json
 import pytest
 from flask import Flask
-from unittest.mock import patch
-from route.user import user_bp
+from unittest.mock import AsyncMock, patch
+from route.user import async_user_bp, user_bp
+from utils.json_provider import FastJSONProvider
 from application.ports.user_dto import UserResponse, UserCreateDTO  # DTOをインポート
 
 
 @pytest.fixture
 def client():
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.register_blueprint(user_bp)
+    app.register_blueprint(async_user_bp)
     with app.test_client() as client:
         yield client
 
@@ -28,8 +32,8 @@ def test_get_users(client):
     with patch('route.user.get_user_service') as MockGetUserService:
         # get_user_serviceが返すモックのUserServiceインスタンスを作成
         mock_user_service_instance = MockGetUserService.return_value
-        # そのモックインスタンスのget_usersメソッドがDTOのリストを返すように設定
-        mock_user_service_instance.get_users.return_value = mock_dtos
+        # そのモックインスタンスのget_users_pageメソッドが (版番号, DTOのリスト) を返すように設定
+        mock_user_service_instance.get_users_page.return_value = (1, mock_dtos)
         response = client.get('/users')
 
         assert response.status_code == 200
@@ -55,3 +59,236 @@ def test_add_user(client):
         assert called_with_dto.name == user_data["name"]
         assert called_with_dto.age == user_data["age"]
         assert called_with_dto.nickname == user_data["nickname"]
+
+
+def test_get_users_with_next_cursor(client):
+    mock_dtos = [
+        UserResponse(id=1, name="DTO User 1", age=30),
+        UserResponse(id=2, name="DTO User 2", age=25),
+    ]
+
+    with patch('route.user.get_user_service') as MockGetUserService:
+        mock_user_service_instance = MockGetUserService.return_value
+        mock_user_service_instance.get_users_page.return_value = (1, mock_dtos)
+        response = client.get('/users?limit=2&after_id=0')
+
+        assert response.status_code == 200
+        mock_user_service_instance.get_users_page.assert_called_once_with(limit=2, after_id=0, query=None)
+        # ページが埋まっているので次ページのカーソルが返る
+        assert response.headers["X-Next-Cursor"] == "2"
+        assert "after_id=2" in response.headers["Link"]
+
+
+def test_get_users_without_next_cursor(client):
+    mock_dtos = [UserResponse(id=1, name="DTO User 1", age=30)]
+
+    with patch('route.user.get_user_service') as MockGetUserService:
+        MockGetUserService.return_value.get_users_page.return_value = (1, mock_dtos)
+        response = client.get('/users?limit=2')
+
+        assert response.status_code == 200
+        assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_users_invalid_limit(client):
+    with patch('route.user.get_user_service'):
+        assert client.get('/users?limit=abc').status_code == 400
+        assert client.get('/users?limit=0').status_code == 400
+
+
+def test_get_users_stream(client):
+    mock_dtos = [
+        UserResponse(id=1, name="DTO User 1", age=30, nickname="Dto1"),
+        UserResponse(id=2, name="DTO User 2", age=25, nickname="Dto2"),
+    ]
+
+    with patch('route.user.get_user_service') as MockGetUserService:
+        MockGetUserService.return_value.iter_users.return_value = iter(mock_dtos)
+        response = client.get('/users?stream=ndjson')
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line) for line in lines] == [dto.model_dump() for dto in mock_dtos]
+
+
+def test_add_users_bulk(client):
+    users_data = [
+        {"name": "Bulk 1", "age": 20},
+        {"name": "", "age": 20},  # 不正な行
+        {"name": "Bulk 2", "age": 21, "nickname": "b2"},
+    ]
+
+    with patch('route.user.get_user_service') as MockGetUserService:
+        mock_user_service_instance = MockGetUserService.return_value
+        mock_user_service_instance.add_users.return_value = [
+            UserResponse(id=10, name="Bulk 1", age=20),
+            UserResponse(id=11, name="Bulk 2", age=21, nickname="b2"),
+        ]
+
+        response = client.post('/users/bulk', json=users_data)
+
+        assert response.status_code == 207
+        assert response.json["created"] == 2
+        assert response.json["ids"] == [10, 11]
+        assert [error["index"] for error in response.json["errors"]] == [1]
+        # 正常な行だけがまとめてサービスに渡される
+        called_with_dtos = mock_user_service_instance.add_users.call_args[0][0]
+        assert [dto.name for dto in called_with_dtos] == ["Bulk 1", "Bulk 2"]
+
+
+def test_add_users_bulk_ndjson(client):
+    body = '{"name": "Bulk 1", "age": 20}\n\nnot json\n{"name": "Bulk 2", "age": 21}\n'
+
+    with patch('route.user.get_user_service') as MockGetUserService:
+        mock_user_service_instance = MockGetUserService.return_value
+        mock_user_service_instance.add_users.return_value = [
+            UserResponse(id=10, name="Bulk 1", age=20),
+            UserResponse(id=11, name="Bulk 2", age=21),
+        ]
+
+        response = client.post('/users/bulk', data=body, content_type='application/x-ndjson')
+
+        assert response.status_code == 207
+        assert response.json["ids"] == [10, 11]
+        assert response.json["errors"][0]["index"] == 1
+
+
+def test_add_users_bulk_chunks(client):
+    users_data = [{"name": f"Bulk {i}", "age": 20} for i in range(5)]
+
+    with patch('route.user.BULK_CHUNK_SIZE', 2), patch('route.user.get_user_service') as MockGetUserService:
+        mock_user_service_instance = MockGetUserService.return_value
+        mock_user_service_instance.add_users.side_effect = lambda dtos: [
+            UserResponse(id=i, name=dto.name, age=dto.age) for i, dto in enumerate(dtos)
+        ]
+
+        response = client.post('/users/bulk', json=users_data)
+
+        assert response.status_code == 201
+        assert response.json["created"] == 5
+        # 2件ずつ3回に分けて登録される
+        assert mock_user_service_instance.add_users.call_count == 3
+
+
+def test_add_users_bulk_invalid_body(client):
+    with patch('route.user.get_user_service'):
+        response = client.post('/users/bulk', json={"name": "not a list"})
+        assert response.status_code == 400
+
+
+def test_get_users_sets_etag(client):
+    with patch('route.user.get_user_service') as MockGetUserService:
+        mock_user_service_instance = MockGetUserService.return_value
+        mock_user_service_instance.get_users_version.return_value = 5
+        mock_user_service_instance.get_users_page.return_value = (
+            5, [UserResponse(id=1, name="DTO User 1", age=30)]
+        )
+        response = client.get('/users')
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] == '"users-v5-100-0"'
+
+
+def test_get_users_etag_uses_version_read_with_the_list(client):
+    with patch('route.user.get_user_service') as MockGetUserService:
+        mock_user_service_instance = MockGetUserService.return_value
+        # 304の判定に使う版番号より、一覧（キャッシュ）と組の版番号が古い場合
+        mock_user_service_instance.get_users_version.return_value = 6
+        mock_user_service_instance.get_users_page.return_value = (
+            5, [UserResponse(id=1, name="DTO User 1", age=30)]
+        )
+        response = client.get('/users')
+
+        # 古い一覧に新しい版番号のETagを付けない
+        assert response.headers["ETag"] == '"users-v5-100-0"'
+
+
+def test_get_users_not_modified(client):
+    with patch('route.user.get_user_service') as MockGetUserService:
+        mock_user_service_instance = MockGetUserService.return_value
+        mock_user_service_instance.get_users_version.return_value = 5
+        response = client.get('/users', headers={"If-None-Match": '"users-v5-100-0"'})
+
+        assert response.status_code == 304
+        assert response.headers["ETag"] == '"users-v5-100-0"'
+        # 一覧は読み込まれない
+        mock_user_service_instance.get_users_page.assert_not_called()
+
+
+def test_get_users_async(client):
+    mock_dtos = [
+        UserResponse(id=1, name="DTO User 1", age=30, nickname="Dto1"),
+        UserResponse(id=2, name="DTO User 2", age=25, nickname="Dto2"),
+    ]
+    with patch('route.user.get_async_user_service') as MockGetUserService:
+        MockGetUserService.return_value.get_users_page = AsyncMock(return_value=(3, mock_dtos))
+        response = client.get('/async/users?limit=2')
+
+        assert response.status_code == 200
+        assert [user["id"] for user in response.json] == [1, 2]
+        assert response.headers["ETag"] == '"users-v3-2-0"'
+        assert response.headers["X-Next-Cursor"] == "2"
+        assert response.headers["Link"] == '</async/users?after_id=2&limit=2>; rel="next"'
+        MockGetUserService.return_value.get_users_page.assert_awaited_once_with(limit=2, after_id=None, query=None)
+
+
+def test_get_users_async_not_modified(client):
+    with patch('route.user.get_async_user_service') as MockGetUserService:
+        MockGetUserService.return_value.get_users_page = AsyncMock(return_value=(3, []))
+        response = client.get('/async/users', headers={"If-None-Match": '"users-v3-100-0"'})
+
+        assert response.status_code == 304
+
+
+def test_add_user_async(client):
+    created = UserResponse(id=5, name="Async User", age=20, nickname=None)
+    with patch('route.user.get_async_user_service') as MockGetUserService:
+        MockGetUserService.return_value.add_user = AsyncMock(return_value=created)
+        response = client.post('/async/users', json={"name": "Async User", "age": 20})
+
+        assert response.status_code == 201
+        assert response.json["id"] == 5
+
+
+def test_add_users_bulk_async(client):
+    created = [UserResponse(id=1, name="A", age=20, nickname=None)]
+    with patch('route.user.get_async_user_service') as MockGetUserService:
+        MockGetUserService.return_value.add_users = AsyncMock(return_value=created)
+        response = client.post('/async/users/bulk', json=[{"name": "A", "age": 20}, {"name": "B"}])
+
+        assert response.status_code == 207
+        assert response.json["ids"] == [1]
+        assert response.json["errors"][0]["index"] == 1
+
+
+def test_get_users_with_filters(client):
+    mock_dtos = [UserResponse(id=4, name="Alice", age=30, nickname="ally")]
+    with patch('route.user.get_user_service') as MockGetUserService:
+        mock_user_service_instance = MockGetUserService.return_value
+        mock_user_service_instance.get_users_version.return_value = 3
+        mock_user_service_instance.get_users_page.return_value = (3, mock_dtos)
+        response = client.get('/users?name_prefix=Al&min_age=20&order_by=age&order=desc&limit=1')
+
+        assert response.status_code == 200
+        assert response.json[0]["id"] == 4
+        query = mock_user_service_instance.get_users_page.call_args.kwargs["query"]
+        assert query.name_prefix == "Al"
+        assert query.min_age == 20
+        assert query.order_by == "age"
+        assert query.descending is True
+        assert query.limit == 1
+        # 次ページのリンクに条件が引き継がれる
+        assert response.headers["Link"] == (
+            '</users?after_id=4&limit=1&name_prefix=Al&min_age=20&order_by=age&order=desc>; rel="next"'
+        )
+        # 条件ごとに別のETagになる
+        other = client.get('/users?name_prefix=Bo&min_age=20&order_by=age&order=desc&limit=1')
+        assert other.headers["ETag"] != response.headers["ETag"]
+
+
+def test_get_users_with_invalid_order(client):
+    with patch('route.user.get_user_service'):
+        response = client.get('/users?order_by=age&order=sideways')
+
+        assert response.status_code == 400
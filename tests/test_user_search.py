@@ -0,0 +1,149 @@
+import sqlite3
+
+import pytest
+from pydantic import ValidationError
+
+from application.exceptions import InvalidInputError
+from application.ports.user_query import UserQuery
+from domain.user_domain import User
+from infra.client.migrations import run_migrations
+from infra.repository.user_repository import UserRepository, build_find_users_sql
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = str(tmp_path / "search.db")
+    run_migrations(database)
+    conn = sqlite3.connect(database)
+    conn.execute("DELETE FROM user")
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def repository(db):
+    repository = UserRepository(db)
+    repository.add_users(
+        [
+            User(name="Alice Smith", age=30, nickname="ally"),
+            User(name="Alan Turing", age=41, nickname="al"),
+            User(name="Bob Stone", age=30, nickname="bob"),
+            User(name="alice lower", age=25, nickname="ally"),
+            User(name="Carol Smith", age=52),
+        ]
+    )
+    return repository
+
+
+def _names(users):
+    return [user.name for user in users]
+
+
+def _query_plan(db, query: UserQuery) -> str:
+    sql, params = build_find_users_sql(query)
+    return "\n".join(row[3] for row in db.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+
+def test_find_users_by_name_prefix_is_case_sensitive(repository):
+    assert _names(repository.find_users(UserQuery(name_prefix="Al"))) == ["Alice Smith", "Alan Turing"]
+
+
+def test_find_users_by_nickname(repository):
+    assert _names(repository.find_users(UserQuery(nickname="ally"))) == ["Alice Smith", "alice lower"]
+
+
+def test_find_users_by_age_range(repository):
+    users = repository.find_users(UserQuery(min_age=30, max_age=41, order_by="age", descending=True))
+    assert _names(users) == ["Alan Turing", "Bob Stone", "Alice Smith"]
+
+
+def test_find_users_by_full_text_search(repository):
+    # 大文字・小文字を区別せず、各語の前方一致で検索する
+    assert _names(repository.find_users(UserQuery(search="smi"))) == ["Alice Smith", "Carol Smith"]
+    assert _names(repository.find_users(UserQuery(search="alice smith"))) == ["Alice Smith"]
+    # FTS5の構文として解釈されない
+    assert repository.find_users(UserQuery(search='"OR NOT')) == []
+
+
+def test_full_text_index_follows_writes(db, repository):
+    user = repository.find_users(UserQuery(search="bob"))[0]
+
+    db.execute("UPDATE user SET name = 'Robert Stone' WHERE id = ?", (user.id,))
+    db.commit()
+    assert repository.find_users(UserQuery(search="bob")) == []
+    assert _names(repository.find_users(UserQuery(search="robert"))) == ["Robert Stone"]
+
+    db.execute("DELETE FROM user WHERE id = ?", (user.id,))
+    db.commit()
+    assert repository.find_users(UserQuery(search="robert")) == []
+
+
+def test_find_users_paginates_with_sort_ties(repository):
+    # 同じ年齢の場合はidの順に並び、カーソルの次から返る
+    first = repository.find_users(UserQuery(order_by="age", limit=2))
+    assert _names(first) == ["alice lower", "Alice Smith"]
+
+    second = repository.find_users(UserQuery(order_by="age", limit=2, after_id=first[-1].id))
+    assert _names(second) == ["Bob Stone", "Alan Turing"]
+
+
+def test_find_users_by_name_prefix_ending_with_max_code_point(repository):
+    repository.add_user(User(name="Al\U0010ffff", age=20))
+    repository.add_user(User(name="\U0010ffff", age=20))
+
+    # 末尾の最大のコードポイントは進められないので、上限なしの範囲になる
+    assert _names(repository.find_users(UserQuery(name_prefix="Al\U0010ffff"))) == ["Al\U0010ffff"]
+    assert _names(repository.find_users(UserQuery(name_prefix="\U0010ffff"))) == ["\U0010ffff"]
+
+
+def test_find_users_rejects_deleted_sort_cursor(db, repository):
+    first = repository.find_users(UserQuery(order_by="age", limit=2))
+    db.execute("DELETE FROM user WHERE id = ?", (first[-1].id,))
+    db.commit()
+
+    # 続きがあるのに空のページを返さず、カーソルが不正であることを伝える
+    with pytest.raises(InvalidInputError):
+        repository.find_users(UserQuery(order_by="age", limit=2, after_id=first[-1].id))
+    # idの順の場合は削除されたidの次から返せる
+    assert len(repository.find_users(UserQuery(limit=2, after_id=first[-1].id))) == 2
+
+
+def test_user_query_rejects_invalid_age_range():
+    with pytest.raises(ValidationError):
+        UserQuery(min_age=40, max_age=30)
+
+
+@pytest.mark.parametrize(
+    "query, index",
+    [
+        (UserQuery(name_prefix="Al"), "idx_user_name"),
+        (UserQuery(nickname="ally"), "idx_user_nickname"),
+        (UserQuery(min_age=20, max_age=30), "idx_user_age"),
+        (UserQuery(order_by="age", after_id=1), "idx_user_age"),
+        (UserQuery(search="smith"), "user_fts"),
+    ],
+)
+def test_query_plan_uses_index(db, query, index):
+    plan = _query_plan(db, query)
+    assert index in plan
+    assert "SCAN user\n" not in plan + "\n"
+
+
+def test_query_plan_sorts_with_index(db):
+    plan = _query_plan(db, UserQuery(order_by="name", descending=True))
+    assert "idx_user_name" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_get_users_route_handles_max_code_point_and_unknown_cursor(tmp_path):
+    from app import create_app
+
+    client = create_app({"TESTING": True, "DATABASE": str(tmp_path / "route.db")}).test_client()
+
+    response = client.get("/users?name_prefix=%F4%8F%BF%BF")
+    assert response.status_code == 200
+    assert response.json == []
+
+    response = client.get("/users?order_by=name&after_id=999999")
+    assert response.status_code == 400
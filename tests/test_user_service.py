@@ -72,3 +72,52 @@ def test_add_user_with_mock():
     assert result_dto.name == mock_created_domain_user.name
     assert result_dto.age == mock_created_domain_user.age
     assert result_dto.nickname == mock_created_domain_user.nickname
+
+
+def test_get_users_empty_page_after_cursor():
+    """2ページ目以降が空の場合はUserNotFoundErrorにならない"""
+    with patch("services.user_service.IUserRepository") as MockUserRepository:
+        MockUserRepository.return_value.get_users.return_value = []
+
+        user_service = UserService(MockUserRepository.return_value)
+        result_dtos = user_service.get_users(limit=10, after_id=100)
+
+    assert result_dtos == []
+    MockUserRepository.return_value.get_users.assert_called_once_with(limit=10, after_id=100)
+
+
+def test_add_users_with_mock():
+    """UserRepositoryをモック化してUserServiceのadd_usersをテストする"""
+    dtos = [
+        UserCreateDTO(name="User 1", age=20),
+        UserCreateDTO(name="User 2", age=21, nickname="u2"),
+    ]
+
+    with patch("services.user_service.IUserRepository") as MockUserRepository:
+        def assign_ids(users):
+            for i, user in enumerate(users, start=10):
+                user.id = i
+            return users
+
+        MockUserRepository.return_value.add_users.side_effect = assign_ids
+
+        user_service = UserService(MockUserRepository.return_value)
+        result_dtos = user_service.add_users(dtos)
+
+    MockUserRepository.return_value.add_users.assert_called_once()
+    assert [dto.id for dto in result_dtos] == [10, 11]
+    assert result_dtos[1].nickname == "u2"
+    assert all(isinstance(dto, UserResponse) for dto in result_dtos)
+
+
+def test_get_users_page_returns_version_with_users():
+    """版番号は、リポジトリが一覧と組で返したものをそのまま返す"""
+    with patch("services.user_service.IUserRepository") as MockUserRepository:
+        MockUserRepository.return_value.get_users_page.return_value = (4, [User(id=1, name="User", age=30)])
+
+        user_service = UserService(MockUserRepository.return_value)
+        version, result_dtos = user_service.get_users_page(limit=10)
+
+    assert version == 4
+    assert result_dtos == [UserResponse(id=1, name="User", age=30)]
+    MockUserRepository.return_value.get_users_page.assert_called_once_with(limit=10, after_id=None, query=None)
@@ -0,0 +1,79 @@
+import random
+
+
+# 静的ファイルとみなす拡張子（ACCESS_LOG_EXCLUDE_STATICが有効な場合はログを出さない）
+STATIC_EXTENSIONS = (
+    ".css", ".js", ".map", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico",
+    ".webp", ".woff", ".woff2", ".ttf", ".txt",
+)
+
+
+def parse_path_rates(value: str) -> dict[str, float]:
+    """
+    "prefix=rate,prefix=rate" 形式の文字列を {prefix: rate} に変換します。
+    例: "/users=0.1,/hello=0"
+    """
+    rates = {}
+    for item in (value or "").split(","):
+        if not item.strip():
+            continue
+        prefix, _, rate = item.partition("=")
+        rates[prefix.strip()] = float(rate)
+    return rates
+
+
+class AccessLogSampler:
+    """
+    アクセスログを出力するかどうかを決めます。
+
+    - ステータスコードが `error_status` 以上のリクエストは必ず出力する
+    - 処理時間が `slow_ms` 以上のリクエストは必ず出力する
+    - `exclude_prefixes` に前方一致するパスと、静的ファイルは出力しない
+    - それ以外は、最も長く前方一致した `path_rates` の割合（なければ `default_rate`）で抽出する
+    """
+
+    def __init__(
+        self,
+        default_rate: float = 1.0,
+        path_rates: dict[str, float] | None = None,
+        exclude_prefixes: tuple[str, ...] = (),
+        exclude_static: bool = True,
+        slow_ms: float = 500.0,
+        error_status: int = 400,
+    ):
+        self.default_rate = default_rate
+        # 長いプレフィックスから順に照合する
+        self.path_rates = sorted((path_rates or {}).items(), key=lambda item: -len(item[0]))
+        self.exclude_prefixes = tuple(exclude_prefixes)
+        self.exclude_static = exclude_static
+        self.slow_ms = slow_ms
+        self.error_status = error_status
+
+    @classmethod
+    def from_config(cls, config) -> "AccessLogSampler":
+        return cls(
+            default_rate=config.get("ACCESS_LOG_SAMPLE_RATE", 1.0),
+            path_rates=parse_path_rates(config.get("ACCESS_LOG_PATH_RATES", "")),
+            exclude_prefixes=tuple(
+                prefix for prefix in config.get("ACCESS_LOG_EXCLUDE", "").split(",") if prefix
+            ),
+            exclude_static=config.get("ACCESS_LOG_EXCLUDE_STATIC", True),
+            slow_ms=config.get("ACCESS_LOG_SLOW_MS", 500.0),
+            error_status=config.get("ACCESS_LOG_ERROR_STATUS", 400),
+        )
+
+    def rate_for(self, path: str) -> float:
+        for prefix, rate in self.path_rates:
+            if path.startswith(prefix):
+                return rate
+        return self.default_rate
+
+    def should_log(self, path: str, status_code: int, duration_ms: float) -> bool:
+        if status_code >= self.error_status or duration_ms >= self.slow_ms:
+            return True
+        if self.exclude_prefixes and path.startswith(self.exclude_prefixes):
+            return False
+        if self.exclude_static and path.endswith(STATIC_EXTENSIONS):
+            return False
+        rate = self.rate_for(path)
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
@@ -0,0 +1,156 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import weakref
+
+
+DROP = "drop"
+BLOCK = "block"
+
+# 稼働中のシンク。atexit / fork のフックはモジュールで1回だけ登録し、ここに登録されている
+# シンクに振り分ける（setup_logging() を呼ぶたびにフックが増えないようにする）
+_live_sinks = weakref.WeakSet()
+
+
+def _stop_live_sinks():
+    for sink in list(_live_sinks):
+        sink.stop()
+
+
+def _restart_live_sinks_after_fork():
+    for sink in list(_live_sinks):
+        sink._restart_after_fork()
+
+
+atexit.register(_stop_live_sinks)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_live_sinks_after_fork)
+
+
+class AsyncLogSink:
+    """
+    ログレコードをキューに積み、バックグラウンドスレッドでまとめて書き込むシンク。
+
+    - キューの長さは `max_queue_size` までに制限する（メモリ使用量の上限）
+    - キューが満杯の場合、`policy` が "drop" なら即座に破棄し、"block" なら
+      `block_timeout` 秒まで空きを待ってから破棄する。破棄した件数は `dropped` に記録する
+    - 書き込みは最大 `batch_size` 件ごとに1回の write/flush にまとめる
+    - フォーマット（structlogのレンダリングを含む）もバックグラウンドスレッドで行う
+    - プロセス終了時（atexit）に残りのレコードを書き込む
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        stream,
+        formatter: logging.Formatter,
+        max_queue_size: int = 10000,
+        policy: str = DROP,
+        block_timeout: float = 1.0,
+        batch_size: int = 256,
+    ):
+        if policy not in (DROP, BLOCK):
+            raise ValueError(f"Unknown queue full policy: {policy}")
+        self.stream = stream
+        self.formatter = formatter
+        self.max_queue_size = max_queue_size
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self.handler = _SinkHandler(self)
+        self._thread = None
+        self._stopped = False
+        self._start()
+        _live_sinks.add(self)
+
+    def _start(self):
+        self.queue = queue.Queue(self.max_queue_size)
+        self._thread = threading.Thread(target=self._run, name="async-log-sink", daemon=True)
+        self._thread.start()
+
+    def _restart_after_fork(self):
+        # fork後の子プロセスではスレッドが存在しないので、キューとスレッドを作り直す
+        # （fork時に他のスレッドが保持していたロックも作り直す）
+        self._dropped_lock = threading.Lock()
+        if not self._stopped:
+            self._start()
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            if self.policy == BLOCK:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def _run(self):
+        q = self.queue
+        while True:
+            record = q.get()
+            batch = [record]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            lines = []
+            for item in batch:
+                if item is self._STOP:
+                    stop = True
+                    continue
+                try:
+                    lines.append(self.formatter.format(item))
+                except Exception:
+                    self.handler.handleError(item)
+            if lines:
+                self._write(lines)
+            for _ in batch:
+                q.task_done()
+            if stop:
+                return
+
+    def _write(self, lines):
+        try:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+        except Exception:
+            # 出力先が閉じられている場合など。ログのためにアプリを止めない
+            pass
+
+    def flush(self):
+        """キューに積まれているレコードがすべて書き込まれるまで待ちます。"""
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.join()
+
+    def stop(self):
+        """残りのレコードを書き込んでからスレッドを停止します。"""
+        self._stopped = True
+        _live_sinks.discard(self)
+        if self._thread is None or not self._thread.is_alive():
+            return
+        # 停止の合図はポリシーに関係なく必ず積む
+        self.queue.put(self._STOP)
+        self._thread.join()
+
+
+class _SinkHandler(logging.Handler):
+    """
+    ルートロガーに登録し、レコードをAsyncLogSinkのキューに積むだけのハンドラー。
+    QueueHandlerと異なり、呼び出し元のスレッドではフォーマットを行わない。
+    """
+
+    def __init__(self, sink: AsyncLogSink):
+        super().__init__()
+        self.sink = sink
+
+    def emit(self, record):
+        self.sink.enqueue(record)
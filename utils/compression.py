@@ -0,0 +1,137 @@
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotliは任意の依存。なければgzipのみ使う
+    brotli = None
+
+
+# 圧縮する価値があるContent-Type（画像や圧縮済みの形式は対象外）
+COMPRESSIBLE_MIMETYPES = frozenset(
+    {
+        "application/json",
+        "application/x-ndjson",
+        "application/javascript",
+        "application/xml",
+        "image/svg+xml",
+    }
+)
+
+
+def available_encodings() -> tuple[str, ...]:
+    """このプロセスで使えるエンコーディングを、優先する順に返します。"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encodings, candidates) -> str | None:
+    """
+    Accept-Encodingのq値が最も高いエンコーディングを candidates から選びます。
+    q値が同じ場合は candidates の順を優先する。どれも受け付けない場合はNone。
+    """
+    best = None
+    best_quality = 0
+    for encoding in candidates:
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(mimetype: str | None) -> bool:
+    if not mimetype:
+        return False
+    return mimetype.startswith("text/") or mimetype in COMPRESSIBLE_MIMETYPES
+
+
+class ResponseCompressor:
+    """
+    動的なレスポンスを、Accept-Encodingに応じてgzip/brotliで圧縮します。
+
+    - 本文が min_size バイト未満のレスポンスは圧縮しない（ヘッダのほうが大きくなるため）
+    - ジェネレーターのレスポンス（NDJSONなど）はチャンクごとに圧縮・flushし、ストリーミングを保つ
+    - send_file の応答（静的ファイル）は対象外。事前に圧縮したファイルを StaticFiles が配信する
+    """
+
+    def __init__(self, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        # brotliは品質を上げると圧縮が非常に遅くなるので、リクエスト時は低めにする
+        self.brotli_quality = brotli_quality
+
+    @classmethod
+    def from_config(cls, config) -> "ResponseCompressor":
+        return cls(
+            min_size=config.get("COMPRESS_MIN_SIZE", 1024),
+            gzip_level=config.get("COMPRESS_GZIP_LEVEL", 6),
+            brotli_quality=config.get("COMPRESS_BROTLI_QUALITY", 4),
+        )
+
+    def _should_compress(self, response) -> bool:
+        return (
+            200 <= response.status_code < 300
+            and response.status_code != 204
+            and not response.direct_passthrough
+            and "Content-Encoding" not in response.headers
+            and is_compressible(response.mimetype)
+        )
+
+    def compress(self, response, accept_encodings):
+        """レスポンスを圧縮します（対象外の場合はそのまま返す）。"""
+        if not self._should_compress(response):
+            return response
+        # 圧縮の有無はAccept-Encodingによって変わるので、キャッシュに伝える
+        response.vary.add("Accept-Encoding")
+
+        streamed = response.is_streamed
+        if not streamed and (response.content_length or 0) < self.min_size:
+            return response
+        encoding = negotiate_encoding(accept_encodings, available_encodings())
+        if encoding is None:
+            return response
+
+        if streamed:
+            response.response = self._compress_stream(response.response, encoding)
+            response.headers.pop("Content-Length", None)
+        else:
+            response.set_data(self._compress_bytes(response.get_data(), encoding))
+        response.headers["Content-Encoding"] = encoding
+        # 圧縮後の本文は元と異なるので、強いETagは弱いETagにする（比較は弱い比較で行う）
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def _compress_bytes(self, data: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(data, quality=self.brotli_quality)
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+
+    def _compress_stream(self, chunks, encoding: str):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            process, flush, finish = compressor.process, compressor.flush, compressor.finish
+        else:
+            compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+            process = compressor.compress
+
+            def flush():
+                return compressor.flush(zlib.Z_SYNC_FLUSH)
+
+            def finish():
+                return compressor.flush(zlib.Z_FINISH)
+
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                data = process(chunk)
+                # クライアントがすぐに読めるよう、チャンクごとに出力する
+                data += flush()
+                if data:
+                    yield data
+            yield finish()
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
@@ -0,0 +1,125 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable
+
+from flask import g
+
+
+SINGLETON = "singleton"
+REQUEST = "request"
+
+_MISSING = object()
+
+
+class ScopedProxy:
+    """
+    リクエストスコープの依存を、属性にアクセスされた時点で解決するプロキシ。
+
+    プロセス全体で共有するオブジェクト（リポジトリなど）にコネクションの代わりに渡しておくと、
+    実際にクエリを実行するときに、そのリクエストのコネクションが（初回のみ）取得される。
+    キャッシュから返すなど、コネクションを使わなかったリクエストではプールから借りない。
+    """
+
+    __slots__ = ("_container", "_name")
+
+    def __init__(self, container: "Container", name: str):
+        object.__setattr__(self, "_container", container)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, attr):
+        return getattr(self._container.resolve(self._name), attr)
+
+    def __repr__(self):
+        return f"<ScopedProxy {self._name}>"
+
+
+class Container:
+    """
+    依存関係を登録・解決する小さなDIコンテナ。
+
+    - singleton: プロセス全体で1つだけ作る（状態を持たないサービス、リポジトリ、バリデーターなど）
+    - request: リクエスト（アプリケーションコンテキスト）ごとに作り、g に保持する（コネクションなど）
+
+    プロバイダーは引数にコンテナを受け取り、依存するオブジェクトを resolve() で取得する。
+    どちらも初回の resolve() で作成するので、fork前に作られることはない（fork後は作り直す）。
+    テストでは override() でプロバイダーを差し替えられる。
+    """
+
+    def __init__(self):
+        self._providers = {}
+        self._overrides = {}
+        self._singletons = {}
+        self._lock = threading.RLock()
+        self._pid = os.getpid()
+
+    def register(self, name: str, provider: Callable[["Container"], Any], scope: str = SINGLETON):
+        if scope not in (SINGLETON, REQUEST):
+            raise ValueError(f"Unknown scope: {scope}")
+        with self._lock:
+            self._providers[name] = (provider, scope)
+            self._singletons.pop(name, None)
+
+    def singleton(self, name: str, provider: Callable[["Container"], Any]):
+        self.register(name, provider, SINGLETON)
+
+    def request(self, name: str, provider: Callable[["Container"], Any]):
+        self.register(name, provider, REQUEST)
+
+    def proxy(self, name: str) -> ScopedProxy:
+        """name を使うときに解決するプロキシを返します（リクエストスコープの依存をシングルトンに渡す場合に使う）。"""
+        return ScopedProxy(self, name)
+
+    def resolve(self, name: str):
+        if name in self._overrides:
+            return self._overrides[name]
+        provider, scope = self._providers[name]
+        if scope == REQUEST:
+            key = f"_container_{name}"
+            value = g.get(key)
+            if value is None:
+                value = provider(self)
+                setattr(g, key, value)
+            return value
+
+        if self._pid != os.getpid():
+            # forkで引き継いだシングルトン（スレッドやコネクションを持つもの）は使わない
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._singletons.clear()
+                    self._pid = os.getpid()
+        try:
+            return self._singletons[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._singletons:
+                self._singletons[name] = provider(self)
+            return self._singletons[name]
+
+    @contextmanager
+    def override(self, name: str, value):
+        """
+        with ブロックの間、name の解決結果を value に差し替えます（テスト用）。
+        name に依存するシングルトンも差し替えた値で作り直すため、作成済みのシングルトンは
+        開始時と終了時に破棄する（ブロック内で作ったものが終了後も使われないように）。
+        """
+        with self._lock:
+            previous = self._overrides.get(name, _MISSING)
+            self._overrides[name] = value
+            self._singletons.clear()
+        try:
+            yield value
+        finally:
+            with self._lock:
+                if previous is _MISSING:
+                    self._overrides.pop(name, None)
+                else:
+                    self._overrides[name] = previous
+                self._singletons.clear()
+
+    def reset(self):
+        """作成済みのシングルトンを破棄します（設定を変えた後やテストで使う）。"""
+        with self._lock:
+            self._singletons.clear()
+
@@ -1,29 +1,75 @@
 import functools
+import inspect
+import time
+from utils.errors import report_error
 from utils.logging import get_logger
+from utils.metrics import REGISTRY
 
 def log_errors(logger_name: str = "application"):
     """
     関数実行中に発生した例外をログに記録するデコレーター。
+    コルーチン関数（async def）にも使える。
+
+    想定内の例外（UserNotFoundErrorなど）はトレースバックなしで記録する。
+    デコレーターが入れ子になっていても、同じ例外は最初（最も内側）の1回だけ記録する。
     """
     def decorator(func):
         logger = get_logger(logger_name)
 
+        def log_error(error, args, kwargs):
+            # メソッドの場合、最初の引数 (self) をログから除外
+            # argsが空でないことを確認し、最初の要素をスキップ
+            cleaned_args = args[1:] if args else args
+
+            report_error(
+                logger,
+                "An error occurred during function execution.",
+                error,
+                function=func.__name__,
+                args=cleaned_args,
+                kwargs=kwargs,
+            )
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    log_error(e, args, kwargs)
+                    raise # 例外を再送出
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
             except Exception as e:
-                # メソッドの場合、最初の引数 (self) をログから除外
-                # argsが空でないことを確認し、最初の要素をスキップ
-                cleaned_args = args[1:] if args else args
-
-                logger.error(
-                    "An error occurred during function execution.",
-                    function=func.__name__,
-                    args=cleaned_args,
-                    kwargs=kwargs,
-                    exc_info=True
-                )
+                log_error(e, args, kwargs)
                 raise # 例外を再送出
         return wrapper
     return decorator
+
+
+def timed(metric_name: str, **labels):
+    """
+    関数の実行時間（秒）をヒストグラムに記録するデコレーター。
+    ラベルには指定したものに加えて、関数名が `method` として付与される。
+    """
+    def decorator(func):
+        histogram = REGISTRY.histogram(
+            metric_name,
+            "Duration of instrumented calls in seconds.",
+            tuple(labels) + ("method",),
+        )
+        label_values = tuple(labels.values()) + (func.__name__,)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, *label_values)
+        return wrapper
+    return decorator
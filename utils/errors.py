@@ -0,0 +1,69 @@
+import logging
+
+from flask import current_app, has_app_context
+from pydantic import ValidationError
+from werkzeug.exceptions import HTTPException
+
+from utils.metrics import REGISTRY
+
+
+# 例外の種類ごとの発生数。トレースバックを繰り返し出力する代わりにこれで傾向を見る
+errors_total = REGISTRY.counter(
+    "app_errors_total",
+    "Errors raised while handling requests.",
+    ("type", "expected"),
+)
+
+# 記録済みの例外に付ける属性
+_REPORTED_ATTR = "_error_reported"
+
+
+def is_expected_error(error: BaseException) -> bool:
+    """
+    業務上起こりうる（想定内の）例外かどうかを判定します。
+
+    - `expected` 属性を持つ例外（ApplicationError）はその値に従う
+    - HTTPExceptionはステータスコードが5xx未満なら想定内
+    - Pydanticの検証エラーは入力の誤りなので想定内
+    """
+    expected = getattr(error, "expected", None)
+    if expected is not None:
+        return expected
+    if isinstance(error, HTTPException):
+        return error.code is not None and error.code < 500
+    return isinstance(error, ValidationError)
+
+
+def _expected_error_log_level() -> int:
+    name = "INFO"
+    if has_app_context():
+        name = current_app.config.get("EXPECTED_ERROR_LOG_LEVEL", name)
+    level = logging.getLevelName(str(name).upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+def report_error(logger, event: str, error: BaseException, **kwargs) -> bool:
+    """
+    例外を分類してログとメトリクスに記録します。同じ例外は最初の1回だけ記録する。
+
+    - 想定内の例外: トレースバックなしで、設定したレベル（EXPECTED_ERROR_LOG_LEVEL）で出力する
+    - 想定外の例外: トレースバック付きのERRORで出力する
+
+    Returns:
+        今回記録した場合はTrue、記録済みだった場合はFalse。
+    """
+    if getattr(error, _REPORTED_ATTR, False):
+        return False
+    try:
+        setattr(error, _REPORTED_ATTR, True)
+    except (AttributeError, TypeError):  # 属性を追加できない例外は毎回記録する
+        pass
+
+    expected = is_expected_error(error)
+    error_type = type(error).__name__
+    errors_total.inc(error_type, "true" if expected else "false")
+    if expected:
+        logger.log(_expected_error_log_level(), event, error_type=error_type, error=str(error), **kwargs)
+    else:
+        logger.error(event, error_type=error_type, exc_info=error, **kwargs)
+    return True
@@ -0,0 +1,95 @@
+import decimal
+import json
+import uuid
+
+from flask.json.provider import JSONProvider
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+try:
+    import orjson
+except ImportError:  # orjsonは任意の依存。なければ標準のjsonを使う
+    orjson = None
+
+
+def _default(obj):
+    """orjson（または標準のjson）がそのままでは扱えない値を変換する。"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    if isinstance(obj, Exception):
+        # pydanticのエラー詳細（ctx）に含まれる例外など
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _is_model_sequence(obj) -> bool:
+    return isinstance(obj, (list, tuple)) and bool(obj) and all(
+        isinstance(item, BaseModel) for item in obj
+    )
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    orjsonを使うFlaskのJSONプロバイダー（orjsonがなければ標準のjsonを使う）。
+
+    Pydanticのモデル、およびモデルのリストは pydantic_core で直接JSONにするため、
+    `jsonify(dto)` のように渡せば中間の辞書（model_dump()）を作らない。
+
+    `app.json = FastJSONProvider(app)` で登録する。
+    """
+
+    # Noneの場合、デバッグモードでのみインデントする（Flaskのデフォルトと同じ）
+    compact: bool | None = None
+    # キーの並び替えは行わない（Flaskのデフォルトは並び替える）
+    sort_keys = False
+    mimetype = "application/json"
+
+    def _is_compact(self) -> bool:
+        if self.compact is None:
+            return not self._app.debug
+        return self.compact
+
+    def dumps_bytes(self, obj) -> bytes:
+        compact = self._is_compact()
+        if isinstance(obj, BaseModel) or _is_model_sequence(obj):
+            return to_json(obj, indent=None if compact else 2)
+        if orjson is not None:
+            option = 0 if compact else orjson.OPT_INDENT_2
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            try:
+                return orjson.dumps(obj, default=_default, option=option)
+            except TypeError:
+                # 64bitを超える整数など、orjsonが扱えない値は標準のjsonに任せる
+                pass
+        return self._stdlib_dumps(obj, compact).encode()
+
+    def _stdlib_dumps(self, obj, compact: bool, **kwargs) -> str:
+        kwargs.setdefault("default", _default)
+        kwargs.setdefault("ensure_ascii", False)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        if compact:
+            kwargs.setdefault("separators", (",", ":"))
+        else:
+            kwargs.setdefault("indent", 2)
+        return json.dumps(obj, **kwargs)
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            # 標準のjsonの引数が指定された場合はそれに従う
+            return self._stdlib_dumps(obj, self._is_compact(), **kwargs)
+        return self.dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # bytesのまま渡し、str への変換（decode/encode）を省く
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
@@ -1,25 +1,42 @@
+import json
 import logging
 import os
 import structlog
-from colorama import init as colorama_init
 import sys
 
+from utils.async_logging import AsyncLogSink
+
+try:
+    import orjson
+except ImportError:  # orjsonは任意の依存。なければ標準のjsonを使う
+    orjson = None
+
+
+# 非同期シンク。setup_logging() で作成される
+_sink = None
+
+
+def _orjson_dumps(obj, default=None, **kwargs) -> str:
+    try:
+        return orjson.dumps(obj, default=default).decode()
+    except TypeError:
+        # 64bitを超える整数など、orjsonが扱えない値は標準のjsonに任せる
+        return json.dumps(obj, default=default, **kwargs)
+
 
 def setup_logging():
     """
     structlogのロギング設定を構成します。
     環境変数IS_DEBUGが'true'の場合、色付きコンソール出力を行います。
     それ以外の場合はJSON形式で出力します。
-    """
 
-    # 標準のlogging設定
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=logging.INFO,
-    )
+    LOG_ASYNCが'true'（デフォルト）の場合、ログはキューに積まれ、レンダリングと書き込みは
+    バックグラウンドスレッドでまとめて行われます（LOG_QUEUE_SIZE, LOG_QUEUE_FULL_POLICY,
+    LOG_BATCH_SIZE で調整）。
+    """
+    global _sink
 
-    processors = [
+    shared_processors = [
         structlog.contextvars.merge_contextvars,
         structlog.stdlib.add_logger_name,
         structlog.processors.add_log_level,
@@ -31,13 +48,52 @@ def setup_logging():
 
     # 環境変数をチェック
     if os.environ.get("IS_DEBUG") == "true":
+        # coloramaは色付きで出力する場合のみ使うので、ここでimportする
+        from colorama import init as colorama_init
+
         colorama_init()  # coloramaを初期化
-        processors.append(structlog.dev.ConsoleRenderer())
+        renderer = structlog.dev.ConsoleRenderer()
+    elif orjson is not None:
+        renderer = structlog.processors.JSONRenderer(serializer=_orjson_dumps)
     else:
-        processors.append(structlog.processors.JSONRenderer())
+        renderer = structlog.processors.JSONRenderer()
+
+    # レンダリングはハンドラーのフォーマッターで行う（非同期の場合はバックグラウンドスレッド）
+    formatter = structlog.stdlib.ProcessorFormatter(
+        processors=[structlog.stdlib.ProcessorFormatter.remove_processors_meta, renderer],
+        # werkzeugなど標準のloggingから出力されたログにも同じ情報を付与する
+        foreign_pre_chain=[
+            structlog.stdlib.add_logger_name,
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+        ],
+    )
+
+    if _sink is not None:
+        _sink.stop()
+        _sink = None
+    if os.environ.get("LOG_ASYNC", "true") == "true":
+        _sink = AsyncLogSink(
+            sys.stdout,
+            formatter,
+            max_queue_size=int(os.environ.get("LOG_QUEUE_SIZE", "10000")),
+            policy=os.environ.get("LOG_QUEUE_FULL_POLICY", "drop"),
+            batch_size=int(os.environ.get("LOG_BATCH_SIZE", "256")),
+        )
+        handler = _sink.handler
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(formatter)
+
+    # 標準のlogging設定
+    root_logger = logging.getLogger()
+    for old_handler in root_logger.handlers[:]:
+        root_logger.removeHandler(old_handler)
+    root_logger.addHandler(handler)
+    root_logger.setLevel(logging.INFO)
 
     structlog.configure(
-        processors=processors,
+        processors=shared_processors + [structlog.stdlib.ProcessorFormatter.wrap_for_formatter],
         wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
@@ -45,6 +101,14 @@ def setup_logging():
     )
 
 
+def flush_logging():
+    """
+    非同期シンクに積まれているログをすべて書き込みます（テストやシャットダウン時に使う）。
+    """
+    if _sink is not None:
+        _sink.flush()
+
+
 def get_logger(name: str):
     """
     構成済みのロガーを取得します。
@@ -0,0 +1,252 @@
+import bisect
+import contextvars
+import math
+import threading
+from typing import Callable
+
+
+# レイテンシ（秒）用のデフォルトのバケット
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class _ShardedMetric:
+    """
+    スレッドごとに値を持ち、取得（スクレイプ）時に集計するメトリクスの基底クラス。
+
+    記録はそのスレッド専用の辞書を更新するだけなので、ロックを取らない。
+    終了したスレッドの値は、スクレイプ時に `_retired` へ合算してから破棄する。
+    """
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # (スレッド, そのスレッドの値の辞書)
+        self._shards = []
+        self._retired = {}
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), values))
+            return values
+
+    def _merge(self, target: dict, source: dict):
+        raise NotImplementedError
+
+    def collect(self) -> dict:
+        """全スレッドの値を集計して {ラベル値のタプル: 値} で返します。"""
+        merged = {}
+        with self._lock:
+            alive = []
+            for thread, values in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, values))
+                else:
+                    self._merge(self._retired, values)
+            self._shards = alive
+            self._merge(merged, self._retired)
+            for _, values in alive:
+                # dict() のコピーはGILの下で一度に行われるので、記録中のスレッドと競合しない
+                self._merge(merged, dict(values))
+        return merged
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for label_values, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_ShardedMetric):
+    type = "counter"
+
+    def inc(self, *label_values, amount: float = 1.0):
+        values = self._shard()
+        values[label_values] = values.get(label_values, 0.0) + amount
+
+    def _merge(self, target, source):
+        for key, value in source.items():
+            target[key] = target.get(key, 0.0) + value
+
+
+class Gauge(Counter):
+    """
+    増減のみを記録するゲージ（処理中のリクエスト数など）。
+    スレッドごとの増減の合計が現在値になる。
+    """
+
+    type = "gauge"
+
+    def dec(self, *label_values, amount: float = 1.0):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(_ShardedMetric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *label_values):
+        values = self._shard()
+        # [バケットごとの件数..., +Infの件数, 合計, 件数]
+        state = values.get(label_values)
+        if state is None:
+            state = values[label_values] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def _merge(self, target, source):
+        for key, state in source.items():
+            merged = target.get(key)
+            if merged is None:
+                target[key] = list(state)
+            else:
+                for i, value in enumerate(state):
+                    merged[i] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        bounds = self.buckets + (math.inf,)
+        for label_values, state in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, state):
+                cumulative += count
+                labels = _format_labels(self.labelnames, label_values, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{labels} {state[-1]}")
+        return lines
+
+
+class CallbackGauge:
+    """
+    スクレイプ時に関数を呼び出して値を取得するゲージ（コネクションプールの統計など）。
+    関数は {ラベル値のタプル: 値} を返す。
+    """
+
+    type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback: Callable[[], dict] = dict):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for label_values, value in sorted(self.callback().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, label_values)} {_format_value(value)}")
+        return lines
+
+
+class CallbackCounter(CallbackGauge):
+    """
+    スクレイプ時に関数を呼び出して値を取得するカウンター（キャッシュのヒット数など、増えるだけの値）。
+    Prometheusの rate() / increase() を使えるように counter として出力する。
+    """
+
+    type = "counter"
+
+
+class MetricsRegistry:
+    """
+    メトリクスを名前で管理し、Prometheusのテキスト形式で出力します。
+    同じ名前で再度登録した場合は、既存のメトリクスを返します。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def callback_gauge(self, name, documentation, labelnames=(), callback=dict) -> CallbackGauge:
+        return self._get_or_create(CallbackGauge, name, documentation, labelnames, callback)
+
+    def callback_counter(self, name, documentation, labelnames=(), callback=dict) -> CallbackCounter:
+        return self._get_or_create(CallbackCounter, name, documentation, labelnames, callback)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _QueryCounter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def inc(self):
+        with self._lock:
+            self.count += 1
+
+
+# リクエスト中に実行したSQL文の数。スレッドではなくコンテキストごとに持つので、
+# コンテキストを引き継いだexecutorのスレッド（/async 配下のリポジトリ呼び出し）で実行したSQL文も数える
+_db_queries: contextvars.ContextVar[_QueryCounter | None] = contextvars.ContextVar("db_queries", default=None)
+
+
+def count_db_query(statement=None):
+    """sqlite3の trace callback として登録し、実行されたSQL文を数える。"""
+    counter = _db_queries.get()
+    if counter is not None:
+        counter.inc()
+
+
+def reset_db_query_count():
+    _db_queries.set(_QueryCounter())
+
+
+def get_db_query_count() -> int:
+    counter = _db_queries.get()
+    return counter.count if counter is not None else 0
@@ -0,0 +1,69 @@
+from functools import lru_cache
+from typing import Callable
+
+import pydantic
+from pydantic import BaseModel, TypeAdapter
+
+
+# 内部状態を直接設定する高速な経路は、このマイナーバージョンの pydantic でのみ使う（requirements.txt で固定）。
+# 内部状態の持ち方はマイナーバージョンで変わりうるので、更新する場合は
+# tests/test_row_mapper.py の model_construct との比較テストを確認してから変更すること
+FAST_PATH_PYDANTIC_VERSION = "2.11"
+
+
+def _is_fast_path_supported(version: str) -> bool:
+    return version.split(".")[:2] == FAST_PATH_PYDANTIC_VERSION.split(".")
+
+
+@lru_cache(maxsize=None)
+def trusted_factory(model: type[BaseModel]) -> Callable[[dict], BaseModel]:
+    """
+    検証済みの値の辞書から、再検証せずにモデルを組み立てる関数を返します。
+
+    pydantic v2 の `model_construct` はPythonで全フィールドを走査するため、
+    通常の検証よりも遅い。プライベート属性や `model_post_init`、extra='allow' を
+    持たない単純なモデルでは、`model_construct` と同じ内部状態を直接設定する。
+    それ以外のモデルや、FAST_PATH_PYDANTIC_VERSION 以外の pydantic では `model_construct` にフォールバックする。
+    """
+    # 検証を経ずに作ったインスタンスは pydantic_core.to_json などで直接シリアライズされることがあるため、
+    # defer_build のモデルでもスキーマを作っておく
+    model.model_rebuild()
+    if (
+        not _is_fast_path_supported(pydantic.VERSION)
+        or model.__private_attributes__
+        or model.__pydantic_post_init__
+        or model.model_config.get("extra") == "allow"
+    ):
+        return lambda values: model.model_construct(**values)
+
+    new = model.__new__
+    setattr_ = object.__setattr__
+    field_count = len(model.model_fields)
+
+    def build(values: dict) -> BaseModel:
+        # 一部のフィールドしかない場合は、デフォルト値の設定を model_construct に任せる
+        if len(values) != field_count:
+            return model.model_construct(**values)
+        instance = new(model)
+        setattr_(instance, "__dict__", values)
+        setattr_(instance, "__pydantic_fields_set__", set(values))
+        setattr_(instance, "__pydantic_extra__", None)
+        setattr_(instance, "__pydantic_private__", None)
+        return instance
+
+    return build
+
+
+def build_models(*types: type[BaseModel] | TypeAdapter):
+    """
+    defer_build のモデル・TypeAdapter のスキーマを作成します（作成済みの場合は何もしない）。
+
+    起動（import）を速くするため、モデルのスキーマ（バリデーター・シリアライザー）は
+    `ConfigDict(defer_build=True)` で初回利用時に作る。最初のリクエストで作成を待たないよう、
+    ワーカーの準備処理（warmup）で呼び出す。
+    """
+    for type_ in types:
+        if isinstance(type_, TypeAdapter):
+            type_.rebuild()
+        else:
+            type_.model_rebuild()
@@ -0,0 +1,242 @@
+import hashlib
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+# プロファイルを要求するヘッダー。値は sign_profile_token() で作る（`flask --app app profile token`）
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+
+# プロファイル中のリクエストのSQL文（リクエストを処理するスレッドごと）
+_active = threading.local()
+
+
+def sign_profile_token(secret: str, path: str, expires_at: int) -> str:
+    """path へのリクエストを expires_at（UNIX時間）まで profiling するためのトークンを作ります。"""
+    signature = hmac.new(secret.encode(), f"{expires_at}:{path}".encode(), hashlib.sha256).hexdigest()
+    return f"{expires_at}.{signature}"
+
+
+def verify_profile_token(secret: str, path: str, token: str, now: float | None = None) -> bool:
+    expires_at, _, _ = (token or "").partition(".")
+    if not secret or not expires_at.isdigit():
+        return False
+    if int(expires_at) < (time.time() if now is None else now):
+        return False
+    return hmac.compare_digest(sign_profile_token(secret, path, int(expires_at)), token)
+
+
+def record_sql_statement(statement: str):
+    """
+    sqlite3の trace callback から呼び出し、プロファイル中のリクエストのSQL文と開始時刻を記録する。
+    プロファイルしていないスレッドでは何もしない。
+    """
+    statements = getattr(_active, "statements", None)
+    if statements is not None:
+        statements.append((time.perf_counter(), statement))
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}"
+
+
+class StackSampler:
+    """
+    別スレッドから対象のスレッドのスタックを interval 秒ごとに取得し、
+    flamegraph の collapsed（folded）形式（"外側;...;内側 回数"）で数えるプロファイラー。
+
+    sys.setprofile を使わないので、対象のスレッドの処理はほとんど遅くならない。
+    時間は壁時計で数えるため、DBやロックを待っている時間も含まれる。
+    対象のスレッドがGILを持ち続けている間は取得できないので、実際の間隔は
+    sys.getswitchinterval()（デフォルト5ms）程度まで長くなることがある。
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            # 終了処理（stop()）中のスタックは数えない
+            if frame is None or self._stop.is_set():
+                continue
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = 5) -> list[dict]:
+        """サンプル数の多い関数（スタックの一番内側）を返します。"""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return [
+            {"function": name, "samples": count} for name, count in leaves.most_common(limit)
+        ]
+
+
+class RequestProfile:
+    """プロファイル中のリクエスト1件分の状態。"""
+
+    def __init__(self, profile_id: str, sampler: StackSampler):
+        self.id = profile_id
+        self.sampler = sampler
+        self.statements = []
+        self.started = time.perf_counter()
+
+
+class RequestProfiler:
+    """
+    リクエスト単位のプロファイラー（opt-in）。
+
+    - `PROFILE_TOKEN_HEADER` に有効な署名付きトークンがあるリクエストと、
+      `sample_rate` の割合で抽出したリクエストをプロファイルする
+    - スタックのサンプリング結果は `output_dir/<id>.folded` に保存する
+      （flamegraph.pl、speedscope、inferno などでフレームグラフにできる）
+    - SQL文は sqlite3 の trace callback で記録する。trace callback は文の開始時にしか呼ばれないため、
+      文の時間は次の文の開始（最後の文はプロファイルの終了）までの時間で、実際の実行時間の上限になる
+    - 同時にプロファイルするリクエストは `max_concurrent` 件まで（超えた分はプロファイルしない）
+
+    プロファイルするのはリクエストを処理するスレッドだけなので、async のビューやスレッドプールで
+    実行されるDBアクセス、ストリーミングのレスポンスの生成は含まれない。
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        sample_rate: float = 0.0,
+        secret: str = "",
+        interval: float = 0.001,
+        max_concurrent: int = 1,
+    ):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.secret = secret
+        self.interval = interval
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    @classmethod
+    def from_config(cls, config) -> "RequestProfiler | None":
+        """プロファイルが有効な設定（抽出の割合かトークンの鍵がある）の場合のみ作ります。"""
+        sample_rate = config.get("PROFILE_SAMPLE_RATE", 0.0)
+        secret = config.get("PROFILE_SECRET", "")
+        if sample_rate <= 0.0 and not secret:
+            return None
+        return cls(
+            output_dir=config.get("PROFILE_DIR", "profiles"),
+            sample_rate=sample_rate,
+            secret=secret,
+            interval=config.get("PROFILE_INTERVAL", 0.001),
+            max_concurrent=config.get("PROFILE_MAX_CONCURRENT", 1),
+        )
+
+    def should_profile(self, path: str, token: str | None) -> bool:
+        if token is not None:
+            return verify_profile_token(self.secret, path, token)
+        return self.sample_rate >= 1.0 or (self.sample_rate > 0.0 and random.random() < self.sample_rate)
+
+    def start(self, path: str, token: str | None = None) -> RequestProfile | None:
+        """
+        リクエストをプロファイルする場合は、現在のスレッドのプロファイルを開始して返します。
+        プロファイルしない場合はNone。
+        """
+        if not self.should_profile(path, token):
+            return None
+        if not self._slots.acquire(blocking=False):
+            return None
+        profile = RequestProfile(uuid.uuid4().hex, StackSampler(threading.get_ident(), self.interval))
+        _active.statements = profile.statements
+        profile.sampler.start()
+        return profile
+
+    def finish(self, profile: RequestProfile) -> dict:
+        """
+        プロファイルを終了してファイルに保存し、ログに付与する要約を返します。
+        """
+        ended = time.perf_counter()
+        profile.sampler.stop()
+        _active.statements = None
+        self._slots.release()
+
+        path = os.path.join(self.output_dir, f"{profile.id}.folded")
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(path, "w") as f:
+                f.write(profile.sampler.folded())
+        except OSError:
+            logger.warning("Failed to write profile", path=path, exc_info=True)
+            path = None
+
+        return {
+            "id": profile.id,
+            "file": path,
+            "duration_ms": round((ended - profile.started) * 1000, 3),
+            "samples": profile.sampler.samples,
+            "top": profile.sampler.top_functions(),
+            "sql": summarize_statements(profile.statements, ended),
+        }
+
+
+def summarize_statements(statements: list[tuple[float, str]], ended: float, limit: int = 3) -> dict:
+    """
+    記録したSQL文の件数、合計時間、時間のかかった文（上位 limit 件）を返します。
+    各文の時間は次の文の開始（最後の文は ended）までの時間。
+    """
+    timings = []
+    for index, (started, statement) in enumerate(statements):
+        next_started = statements[index + 1][0] if index + 1 < len(statements) else ended
+        timings.append((next_started - started, statement))
+    slowest = sorted(timings, key=lambda timing: timing[0], reverse=True)[:limit]
+    return {
+        "count": len(timings),
+        "total_ms": round(sum(duration for duration, _ in timings) * 1000, 3),
+        "slowest": [
+            {"statement": " ".join(statement.split())[:200], "ms": round(duration * 1000, 3)}
+            for duration, statement in slowest
+        ],
+    }
+
+
+profile_cli = AppGroup("profile", help="リクエストのプロファイルのコマンド。")
+
+
+@profile_cli.command("token")
+@click.argument("path")
+@click.option("--ttl", default=300, show_default=True, help="トークンの有効期間（秒）")
+def token_command(path, ttl):
+    """PATH へのリクエストをプロファイルするためのヘッダーを表示します。"""
+    secret = current_app.config.get("PROFILE_SECRET", "")
+    if not secret:
+        raise click.ClickException("PROFILE_SECRET is not set.")
+    click.echo(f"{PROFILE_TOKEN_HEADER}: {sign_profile_token(secret, path, int(time.time()) + ttl)}")
@@ -0,0 +1,117 @@
+import hashlib
+import math
+import threading
+
+from infra.rate_limit.rate_limit_store import RateLimitStore
+
+
+# 書き込みとみなすメソッド（ConcurrencyLimiterの対象）
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+def retry_after_header(seconds: float) -> str:
+    """Retry-After ヘッダーの値（1以上の整数秒）を返します。"""
+    return str(max(1, math.ceil(seconds)))
+
+
+class RateLimiter:
+    """
+    クライアントごとのトークンバケットでリクエストの頻度を制限します。
+
+    - クライアントは接続元のIPアドレスで区別する
+      （リバースプロキシの後ろで動かす場合は ProxyFix などで remote_addr を設定すること）
+    - `key_header` を指定した場合は、そのヘッダーの値（APIキー）があればそれで区別する。
+      値を変えるだけで制限を回避できてしまうので、認証済みの値をプロキシが設定するヘッダーにのみ使う
+    - 1秒に `rate` 件、瞬間的には `burst` 件まで受け付ける
+    - `exempt_prefixes` に前方一致するパス（/metrics など）は制限しない
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        exempt_prefixes: tuple[str, ...] = (),
+        key_header: str | None = None,
+    ):
+        # rate が0だと再試行までの秒数を計算できず、burst が1未満だと1件も受け付けられない
+        if rate <= 0:
+            raise ValueError(f"Rate limit rate must be positive: {rate}")
+        if burst < 1:
+            raise ValueError(f"Rate limit burst must be at least 1: {burst}")
+        self.rate = rate
+        self.burst = burst
+        self.exempt_prefixes = tuple(exempt_prefixes)
+        self.key_header = key_header
+
+    @classmethod
+    def from_config(cls, config) -> "RateLimiter | None":
+        if not config.get("RATE_LIMIT_ENABLED", False):
+            return None
+        return cls(
+            rate=config.get("RATE_LIMIT_RATE", 10.0),
+            burst=config.get("RATE_LIMIT_BURST", 20.0),
+            exempt_prefixes=tuple(
+                prefix for prefix in config.get("RATE_LIMIT_EXEMPT", "").split(",") if prefix
+            ),
+            key_header=config.get("RATE_LIMIT_KEY_HEADER"),
+        )
+
+    def client_key(self, remote_addr: str | None, headers) -> str:
+        api_key = headers.get(self.key_header) if self.key_header else None
+        if api_key:
+            # APIキーそのものはストアに保存しない
+            return "key:" + hashlib.sha256(api_key.encode()).hexdigest()[:32]
+        return f"ip:{remote_addr}"
+
+    def check(self, store: RateLimitStore, path: str, remote_addr: str | None, headers) -> float:
+        """
+        リクエストを受け付ける場合は0.0、制限する場合は再試行までの秒数を返します。
+        """
+        if self.exempt_prefixes and path.startswith(self.exempt_prefixes):
+            return 0.0
+        return store.consume(self.client_key(remote_addr, headers), self.rate, self.burst)
+
+
+class ConcurrencyLimiter:
+    """
+    同時に処理する書き込みリクエストの数を制限します（ワーカープロセスごと）。
+
+    SQLiteの書き込みは1つずつしか実行できないため、上限を超えたリクエストを待たせ続けると
+    全体のレイテンシが伸び、タイムアウトするまで詰まってしまう。
+    空きを `timeout` 秒だけ待ち、空かなければすぐに拒否して（503）再試行させる。
+    """
+
+    def __init__(self, limit: int, timeout: float = 0.0, retry_after: float = 1.0):
+        self.limit = limit
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    @classmethod
+    def from_config(cls, config) -> "ConcurrencyLimiter | None":
+        limit = config.get("WRITE_CONCURRENCY_LIMIT", 0)
+        if limit <= 0:
+            return None
+        return cls(
+            limit=limit,
+            timeout=config.get("WRITE_QUEUE_TIMEOUT", 0.05),
+            retry_after=config.get("WRITE_RETRY_AFTER", 1.0),
+        )
+
+    def acquire(self) -> bool:
+        if not self._slots.acquire(timeout=self.timeout):
+            return False
+        with self._lock:
+            self._in_flight += 1
+        return True
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
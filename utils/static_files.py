@@ -0,0 +1,305 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+from stat import S_ISREG
+from typing import NamedTuple, Optional
+
+import click
+from flask import abort, current_app, request, send_from_directory
+from flask.cli import AppGroup
+
+from utils.compression import brotli, is_compressible, negotiate_encoding
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# ビルド時にファイル名へ内容のハッシュが付与されたアセット（例: main.3f2a9c1b.js）
+DEFAULT_HASHED_ASSET_PATTERN = r"[.-][0-9a-fA-F]{8,}\.\w+$"
+
+# ハッシュ付きのアセットは内容が変わるとファイル名も変わるので、1年間キャッシュさせる
+HASHED_ASSET_MAX_AGE = 365 * 24 * 60 * 60
+
+# 事前圧縮したファイルの拡張子（優先する順）
+PRECOMPRESSED_EXTENSIONS = {"br": ".br", "gzip": ".gz"}
+
+
+class _Representation(NamedTuple):
+    # static配下の相対パス（事前圧縮したファイルの場合は .br / .gz 付き）
+    file_path: str
+    etag: str
+    # メモリに保持している場合はファイルの内容
+    data: Optional[bytes]
+
+
+class _Entry(NamedTuple):
+    mimetype: str
+    hashed: bool
+    # エンコーディング（圧縮なしはNone） -> 表現
+    representations: dict
+
+
+class StaticFiles:
+    """
+    static配下のファイルを、事前計算したETagとキャッシュヘッダ付きで配信します。
+
+    起動時（refresh()）にstatic配下のマニフェスト（パス -> ETag, Content-Type, 事前圧縮したファイル）を作り、
+    リクエスト時はファイルシステムを参照せずに辞書だけで判定する。
+    ファイルを変更した場合は refresh() を呼ぶか、開発時は start_watcher() で監視する。
+
+    ETagはファイル内容のハッシュで、(更新時刻, サイズ) が変わらない限り再計算しない。
+    ビルド時に作成した `.br` / `.gz` のファイルがあれば、Accept-Encodingに応じてそれを配信する。
+    `in_memory` のファイルと、memory_max_size バイト以下のファイルはメモリから配信する。
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        hashed_asset_pattern: str = DEFAULT_HASHED_ASSET_PATTERN,
+        memory_max_size: int = 0,
+        in_memory: tuple[str, ...] = ("index.html",),
+    ):
+        self.folder = folder
+        self.hashed_asset_re = re.compile(hashed_asset_pattern)
+        self.memory_max_size = memory_max_size
+        self.in_memory = frozenset(in_memory)
+        self._lock = threading.Lock()
+        # 相対パス -> _Entry。refresh() で丸ごと差し替える
+        self._manifest = {}
+        # 相対パス -> (mtime_ns, size)
+        self._signature = {}
+        # 相対パス -> ((mtime_ns, size), ETag)。変更のないファイルのハッシュを再計算しないために使う
+        self._etags = {}
+        self._watcher = None
+        self._stop_watcher = threading.Event()
+
+    def _scan(self) -> dict:
+        signature = {}
+        for root, _, files in os.walk(self.folder):
+            for name in files:
+                full_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(full_path)
+                except FileNotFoundError:
+                    continue
+                # デバイスファイルなどへのシンボリックリンクは配信しない（読むと終わらないことがある）
+                if not S_ISREG(stat.st_mode):
+                    continue
+                path = os.path.relpath(full_path, self.folder).replace(os.sep, "/")
+                signature[path] = (stat.st_mtime_ns, stat.st_size)
+        return signature
+
+    def _representation(self, file_path: str, key, keep_in_memory: bool) -> _Representation:
+        cached = self._etags.get(file_path)
+        data = None
+        if keep_in_memory or key[1] <= self.memory_max_size:
+            with open(os.path.join(self.folder, file_path), "rb") as f:
+                data = f.read()
+        if cached is not None and cached[0] == key:
+            return _Representation(file_path, cached[1], data)
+
+        digest = hashlib.blake2b(digest_size=16)
+        if data is not None:
+            digest.update(data)
+        else:
+            with open(os.path.join(self.folder, file_path), "rb") as f:
+                for block in iter(lambda: f.read(64 * 1024), b""):
+                    digest.update(block)
+        etag = digest.hexdigest()
+        self._etags[file_path] = (key, etag)
+        return _Representation(file_path, etag, data)
+
+    def refresh(self):
+        """
+        static配下を走査してマニフェストを作り直します。
+        作成中も古いマニフェストで配信を続け、完成したら差し替える。
+        """
+        with self._lock:
+            signature = self._scan()
+            manifest = {}
+            for path, key in signature.items():
+                if self._is_precompressed_variant(path, signature):
+                    # 元のファイルの表現として配信する（単体で配信するとContent-Encodingが付かない）
+                    continue
+                keep_in_memory = path in self.in_memory
+                try:
+                    representations = {None: self._representation(path, key, keep_in_memory)}
+                except OSError:
+                    # 走査後に削除・差し替えされたファイルは飛ばす（次の走査で拾い直す）
+                    logger.warning("Static file disappeared during refresh", path=path)
+                    continue
+                for encoding, extension in PRECOMPRESSED_EXTENSIONS.items():
+                    variant_key = signature.get(path + extension)
+                    if variant_key is None:
+                        continue
+                    try:
+                        representations[encoding] = self._representation(
+                            path + extension, variant_key, keep_in_memory
+                        )
+                    except OSError:
+                        logger.warning("Static file disappeared during refresh", path=path + extension)
+                manifest[path] = _Entry(
+                    # Content-Typeは圧縮前のファイル名から決める
+                    mimetype=mimetypes.guess_type(path)[0] or "application/octet-stream",
+                    hashed=self.is_hashed_asset(path),
+                    representations=representations,
+                )
+            # 削除されたファイルのETagは捨てる
+            self._etags = {path: self._etags[path] for path in signature if path in self._etags}
+            self._signature = signature
+            self._manifest = manifest
+
+    @staticmethod
+    def _is_precompressed_variant(path: str, signature: dict) -> bool:
+        return any(
+            path.endswith(extension) and path[: -len(extension)] in signature
+            for extension in PRECOMPRESSED_EXTENSIONS.values()
+        )
+
+    def has_changed(self) -> bool:
+        return self._scan() != self._signature
+
+    def start_watcher(self, interval: float = 1.0):
+        """
+        開発用。interval秒ごとにstatic配下をポーリングし、変更があればマニフェストを作り直す。
+        """
+        if self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop_watcher.wait(interval):
+                try:
+                    if self.has_changed():
+                        self.refresh()
+                except Exception:
+                    # 一時的な失敗でスレッドを終わらせず、次の周期で再試行する
+                    logger.error("Static files watcher failed", exc_info=True)
+
+        self._stop_watcher.clear()
+        self._watcher = threading.Thread(target=watch, name="static-files-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        if self._watcher is not None:
+            self._stop_watcher.set()
+            self._watcher.join()
+            self._watcher = None
+
+    def exists(self, path: str) -> bool:
+        return path in self._manifest
+
+    def etag_for(self, path: str) -> str:
+        return self._manifest[path].representations[None].etag
+
+    def variants_for(self, path: str) -> tuple[str, ...]:
+        return tuple(encoding for encoding in self._manifest[path].representations if encoding)
+
+    def is_hashed_asset(self, path: str) -> bool:
+        return self.hashed_asset_re.search(path) is not None
+
+    def send(self, path: str):
+        """
+        ファイルを配信します。If-None-Matchが一致する場合は304を返す。
+        マニフェストにないパスの場合は404。
+        """
+        entry = self._manifest.get(path)
+        if entry is None:
+            abort(404)
+        variants = [encoding for encoding in entry.representations if encoding]
+        encoding = negotiate_encoding(request.accept_encodings, variants) if variants else None
+        representation = entry.representations[encoding]
+        # ハッシュ付きのアセットは長期間キャッシュさせ、index.htmlなどは毎回ETagで再検証させる
+        max_age = HASHED_ASSET_MAX_AGE if entry.hashed else 0
+
+        if representation.data is not None:
+            response = self._send_from_memory(representation, entry.mimetype, max_age)
+        else:
+            response = send_from_directory(
+                self.folder,
+                representation.file_path,
+                etag=representation.etag,
+                max_age=max_age,
+                mimetype=entry.mimetype,
+            )
+        if entry.hashed:
+            response.cache_control.immutable = True
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if variants:
+            response.vary.add("Accept-Encoding")
+        return response
+
+    @staticmethod
+    def _send_from_memory(representation: _Representation, mimetype: str, max_age: int):
+        # send_file と同じヘッダにする。direct_passthroughにして、動的な圧縮の対象外にする
+        response = current_app.response_class(
+            [representation.data], mimetype=mimetype, direct_passthrough=True
+        )
+        response.content_length = len(representation.data)
+        if max_age > 0:
+            response.cache_control.public = True
+        else:
+            response.cache_control.no_cache = True
+        response.cache_control.max_age = max_age
+        response.expires = int(time.time() + max_age)
+        response.set_etag(representation.etag)
+        return response.make_conditional(request)
+
+
+def precompress(folder: str, min_size: int = 256) -> list[str]:
+    """
+    folder配下の圧縮する価値があるファイルについて、`.gz`（と、brotliがあれば `.br`）を作成します。
+    元のファイルより新しい圧縮済みファイルがある場合や、圧縮しても小さくならない場合は作成しない。
+
+    Returns:
+        作成したファイルのパスのリスト。
+    """
+    written = []
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if name.endswith(tuple(PRECOMPRESSED_EXTENSIONS.values())):
+                continue
+            source = os.path.join(root, name)
+            stat = os.stat(source)
+            if stat.st_size < min_size or not is_compressible(mimetypes.guess_type(name)[0]):
+                continue
+            data = None
+            for encoding, extension in PRECOMPRESSED_EXTENSIONS.items():
+                if encoding == "br" and brotli is None:
+                    continue
+                target = source + extension
+                if os.path.exists(target) and os.stat(target).st_mtime_ns >= stat.st_mtime_ns:
+                    continue
+                if data is None:
+                    with open(source, "rb") as f:
+                        data = f.read()
+                # ビルド時なので、時間をかけて最大の圧縮率にする（mtime=0で再現可能な出力にする）
+                if encoding == "br":
+                    compressed = brotli.compress(data, quality=11)
+                else:
+                    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+                if len(compressed) >= len(data):
+                    continue
+                tmp = target + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(compressed)
+                os.replace(tmp, target)
+                written.append(target)
+    return written
+
+
+static_cli = AppGroup("static", help="静的ファイルの管理コマンド。")
+
+
+@static_cli.command("compress")
+@click.option("--min-size", default=256, show_default=True, help="このバイト数未満のファイルは圧縮しない")
+def compress_command(min_size):
+    """static配下のファイルを事前に圧縮します（ビルド時に実行）。"""
+    written = precompress(current_app.static_folder, min_size=min_size)
+    for path in written:
+        click.echo(f"Wrote {os.path.relpath(path, current_app.static_folder)}")
+    click.echo(f"Compressed {len(written)} files.")